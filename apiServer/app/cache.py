@@ -0,0 +1,59 @@
+import os
+import time
+from collections import OrderedDict
+
+# --- Configuration ---
+# Seconds a cached overview stays valid; a new forecast run replaces it sooner
+OVERVIEW_CACHE_TTL = float(os.getenv("OVERVIEW_CACHE_TTL", "300"))
+OVERVIEW_CACHE_SIZE = int(os.getenv("OVERVIEW_CACHE_SIZE", "16"))
+
+
+class TTLCache:
+    """
+    An in-process LRU cache whose entries also expire ``ttl`` seconds after
+    they were stored.
+
+    Meant for the event loop thread only, so it takes no locks.
+    """
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+    def get(self, key):
+        """Returns the cached value of key, or None."""
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self._stats["misses"] += 1
+            return None
+        self._entries.move_to_end(key)
+        self._stats["hits"] += 1
+        return entry[1]
+
+    def set(self, key, value):
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def clear(self):
+        self._entries.clear()
+        self._stats["invalidations"] += 1
+
+    def metrics(self):
+        stats = dict(self._stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = round(stats["hits"] / lookups, 4) if lookups else None
+        stats["size"] = len(self._entries)
+        stats["max_size"] = self.maxsize
+        stats["ttl_seconds"] = self.ttl
+        return stats
+
+
+# /dashboard/overview payloads, keyed by (date, forecast run id)
+overview_cache = TTLCache(OVERVIEW_CACHE_SIZE, OVERVIEW_CACHE_TTL)
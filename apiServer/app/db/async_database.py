@@ -0,0 +1,85 @@
+import os
+import asyncio
+import asyncpg
+
+# Importing database puts dataPipeline on the Python path
+from . import database  # noqa: F401
+from db_handler.connect import DB_BACKEND, get_connection_params
+from db_handler.pool import POOL_MIN_SIZE, POOL_MAX_SIZE, POOL_CHECKOUT_TIMEOUT
+
+# Server-side limit for every statement a request runs (0 disables it)
+API_STATEMENT_TIMEOUT_MS = int(os.getenv("API_STATEMENT_TIMEOUT_MS", "30000"))
+# Seconds asyncpg waits for a single query before cancelling it client-side
+COMMAND_TIMEOUT = float(os.getenv("DB_COMMAND_TIMEOUT", "60"))
+
+_pool = None
+# Held while the pool is created, so concurrent first requests share one pool
+_pool_lock = asyncio.Lock()
+
+async def init_async_pool():
+    """
+    Creates the asyncpg pool used by the async route handlers. Called at
+    startup, and again by requests that find no pool; once a pool exists it
+    is returned as is.
+
+    With DB_BACKEND=sqlite an equivalent pool over the embedded database is
+    created instead; its connections run queries on worker threads.
+    """
+    global _pool
+    async with _pool_lock:
+        # Another request may have created the pool while this one waited
+        if _pool is None:
+            _pool = await _create_pool()
+    return _pool
+
+async def _create_pool():
+    if DB_BACKEND == "sqlite":
+        from db_handler.sqlite_backend import AsyncSQLitePool
+        print(f"Async database pool ready (sqlite, max={POOL_MAX_SIZE}).")
+        return AsyncSQLitePool(POOL_MAX_SIZE, POOL_CHECKOUT_TIMEOUT)
+    params = get_connection_params()
+    server_settings = {"statement_timeout": str(API_STATEMENT_TIMEOUT_MS)} if API_STATEMENT_TIMEOUT_MS else None
+    try:
+        pool = await asyncpg.create_pool(
+            host=params["host"],
+            port=int(params["port"]) if params["port"] else None,
+            database=params["database"],
+            user=params["user"],
+            password=params["password"],
+            min_size=POOL_MIN_SIZE,
+            max_size=POOL_MAX_SIZE,
+            command_timeout=COMMAND_TIMEOUT,
+            server_settings=server_settings,
+        )
+        print(f"Async database pool ready (min={POOL_MIN_SIZE}, max={POOL_MAX_SIZE}).")
+        return pool
+    except (OSError, asyncpg.PostgresError) as e:
+        print(f"Could not connect to the database: {e}")
+        return None
+
+async def close_async_pool():
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
+
+def get_async_pool():
+    return _pool
+
+def async_pool_metrics():
+    """Returns the size of the async pool and how many of its connections are busy."""
+    if _pool is None:
+        return {"status": "unavailable"}
+    size = _pool.get_size()
+    return {"size": size, "in_use": size - _pool.get_idle_size(), "max_size": _pool.get_max_size()}
+
+# This function can be used as a dependency in async FastAPI routes.
+# It yields None when the database is unavailable, like get_db(); a pool that
+# could not be created at startup is retried on the next request.
+async def get_async_db():
+    pool = _pool or await init_async_pool()
+    if pool is None:
+        yield None
+        return
+    async with pool.acquire() as conn:
+        yield conn
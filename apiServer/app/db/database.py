@@ -6,13 +6,10 @@ project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(o
 data_pipeline_path = os.path.join(project_root, 'dataPipeline')
 sys.path.append(data_pipeline_path)
 
-from db_handler.connect import get_db_connection
+from db_handler.pool import pooled_connection, get_pool, close_pool
 
-# This function can be used as a dependency in FastAPI routes
+# This function can be used as a dependency in FastAPI routes.
+# Connections are borrowed from the shared pool and returned after the request.
 def get_db():
-    db = get_db_connection()
-    try:
-        yield db
-    finally:
-        if db:
-            db.close()
\ No newline at end of file
+    with pooled_connection() as db:
+        yield db
\ No newline at end of file
@@ -0,0 +1,79 @@
+import asyncpg
+
+# Importing database puts dataPipeline on the Python path
+from . import database  # noqa: F401
+from db_handler.connect import DB_BACKEND, get_connection_params
+from db_handler.migrations import FORECAST_PUBLISHED_CHANNEL
+
+
+class ForecastRunWatcher:
+    """
+    Knows the id of the current forecast run without a query per request.
+
+    On PostgreSQL a dedicated connection LISTENs for the NOTIFY a publish
+    sends, updates the run id and calls the registered callbacks (which drop
+    cached responses). Without that connection (SQLite, or after it was
+    lost) the id is read from forecast_current_run on every call instead.
+    """
+
+    def __init__(self, channel=FORECAST_PUBLISHED_CHANNEL):
+        self.channel = channel
+        self.run_id = None
+        self._conn = None
+        self._callbacks = []
+
+    def on_publish(self, callback):
+        """Registers callback(run_id) to be called whenever a new run is published."""
+        self._callbacks.append(callback)
+
+    @property
+    def listening(self):
+        return self._conn is not None and not self._conn.is_closed()
+
+    async def start(self):
+        if DB_BACKEND == "sqlite" or self.listening:
+            return
+        params = get_connection_params()
+        try:
+            self._conn = await asyncpg.connect(
+                host=params["host"],
+                port=int(params["port"]) if params["port"] else None,
+                database=params["database"],
+                user=params["user"],
+                password=params["password"],
+            )
+            self._conn.add_termination_listener(self._lost)
+            # Listen first, so a publish between the two statements is not missed
+            await self._conn.add_listener(self.channel, self._notified)
+            row = await self._conn.fetchrow("SELECT run_id FROM forecast_current_run;")
+            self.run_id = row["run_id"] if row else None
+            print(f"Listening for forecast publishes (current run: {self.run_id}).")
+        except (OSError, asyncpg.PostgresError) as e:
+            print(f"Could not listen for forecast publishes, reading the run per request: {e}")
+            await self.stop()
+
+    def _notified(self, connection, pid, channel, payload):
+        self.run_id = int(payload)
+        for callback in self._callbacks:
+            callback(self.run_id)
+
+    def _lost(self, connection):
+        self._conn = None
+        # Publishes may be missed from now on, so nothing cached can be trusted
+        for callback in self._callbacks:
+            callback(None)
+
+    async def current(self, db):
+        """Returns the current run id (None before the first publish)."""
+        if self.listening:
+            return self.run_id
+        row = await db.fetchrow("SELECT run_id FROM forecast_current_run;")
+        return row["run_id"] if row else None
+
+    async def stop(self):
+        conn, self._conn = self._conn, None
+        if conn is not None and not conn.is_closed():
+            await conn.close()
+
+
+run_watcher = ForecastRunWatcher()
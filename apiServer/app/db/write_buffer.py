@@ -0,0 +1,192 @@
+import os
+import time
+import asyncio
+from collections import defaultdict
+from zoneinfo import ZoneInfo
+
+from .async_database import get_async_pool, init_async_pool
+from db_handler.connect import DB_BACKEND
+from db_handler.manage_db import POWER_DATA_COLUMNS
+
+# --- Configuration ---
+# Flush as soon as this many (date, metric) values are waiting...
+INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "500"))
+# ...and in any case every this many seconds
+INGEST_FLUSH_INTERVAL = float(os.getenv("INGEST_FLUSH_INTERVAL", "2.0"))
+# Upper bound on waiting values; writers are turned away beyond it
+INGEST_MAX_PENDING = int(os.getenv("INGEST_MAX_PENDING", "10000"))
+# How long a writer may wait for room in a full buffer before being rejected
+INGEST_ENQUEUE_TIMEOUT = float(os.getenv("INGEST_ENQUEUE_TIMEOUT", "1.0"))
+# Time zone of the campus meters: readings without an offset are taken to be
+# in it, and every reading counts towards the power_data day it falls on there
+INGEST_TIMEZONE = ZoneInfo(os.getenv("INGEST_TIMEZONE", "Asia/Kolkata"))
+
+METER_COLUMNS = [c for c in POWER_DATA_COLUMNS if c not in ("month", "reading_date")]
+
+# One statement per flush: the batch is passed as parallel arrays and merged
+# into power_data. Metrics missing from the batch keep their stored value.
+_UPSERT_QUERY = f"""
+    INSERT INTO power_data (month, reading_date, {', '.join(METER_COLUMNS)})
+    SELECT TO_CHAR(d, 'FMMonth'), d, {', '.join(METER_COLUMNS)}
+    FROM UNNEST($1::date[], {', '.join(f'${i}::float8[]' for i in range(2, len(METER_COLUMNS) + 2))})
+        AS batch(d, {', '.join(METER_COLUMNS)})
+    ON CONFLICT (reading_date) DO UPDATE
+    SET {', '.join(f'{c} = COALESCE(EXCLUDED.{c}, power_data.{c})' for c in METER_COLUMNS)};
+"""
+
+# SQLite has no arrays, so the embedded backend upserts the batch one row per parameter set
+_SQLITE_UPSERT_QUERY = f"""
+    INSERT INTO power_data (month, reading_date, {', '.join(METER_COLUMNS)})
+    VALUES ({', '.join(f'${i}' for i in range(1, len(METER_COLUMNS) + 3))})
+    ON CONFLICT (reading_date) DO UPDATE
+    SET {', '.join(f'{c} = COALESCE(EXCLUDED.{c}, power_data.{c})' for c in METER_COLUMNS)};
+"""
+
+
+class BufferFullError(Exception):
+    """Raised when the buffer has no room for new readings."""
+
+
+def site_time(reading_time, tz=INGEST_TIMEZONE):
+    """Returns reading_time as an aware datetime in the meters' time zone."""
+    if reading_time.tzinfo is None:
+        return reading_time.replace(tzinfo=tz)
+    return reading_time.astimezone(tz)
+
+
+class ReadingWriteBuffer:
+    """
+    Coalesces live meter readings in memory and writes them to power_data in micro-batches.
+
+    power_data holds one row per day, so readings are keyed by (date, metric)
+    and a newer reading for the same key replaces the waiting one. A
+    background task flushes the buffer when it reaches ``batch_size`` keys or
+    every ``flush_interval`` seconds, whichever comes first, using a single
+    upsert per flush. When ``max_pending`` keys are waiting, writers wait up
+    to ``enqueue_timeout`` seconds for a flush and are then rejected.
+    """
+
+    def __init__(self, batch_size=INGEST_BATCH_SIZE, flush_interval=INGEST_FLUSH_INTERVAL,
+                 max_pending=INGEST_MAX_PENDING, enqueue_timeout=INGEST_ENQUEUE_TIMEOUT):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.enqueue_timeout = enqueue_timeout
+        self._pending = {}
+        self._condition = asyncio.Condition()
+        self._flush_requested = asyncio.Event()
+        self._task = None
+        self._stats = {"accepted": 0, "rejected": 0, "flushes": 0, "rows_written": 0, "flush_errors": 0, "last_flush_ms": 0.0}
+
+    async def add(self, readings):
+        """
+        Buffers readings given as (reading_time, metric, value) tuples.
+
+        Naive and aware reading times may be mixed; all are converted to
+        the meters' time zone (see site_time) before they are compared.
+
+        Raises:
+            BufferFullError: If there is still no room after ``enqueue_timeout`` seconds.
+        """
+        readings = [(site_time(t), metric, value) for t, metric, value in readings]
+        async with self._condition:
+            new_keys = {(t.date(), metric) for t, metric, _ in readings} - self._pending.keys()
+            if len(self._pending) + len(new_keys) > self.max_pending:
+                self._flush_requested.set()
+                try:
+                    await asyncio.wait_for(
+                        self._condition.wait_for(lambda: len(self._pending) + len(new_keys) <= self.max_pending),
+                        timeout=self.enqueue_timeout,
+                    )
+                except asyncio.TimeoutError:
+                    self._stats["rejected"] += len(readings)
+                    raise BufferFullError(f"{len(self._pending)} readings are waiting to be written.")
+
+            for reading_time, metric, value in readings:
+                key = (reading_time.date(), metric)
+                current = self._pending.get(key)
+                if current is None or reading_time >= current[0]:
+                    self._pending[key] = (reading_time, value)
+            self._stats["accepted"] += len(readings)
+            if len(self._pending) >= self.batch_size:
+                self._flush_requested.set()
+            return len(self._pending)
+
+    async def flush(self):
+        """
+        Writes everything currently buffered.
+
+        Returns the number of power_data rows written, or None if the write
+        failed, in which case the batch is put back for the next attempt.
+        """
+        async with self._condition:
+            batch, self._pending = self._pending, {}
+            self._flush_requested.clear()
+        if not batch:
+            return 0
+
+        rows = defaultdict(dict)
+        for (reading_date, metric), (_, value) in batch.items():
+            rows[reading_date][metric] = value
+        dates = sorted(rows)
+        columns = [[rows[d].get(c) for d in dates] for c in METER_COLUMNS]
+
+        start = time.perf_counter()
+        try:
+            pool = get_async_pool() or await init_async_pool()
+            if pool is None:
+                raise ConnectionError("Database connection failed")
+            async with pool.acquire() as conn:
+                if DB_BACKEND == "sqlite":
+                    await conn.executemany(_SQLITE_UPSERT_QUERY, [
+                        (d.strftime('%B'), d, *(column[i] for column in columns)) for i, d in enumerate(dates)
+                    ])
+                else:
+                    await conn.execute(_UPSERT_QUERY, dates, *columns)
+        except Exception as e:
+            print(f"❌ Failed to flush {len(batch)} live readings: {e}")
+            async with self._condition:
+                self._stats["flush_errors"] += 1
+                for key, reading in batch.items():
+                    current = self._pending.get(key)
+                    if current is None or reading[0] > current[0]:
+                        self._pending[key] = reading
+            return None
+
+        async with self._condition:
+            self._stats["flushes"] += 1
+            self._stats["rows_written"] += len(dates)
+            self._stats["last_flush_ms"] = round(1000 * (time.perf_counter() - start), 3)
+            self._condition.notify_all()
+        return len(dates)
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_requested.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            if await self.flush() is None:
+                # Back off instead of retrying a failing database in a tight loop
+                await asyncio.sleep(self.flush_interval)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stops the background task and writes whatever is still buffered."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    def stats(self):
+        return {**self._stats, "pending": len(self._pending), "max_pending": self.max_pending}
+
+
+reading_buffer = ReadingWriteBuffer()
@@ -0,0 +1,153 @@
+import os
+import sys
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# Add predictionModel to the Python path to find the renderer and the model store
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.join(project_root, 'predictionModel'))
+
+from utils.visualizer import render_forecast_plot, PLOT_KINDS, PLOT_FORMATS  # noqa: E402
+
+# --- Configuration ---
+# Worker processes rendering plots at the same time
+PLOT_RENDER_WORKERS = int(os.getenv("PLOT_RENDER_WORKERS", "0")) or min(2, os.cpu_count() or 1)
+PLOT_CACHE_DIR = os.getenv("PLOT_CACHE_DIR", os.path.join(project_root, 'apiServer', 'plot_cache'))
+# The least recently served images beyond this total size are removed
+PLOT_CACHE_MAX_BYTES = int(os.getenv("PLOT_CACHE_MAX_MB", "200")) * 1024 * 1024
+
+
+class PlotRendererUnavailable(Exception):
+    """Raised when the render workers keep dying, e.g. killed for lack of memory."""
+
+
+class PlotRenderer:
+    """
+    Renders forecast plots in a pool of headless worker processes and caches
+    the images on disk as ``<cache_dir>/<artifact_key>/<metric>_<kind>.<fmt>``.
+    Stored models never change, so an image stays valid for as long as a run
+    refers to its artifact.
+
+    A cached image is served as is (touching it records the use for the LRU
+    eviction). Concurrent requests for the same missing image share one
+    render, after which the least recently used images beyond ``max_bytes``
+    are removed. A pool whose worker died is replaced, and the render
+    retried once on the new one.
+    """
+
+    def __init__(self, workers=PLOT_RENDER_WORKERS, cache_dir=PLOT_CACHE_DIR, max_bytes=PLOT_CACHE_MAX_BYTES):
+        self.workers = workers
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._pool = None
+        self._pending = {}
+
+    def _path(self, key, metric, kind, fmt):
+        return os.path.join(self.cache_dir, key, f"{metric}_{kind}.{fmt}")
+
+    @staticmethod
+    def _read(path):
+        try:
+            with open(path, 'rb') as f:
+                image = f.read()
+            os.utime(path)
+            return image
+        except OSError:
+            return None
+
+    async def get(self, key, metric, kind='forecast', fmt='png'):
+        """
+        Returns the plot of metric's model stored under key, rendering it if needed.
+
+        Returns:
+            bytes: The encoded image, or None when the artifact is not in the model store.
+        """
+        if kind not in PLOT_KINDS or fmt not in PLOT_FORMATS:
+            raise ValueError(f"Unsupported plot: {kind}.{fmt}")
+        path = self._path(key, metric, kind, fmt)
+        image = await asyncio.to_thread(self._read, path)
+        if image is not None:
+            return image
+        task = self._pending.get(path)
+        if task is None:
+            task = asyncio.ensure_future(self._render(path, key, metric, kind, fmt))
+            self._pending[path] = task
+            task.add_done_callback(lambda _: self._pending.pop(path, None))
+        # A client going away must not cancel a render others are waiting for
+        return await asyncio.shield(task)
+
+    async def _render(self, path, key, metric, kind, fmt):
+        loop = asyncio.get_running_loop()
+        for attempt in range(2):
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+            pool = self._pool
+            try:
+                image = await loop.run_in_executor(pool, render_forecast_plot, key, metric, kind, fmt)
+                break
+            except BrokenProcessPool:
+                print(f"❌ A plot worker died while rendering {metric} ({kind}.{fmt}); restarting the pool.")
+                # Concurrent renders may have replaced the broken pool already
+                if self._pool is pool:
+                    self._pool = None
+                pool.shutdown(wait=False, cancel_futures=True)
+        else:
+            raise PlotRendererUnavailable(f"Plot workers died twice while rendering {metric}.")
+        if image is not None:
+            await asyncio.to_thread(self._store, path, image)
+        return image
+
+    def _store(self, path, image):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'wb') as f:
+            f.write(image)
+        os.replace(tmp, path)
+        self.evict()
+
+    def evict(self):
+        """
+        Removes the least recently served images until the cache fits in
+        max_bytes, and the directories of artifacts left empty.
+
+        Returns:
+            int: The number of images removed.
+        """
+        images = []
+        for root, _, names in os.walk(self.cache_dir):
+            for name in names:
+                if name.endswith('.tmp'):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                images.append((stat.st_mtime, stat.st_size, path))
+        images.sort()
+        total = sum(size for _, size, _ in images)
+        removed = 0
+        for _, size, path in images:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+            try:
+                os.rmdir(os.path.dirname(path))
+            except OSError:
+                pass  # the artifact still has other images
+        return removed
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+
+plot_renderer = PlotRenderer()
@@ -1,56 +1,95 @@
 from fastapi import APIRouter, Depends, HTTPException
 from ..schemas.power import TodaysOverviewResponse
-from ..db.database import get_db
-import psycopg2
-from psycopg2.extras import DictCursor
+from ..db.async_database import get_async_db
+from ..db.forecast_runs import run_watcher
+from ..cache import overview_cache
+from db_handler.migrations import FORECAST_METRIC_COLUMNS
+import asyncpg
 from datetime import date, timedelta
 
 router = APIRouter()
 
+# Days shown in the overview's trend chart
+TREND_DAYS = 7
+# No stored period (day, week or calendar month) is longer than this, so a
+# row covering today cannot start earlier
+MAX_PERIOD_DAYS = 31
+
+# The whole overview in one statement (prepared once per connection and
+# reused through the driver's statement cache): the current run's first
+# TREND_DAYS rows ending on or after today ($1), pivoted to one column per
+# metric, with the generation and grid totals and flags marking the rows
+# that cover today and tomorrow ($2). $3 bounds the index range scanned.
+_GENERATION_SQL = " + ".join(f"COALESCE(t.{c}_pred, 0)" for c in ("solar_generation", "diesel_generation", "biogas_generation"))
+_OVERVIEW_QUERY = f"""
+    WITH current_run AS (
+        SELECT run_id FROM forecast_current_run
+    ),
+    trend_dates AS (
+        SELECT DISTINCT reading_date
+        FROM forecast_values
+        WHERE run_id = (SELECT run_id FROM current_run) AND reading_date >= $3 AND period_end >= $1
+        ORDER BY reading_date
+        LIMIT {TREND_DAYS}
+    ),
+    trend AS (
+        SELECT v.reading_date, v.period_end,
+               {', '.join(f"MAX(CASE WHEN m.name = '{c}' THEN v.value END) AS {c}_pred" for c in FORECAST_METRIC_COLUMNS)}
+        FROM forecast_values v
+        JOIN forecast_metrics m ON m.metric_id = v.metric_id
+        WHERE v.run_id = (SELECT run_id FROM current_run)
+          AND v.reading_date IN (SELECT reading_date FROM trend_dates)
+        GROUP BY v.reading_date, v.period_end
+    )
+    SELECT t.*,
+           {_GENERATION_SQL} AS total_generation_pred,
+           COALESCE(t.total_consumption_pred, 0) - ({_GENERATION_SQL}) AS net_grid_import_pred,
+           COALESCE(t.tneb_campus_htsc_91_pred, 0) + COALESCE(t.tneb_new_stp_htsc_178_pred, 0) AS grid_intake_pred,
+           t.reading_date <= $1 AS is_today,
+           t.reading_date <= $2 AND t.period_end >= $2 AS is_tomorrow
+    FROM trend t
+    ORDER BY t.reading_date;
+"""
+
+# The overview only changes with the date or the forecast run, so it is served
+# from memory until one of them moves; a publish drops every cached overview.
+run_watcher.on_publish(lambda run_id: overview_cache.clear())
+
 @router.get("/dashboard/overview/", response_model=TodaysOverviewResponse)
-def get_todays_overview(db: psycopg2.extensions.connection = Depends(get_db)):
+async def get_todays_overview(db: asyncpg.Connection = Depends(get_async_db)):
     if not db:
         raise HTTPException(status_code=500, detail="Database connection failed")
-    
-    today = date.today()
-    tomorrow = today + timedelta(days=1)
-
-    with db.cursor(cursor_factory=DictCursor) as cur:
-        # 1. Get today's predicted data for KPIs and breakdowns
-        cur.execute("SELECT * FROM forecast_data_wide WHERE reading_date = %s;", (today,))
-        todays_pred = cur.fetchone()
-        if not todays_pred:
-            raise HTTPException(status_code=404, detail=f"No prediction found for today's date: {today}")
 
-        # 2. Get tomorrow's predicted consumption for the KPI card
-        cur.execute("SELECT total_consumption_pred FROM forecast_data_wide WHERE reading_date = %s;", (tomorrow,))
-        tomorrows_pred = cur.fetchone()
+    today = date.today()
+    key = (today, await run_watcher.current(db))
+    overview = overview_cache.get(key)
+    if overview is None:
+        overview = await _build_overview(db, today)
+        overview_cache.set(key, overview)
+    return overview
 
-        # 3. Get the next 7 days of PREDICTED data for the main trend chart
-        cur.execute("""
-            SELECT reading_date, total_consumption_pred FROM forecast_data_wide 
-            WHERE reading_date >= CURRENT_DATE 
-            ORDER BY reading_date ASC LIMIT 7;
-        """)
-        forecast_trend = cur.fetchall()
+async def _build_overview(db, today):
+    tomorrow = today + timedelta(days=1)
 
-    # 4. Calculate predicted KPIs for today
-    total_generation_pred = (todays_pred.get("solar_generation_pred", 0) or 0) + \
-                            (todays_pred.get("diesel_generation_pred", 0) or 0) + \
-                            (todays_pred.get("biogas_generation_pred", 0) or 0)
-    
-    net_grid_import_pred = (todays_pred.get("total_consumption_pred", 0) or 0) - total_generation_pred
+    # 1. One round trip for the trend window, which starts with today's row
+    # and contains tomorrow's (a row covers reading_date..period_end)
+    rows = await db.fetch(_OVERVIEW_QUERY, today, tomorrow, today - timedelta(days=MAX_PERIOD_DAYS))
+    todays_pred = next((row for row in rows if row["is_today"]), None)
+    if not todays_pred:
+        raise HTTPException(status_code=404, detail=f"No prediction found for today's date: {today}")
+    tomorrows_pred = next((row for row in rows if row["is_tomorrow"]), None)
 
+    # 2. Predicted KPIs for today (the generation totals come from the query)
     kpis = {
         "today_date": today,
         "next_day_date": tomorrow,
         "total_consumption_pred": todays_pred["total_consumption_pred"],
-        "total_generation_pred": total_generation_pred,
-        "net_grid_import_pred": net_grid_import_pred,
+        "total_generation_pred": todays_pred["total_generation_pred"],
+        "net_grid_import_pred": todays_pred["net_grid_import_pred"],
         "next_day_forecast": tomorrows_pred["total_consumption_pred"] if tomorrows_pred else None
     }
 
-    # 5. Prepare breakdown charts based on today's prediction
+    # 3. Prepare breakdown charts based on today's prediction
     utilization_breakdown = [
         {"name": "Staff Quarters", "value": todays_pred["staff_quarters_util_pred"]},
         {"name": "Academic", "value": todays_pred["academic_blocks_util_pred"]},
@@ -60,7 +99,7 @@ def get_todays_overview(db: psycopg2.extensions.connection = Depends(get_db)):
     ]
     
     intake_breakdown = [
-        {"name": "Grid (TNEB)", "value": (todays_pred["tneb_campus_htsc_91_pred"] or 0) + (todays_pred["tneb_new_stp_htsc_178_pred"] or 0)},
+        {"name": "Grid (TNEB)", "value": todays_pred["grid_intake_pred"]},
         {"name": "Solar", "value": todays_pred["solar_generation_pred"]},
         {"name": "Diesel", "value": todays_pred["diesel_generation_pred"]},
         {"name": "Biogas", "value": todays_pred["biogas_generation_pred"]},
@@ -68,7 +107,7 @@ def get_todays_overview(db: psycopg2.extensions.connection = Depends(get_db)):
     
     return {
         "kpis": kpis,
-        "forecast_trend": [dict(row) for row in forecast_trend],
+        "forecast_trend": [{"reading_date": row["reading_date"], "total_consumption_pred": row["total_consumption_pred"]} for row in rows],
         "utilization_breakdown": utilization_breakdown,
         "intake_breakdown": intake_breakdown
     }
\ No newline at end of file
@@ -1,54 +1,69 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import Response
 from ..schemas.power import ForecastDataPoint
-from ..db.database import get_db
-import psycopg2
-from psycopg2.extras import DictCursor
+from ..db.async_database import get_async_db
+from ..db.forecast_runs import run_watcher
+from ..plot_renderer import plot_renderer, PlotRendererUnavailable, PLOT_KINDS, PLOT_FORMATS
+import asyncpg
+import json
 from datetime import date, timedelta
 
 router = APIRouter()
 
-# --- THIS IS THE MISSING DICTIONARY ---
-# Whitelist of all forecastable columns in the database
-ALLOWED_METRICS = [
-    "total_consumption_pred", "solar_generation_pred",
-    "tneb_campus_htsc_91_pred", "tneb_new_stp_htsc_178_pred", "diesel_generation_pred",
-    "biogas_generation_pred", "staff_quarters_util_pred", "academic_blocks_util_pred",
-    "hostels_util_pred", "chiller_plant_util_pred", "stp_util_pred"
-]
-# We'll calculate net_grid_import_pred, so it's not in the direct query list
-# ------------------------------------
+# Forecasts live in the long-format store: one value per (run, metric, date),
+# read through the (run_id, metric_id, reading_date) key of the current run.
+# Metric names are validated against the forecast_metrics registry, so a new
+# meter needs no change here.
+# Far-future forecasts may be stored as weekly or monthly rows (a per-day
+# mean from reading_date to period_end), so predictions are selected by
+# overlap with the requested range rather than by reading_date alone.
+RESOLUTION_SQL = "CASE {} WHEN 'w' THEN 'week' WHEN 'm' THEN 'month' ELSE 'day' END"
 
+# net_grid_import_pred is derived: total consumption minus the generation metrics
+NET_GRID_IMPORT_TERMS = ["total_consumption", "solar_generation", "diesel_generation", "biogas_generation"]
 
 # This is the last date of your actual, historical data
 HISTORICAL_DATA_CUTOFF = date(2025, 6, 30)
 
 @router.get("/forecasts/metric/", response_model=list[ForecastDataPoint])
-def get_forecast_for_metric(
+async def get_forecast_for_metric(
     start_date: date,
     end_date: date,
     metric_name: str = Query(..., description="The name of the metric column to forecast"),
-    db: psycopg2.extensions.connection = Depends(get_db)
+    db: asyncpg.Connection = Depends(get_async_db)
 ):
     if not db:
         raise HTTPException(status_code=500, detail="Database connection failed")
     
     # Handle the calculated metric 'net_grid_import_pred' separately
+    metrics = NET_GRID_IMPORT_TERMS if metric_name == 'net_grid_import_pred' else [metric_name.removesuffix('_pred')]
+    placeholders = ", ".join(f"${i}" for i in range(1, len(metrics) + 1))
+    registered = {row["name"]: row["metric_id"] for row in await db.fetch(
+        f"SELECT name, metric_id FROM forecast_metrics WHERE name IN ({placeholders});", *metrics)}
+    if not metric_name.endswith('_pred') or len(registered) != len(metrics):
+        raise HTTPException(status_code=400, detail=f"Invalid metric name requested: {metric_name}")
+    metric_ids = [registered[m] for m in metrics]
+
     if metric_name == 'net_grid_import_pred':
-        query = """
-            SELECT 
-                reading_date, 
-                (total_consumption_pred - (solar_generation_pred + diesel_generation_pred + biogas_generation_pred)) AS prediction
-            FROM forecast_data_wide
-            WHERE reading_date BETWEEN %s AND %s
+        query = f"""
+            SELECT
+                reading_date, period_end, {RESOLUTION_SQL.format('MAX(resolution)')} AS resolution,
+                SUM(CASE WHEN metric_id = $3 THEN value ELSE -value END) AS prediction
+            FROM forecast_values
+            WHERE run_id = (SELECT run_id FROM forecast_current_run)
+              AND metric_id IN ($3, $4, $5, $6) AND reading_date <= $2 AND period_end >= $1
+            GROUP BY reading_date, period_end
+            HAVING COUNT(*) = 4
             ORDER BY reading_date ASC;
         """
-        params = (start_date, end_date)
-    # For all other direct metrics, validate against the whitelist
-    elif metric_name not in ALLOWED_METRICS:
-        raise HTTPException(status_code=400, detail=f"Invalid metric name requested: {metric_name}")
     else:
-        query = f'SELECT reading_date, "{metric_name}" AS prediction FROM forecast_data_wide WHERE reading_date BETWEEN %s AND %s ORDER BY reading_date ASC;'
-        params = (start_date, end_date)
+        query = f"""
+            SELECT reading_date, period_end, {RESOLUTION_SQL.format('resolution')} AS resolution, value AS prediction
+            FROM forecast_values
+            WHERE run_id = (SELECT run_id FROM forecast_current_run)
+              AND metric_id = $3 AND reading_date <= $2 AND period_end >= $1
+            ORDER BY reading_date ASC;
+        """
 
     results = []
     
@@ -63,16 +78,14 @@ def get_forecast_for_metric(
                     reading_date, 
                     (total_consumption - (solar_generation + diesel_generation + biogas_generation)) AS prediction
                 FROM power_data
-                WHERE reading_date BETWEEN %s AND %s
+                WHERE reading_date BETWEEN $1 AND $2
                 ORDER BY reading_date ASC;
             """
         else:
-            hist_query = f'SELECT reading_date, "{historical_metric}" AS prediction FROM power_data WHERE reading_date BETWEEN %s AND %s ORDER BY reading_date ASC;'
+            hist_query = f'SELECT reading_date, "{historical_metric}" AS prediction FROM power_data WHERE reading_date BETWEEN $1 AND $2 ORDER BY reading_date ASC;'
         
-        with db.cursor(cursor_factory=DictCursor) as cur:
-            cur.execute(hist_query, (start_date, end_date))
-            for row in cur.fetchall():
-                results.append({**dict(row), "type": "historical"})
+        for row in await db.fetch(hist_query, start_date, end_date):
+            results.append({**dict(row), "type": "historical"})
 
     # Case 2 & 3: The range is PREDICTED or SPANS both
     else:
@@ -82,22 +95,52 @@ def get_forecast_for_metric(
             if metric_name == 'net_grid_import_pred':
                 hist_query = """
                     SELECT reading_date, (total_consumption - (solar_generation + diesel_generation + biogas_generation)) AS prediction
-                    FROM power_data WHERE reading_date BETWEEN %s AND %s ORDER BY reading_date ASC;
+                    FROM power_data WHERE reading_date BETWEEN $1 AND $2 ORDER BY reading_date ASC;
                 """
             else:
-                hist_query = f'SELECT reading_date, "{historical_metric}" AS prediction FROM power_data WHERE reading_date BETWEEN %s AND %s ORDER BY reading_date ASC;'
+                hist_query = f'SELECT reading_date, "{historical_metric}" AS prediction FROM power_data WHERE reading_date BETWEEN $1 AND $2 ORDER BY reading_date ASC;'
 
-            with db.cursor(cursor_factory=DictCursor) as cur:
-                cur.execute(hist_query, (start_date, HISTORICAL_DATA_CUTOFF))
-                for row in cur.fetchall():
-                    results.append({**dict(row), "type": "historical"})
+            for row in await db.fetch(hist_query, start_date, HISTORICAL_DATA_CUTOFF):
+                results.append({**dict(row), "type": "historical"})
         
         # Fetch predicted part
         pred_start_date = max(start_date, HISTORICAL_DATA_CUTOFF + timedelta(days=1))
         
-        with db.cursor(cursor_factory=DictCursor) as cur:
-            cur.execute(query, (pred_start_date, end_date))
-            for row in cur.fetchall():
-                results.append({**dict(row), "type": "predicted"})
+        for row in await db.fetch(query, pred_start_date, end_date, *metric_ids):
+            results.append({**dict(row), "type": "predicted"})
+
+    return results
+
+
+@router.get("/forecasts/plot/")
+async def get_forecast_plot(
+    metric_name: str = Query(..., description="The name of the metric column to plot"),
+    kind: str = Query("forecast", description="'forecast' or 'components'"),
+    format: str = Query("png", description="'png' or 'svg'"),
+    db: asyncpg.Connection = Depends(get_async_db)
+):
+    """
+    Prophet's forecast or components plot of a metric, rendered on first
+    request from the stored models the current run's forecast came from and
+    cached per model artifact.
+    """
+    if not db:
+        raise HTTPException(status_code=500, detail="Database connection failed")
+    if kind not in PLOT_KINDS or format not in PLOT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported plot: kind={kind}, format={format}")
+    metric = metric_name.removesuffix('_pred')
+    if not metric_name.endswith('_pred') or not await db.fetchrow("SELECT 1 FROM forecast_metrics WHERE name = $1;", metric):
+        raise HTTPException(status_code=400, detail=f"Invalid metric name requested: {metric_name}")
 
-    return results
\ No newline at end of file
+    run_id = await run_watcher.current(db)
+    if run_id is None:
+        raise HTTPException(status_code=404, detail="No forecast has been published yet")
+    row = await db.fetchrow("SELECT artifact_keys FROM forecast_runs WHERE run_id = $1;", run_id)
+    key = json.loads(row["artifact_keys"]).get(metric) if row and row["artifact_keys"] else None
+    try:
+        image = await plot_renderer.get(key, metric, kind, format) if key else None
+    except PlotRendererUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    if image is None:
+        raise HTTPException(status_code=404, detail=f"No stored model to plot for {metric_name}")
+    return Response(content=image, media_type=PLOT_FORMATS[format])
@@ -0,0 +1,32 @@
+from fastapi import APIRouter, HTTPException
+from ..schemas.power import MeterReading, IngestResponse
+from ..db.write_buffer import reading_buffer, BufferFullError, METER_COLUMNS
+
+router = APIRouter()
+
+@router.post("/readings/", response_model=IngestResponse, status_code=202)
+async def ingest_readings(readings: MeterReading | list[MeterReading]):
+    """
+    Accepts one meter reading or a batch of them for 'power_data'.
+
+    Readings are buffered in memory and written in micro-batches, so a 202
+    response means the reading was accepted, not that it is already stored.
+    A 503 with Retry-After is returned while the buffer is full.
+    """
+    if isinstance(readings, MeterReading):
+        readings = [readings]
+    invalid = sorted({r.metric for r in readings} - set(METER_COLUMNS))
+    if invalid:
+        raise HTTPException(status_code=400, detail=f"Invalid metric name(s): {', '.join(invalid)}")
+
+    try:
+        pending = await reading_buffer.add([(r.reading_time, r.metric, r.value) for r in readings])
+    except BufferFullError as e:
+        retry_after = max(1, round(reading_buffer.flush_interval))
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(retry_after)})
+
+    return {"accepted": len(readings), "pending": pending}
+
+@router.get("/readings/buffer/")
+async def get_buffer_stats():
+    return reading_buffer.stats()
@@ -1,8 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.responses import StreamingResponse, Response
+from fastapi.concurrency import run_in_threadpool
 from ..schemas.power import ReportRequest
-from ..db.database import get_db
-import psycopg2
+from ..db.async_database import get_async_db
+import asyncpg
 import pandas as pd
 import io
 from fpdf import FPDF
@@ -57,10 +58,12 @@ class PDF(FPDF):
             self.ln()
 
 @router.post("/reports/generate/")
-def generate_report(request: ReportRequest, db: psycopg2.extensions.connection = Depends(get_db)):
-    
+async def generate_report(request: ReportRequest, db: asyncpg.Connection = Depends(get_async_db)):
+    if not db:
+        raise HTTPException(status_code=500, detail="Database connection failed")
+
     # ... (Logic for building db_columns, query, and fetching df is unchanged) ...
-    db_columns = ["reading_date", "month", "total_consumption_pred", "solar_generation_pred", "diesel_generation_pred", "biogas_generation_pred"]
+    db_columns = ["reading_date", "period_end", "resolution", "month", "total_consumption_pred", "solar_generation_pred", "diesel_generation_pred", "biogas_generation_pred"]
     for metric in request.metrics:
         if metric in ALLOWED_METRICS and ALLOWED_METRICS[metric] is not None:
             db_columns.append(ALLOWED_METRICS[metric])
@@ -68,10 +71,11 @@ def generate_report(request: ReportRequest, db: psycopg2.extensions.connection =
     query = f"""
         SELECT {', '.join(f'"{col}"' for col in db_columns)} 
         FROM forecast_data_wide
-        WHERE reading_date BETWEEN %s AND %s
+        WHERE reading_date <= $2 AND period_end >= $1
         ORDER BY reading_date;
     """
-    df = pd.read_sql_query(query, db, params=(request.startDate, request.endDate))
+    rows = await db.fetch(query, request.startDate, request.endDate)
+    df = pd.DataFrame([dict(row) for row in rows], columns=db_columns)
     if df.empty:
         raise HTTPException(status_code=404, detail="No data found for the selected date range.")
     
@@ -83,9 +87,18 @@ def generate_report(request: ReportRequest, db: psycopg2.extensions.connection =
     column_rename_map = {v: k for k, v in ALLOWED_METRICS.items() if v is not None}
     df.rename(columns=column_rename_map, inplace=True)
     final_column_list = ["reading_date", "month"] + request.metrics
+    # Weekly/monthly rows of a tiered forecast hold per-day means; say which period they cover
+    if (df["resolution"] != "day").any():
+        final_column_list[1:1] = ["period_end", "resolution"]
     columns_to_keep = [col for col in final_column_list if col in df.columns]
     df_final = df[columns_to_keep]
 
+    # Building the file is CPU-bound, so keep it off the event loop
+    return await run_in_threadpool(_build_report_response, df_final, request)
+
+
+def _build_report_response(df_final, request: ReportRequest):
+    """Renders the report DataFrame in the requested format."""
     # Generate the report in the requested format
     if request.format == 'csv':
         stream = io.StringIO()
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from datetime import date
+from datetime import date, datetime
 
 class KpiData(BaseModel):
     today_date: date
@@ -38,4 +38,15 @@ class ReportRequest(BaseModel):
 class ForecastDataPoint(BaseModel):
     reading_date: date
     prediction: float | None = None
-    type: str # NEW: To identify data as 'historical' or 'predicted'
\ No newline at end of file
+    type: str # NEW: To identify data as 'historical' or 'predicted'
+    resolution: str = "day" # 'day', 'week' or 'month' for far-future forecasts
+    period_end: date | None = None # Last day a weekly/monthly prediction covers
+
+class MeterReading(BaseModel):
+    metric: str # A power_data column, e.g. 'solar_generation'
+    reading_time: datetime
+    value: float # The day's running total for the meter at reading_time
+
+class IngestResponse(BaseModel):
+    accepted: int
+    pending: int
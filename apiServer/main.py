@@ -1,8 +1,29 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.routes import data, reports, forecasts 
+from app.routes import data, reports, forecasts, ingest
+from app.db.database import get_pool, close_pool
+from app.db.async_database import init_async_pool, close_async_pool, async_pool_metrics
+from app.db.write_buffer import reading_buffer
+from app.db.forecast_runs import run_watcher
+from app.plot_renderer import plot_renderer
+from app.cache import overview_cache
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await init_async_pool()
+    await run_watcher.start()
+    reading_buffer.start()
+    yield
+    # Write any buffered live readings, then release the pooled database connections
+    await reading_buffer.stop()
+    await run_watcher.stop()
+    await close_async_pool()
+    close_pool()
+    plot_renderer.close()
 
 app = FastAPI(
+    lifespan=lifespan,
     title="Power Intake and Utilization Prediction API",
     description="An API to serve historical and predicted power data.",
     version="1.0.0"
@@ -28,6 +49,22 @@ app.add_middleware(
 app.include_router(data.router, prefix="/api/v1")
 app.include_router(reports.router, prefix="/api/v1") # <-- Add this line
 app.include_router(forecasts.router, prefix="/api/v1") # <-- Add this line
+app.include_router(ingest.router, prefix="/api/v1")
+
+@app.get("/health/db-pool/")
+def db_pool_metrics():
+    pool = get_pool()
+    return {
+        "sync": pool.metrics() if pool else {"status": "unavailable"},
+        "async": async_pool_metrics(),
+    }
+
+@app.get("/health/cache/")
+def cache_metrics():
+    return {
+        "overview": overview_cache.metrics(),
+        "listening_for_publishes": run_watcher.listening,
+    }
 
 @app.get("/")
 def read_root():
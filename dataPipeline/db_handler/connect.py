@@ -8,16 +8,32 @@ from dotenv import load_dotenv
 # Load environment variables from .env file
 load_dotenv()
 
+# 'postgres' (default) or 'sqlite' for the embedded, file-based backend
+DB_BACKEND = os.getenv("DB_BACKEND", "postgres").lower()
+
+def get_dialect(conn):
+    """Returns 'sqlite' for connections of the embedded backend and 'postgres' otherwise."""
+    return getattr(conn, "dialect", "postgres")
+
+def get_connection_params():
+    """Returns the psycopg2 connection keyword arguments read from the environment."""
+    return dict(
+        host=os.getenv("DB_HOST"),
+        port=os.getenv("DB_PORT"),         # <-- Added port
+        database=os.getenv("DB_NAME"),
+        user=os.getenv("DB_USER"),
+        password=os.getenv("DB_PASSWORD")  # <-- Corrected variable name
+    )
+
 def get_db_connection():
-    """Establishes and returns a connection to the PostgreSQL database."""
+    """Establishes and returns a connection to the configured database (PostgreSQL unless DB_BACKEND=sqlite)."""
+    if DB_BACKEND == "sqlite":
+        from .sqlite_backend import connect_sqlite
+        conn = connect_sqlite()
+        print("Database connection successful (sqlite).")
+        return conn
     try:
-        conn = psycopg2.connect(
-            host=os.getenv("DB_HOST"),
-            port=os.getenv("DB_PORT"),         # <-- Added port
-            database=os.getenv("DB_NAME"),
-            user=os.getenv("DB_USER"),
-            password=os.getenv("DB_PASSWORD")  # <-- Corrected variable name
-        )
+        conn = psycopg2.connect(**get_connection_params())
         print("Database connection successful.")
         return conn
     except OperationalError as e:
@@ -1,55 +1,184 @@
 # db_handler/manage_db.py
 
+import io
+import time
 import pandas as pd
-from datetime import datetime
-
-def create_power_data_table(conn):
-    """Creates the power_data table if it does not already exist."""
-    # MODIFIED: Removed id and created_at columns
-    create_table_query = """
-    CREATE TABLE IF NOT EXISTS power_data (
-        month VARCHAR(20),
-        reading_date DATE,
-        tneb_campus_htsc_91 FLOAT,
-        tneb_new_stp_htsc_178 FLOAT,
-        solar_generation FLOAT,
-        diesel_generation FLOAT,
-        biogas_generation FLOAT,
-        staff_quarters_util FLOAT,
-        academic_blocks_util FLOAT,
-        hostels_util FLOAT,
-        chiller_plant_util FLOAT,
-        stp_util FLOAT,
-        total_consumption FLOAT
-    );
+
+from .connect import get_dialect
+
+# Column order of the power_data table, shared by the INSERT and COPY paths
+POWER_DATA_COLUMNS = [
+    "month", "reading_date", "tneb_campus_htsc_91", "tneb_new_stp_htsc_178",
+    "solar_generation", "diesel_generation", "biogas_generation",
+    "staff_quarters_util", "academic_blocks_util", "hostels_util",
+    "chiller_plant_util", "stp_util", "total_consumption"
+]
+
+# Days before the stored watermark that an incremental run re-checks for late corrections
+REVISION_WINDOW_DAYS = 7
+
+def get_watermark(conn, table_name='power_data'):
+    """Returns the latest reading_date loaded into table_name, or None before the first load."""
+    with conn.cursor() as cur:
+        cur.execute("SELECT high_water_mark FROM ingest_watermark WHERE table_name = %s;", (table_name,))
+        result = cur.fetchone()
+    return result[0] if result else None
+
+
+def _set_watermark(cur, high_water_mark, table_name='power_data'):
+    """Stores the new high-water mark; runs inside the caller's load transaction."""
+    # SQLite spells GREATEST as the two-argument MAX
+    greatest = "MAX" if get_dialect(cur.connection) == "sqlite" else "GREATEST"
+    cur.execute(f"""
+        INSERT INTO ingest_watermark (table_name, high_water_mark, updated_at)
+        VALUES (%s, %s, CURRENT_TIMESTAMP)
+        ON CONFLICT (table_name) DO UPDATE
+        SET high_water_mark = {greatest}(ingest_watermark.high_water_mark, EXCLUDED.high_water_mark),
+            updated_at = CURRENT_TIMESTAMP;
+    """, (table_name, high_water_mark))
+
+def insert_data_from_df(conn, df):
+    """Inserts a DataFrame in the power_data layout into the power_data table, one row at a time."""
+    insert_query = f"""
+    INSERT INTO power_data ({', '.join(POWER_DATA_COLUMNS)})
+    VALUES ({', '.join(['%s'] * len(POWER_DATA_COLUMNS))});
     """
+    rows = df[POWER_DATA_COLUMNS].astype(object).where(df[POWER_DATA_COLUMNS].notna(), None)
     with conn.cursor() as cur:
-        cur.execute(create_table_query)
+        for row in rows.itertuples(index=False):
+            cur.execute(insert_query, tuple(row))
         conn.commit()
-        print("✅ Table 'power_data' is ready.")
+        print(f"✅ Successfully inserted {len(df)} rows into the database.")
 
-# This function does not need to be changed
-def insert_data_from_df(conn, df):
-    """Inserts data from a pandas DataFrame into the power_data table."""
-    insert_query = """
-    INSERT INTO power_data (
-        month, reading_date, tneb_campus_htsc_91, tneb_new_stp_htsc_178,
-        solar_generation, diesel_generation, biogas_generation,
-        staff_quarters_util, academic_blocks_util, hostels_util,
-        chiller_plant_util, stp_util, total_consumption
-    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s);
+
+def copy_data_from_frames(conn, frames):
     """
+    Bulk loads DataFrame chunks into the power_data table with COPY FROM STDIN.
+
+    Each chunk is serialised to an in-memory CSV buffer and streamed to the
+    server in a single round trip, so only one chunk is held in memory at a time.
+    The whole load runs in one transaction.
+
+    Args:
+        conn: An open psycopg2 connection.
+        frames: An iterable of DataFrames in the power_data layout,
+            e.g. ``transform.read_transformed_chunks(path)``.
+
+    Returns:
+        int: The number of rows copied.
+    """
+    copy_query = f"COPY power_data ({', '.join(POWER_DATA_COLUMNS)}) FROM STDIN WITH (FORMAT csv)"
+    total_rows = 0
+    start = time.perf_counter()
+
     with conn.cursor() as cur:
-        for index, row in df.iterrows():
-            standardized_date_str = row['DATE'].replace('.', '/')
-            reading_date = datetime.strptime(standardized_date_str, '%d/%m/%Y').strftime('%Y-%m-%d')
-            
-            data_tuple = (
-                row['MONTH'], reading_date, row['TNEB Campus HTSC-91'], row['TNEB New STP HTSC-178'],
-                row['Power Generation by Solar Panels'], row['Power Generation by Diesel Engines'],
-                row['Power Generation by Biogas Engines'], row['Staff Quarters '], row['Academic blocks '],
-                row['Hostels'], row['Chiller plant'], row['STP'], row['Total Consumption (in units)']
-            )
-            cur.execute(insert_query, data_tuple)
+        for frame in frames:
+            buffer = io.StringIO()
+            frame.to_csv(buffer, index=False, header=False, date_format='%Y-%m-%d')
+            buffer.seek(0)
+            cur.copy_expert(copy_query, buffer)
+            total_rows += len(frame)
         conn.commit()
-        print(f"✅ Successfully inserted {len(df)} rows into the database.")
\ No newline at end of file
+
+    elapsed = time.perf_counter() - start
+    rate = total_rows / elapsed if elapsed > 0 else float('inf')
+    print(f"✅ Successfully copied {total_rows} rows in {elapsed:.2f}s ({rate:,.0f} rows/sec).")
+    return total_rows
+
+
+def upsert_data_from_frames(conn, frames, since=None):
+    """
+    Idempotently loads DataFrames into power_data, keyed on reading_date.
+
+    Rows dated on or before ``since`` are skipped without touching the
+    database. The remaining rows are COPY'd into a temporary staging table and
+    merged with a single INSERT ... ON CONFLICT statement that inserts new
+    dates and rewrites existing ones only when a value actually changed.
+    The watermark is advanced in the same transaction, so a failed run can
+    simply be repeated. On SQLite the last staged row of a date wins and the
+    staging table is dropped explicitly.
+
+    Args:
+        conn: An open psycopg2 connection.
+        frames: An iterable of DataFrames in the power_data layout.
+        since (date, optional): Only rows with a later reading_date are loaded.
+
+    Returns:
+        int: The number of rows inserted or updated.
+    """
+    column_list = ', '.join(POWER_DATA_COLUMNS)
+    value_columns = [c for c in POWER_DATA_COLUMNS if c != 'reading_date']
+    sqlite = get_dialect(conn) == "sqlite"
+    if sqlite:
+        create_staging = "CREATE TEMP TABLE power_data_staging AS SELECT * FROM power_data WHERE 0;"
+        select_staged = f"""
+        SELECT {column_list} FROM power_data_staging
+        WHERE rowid IN (SELECT MAX(rowid) FROM power_data_staging GROUP BY reading_date)
+        ORDER BY reading_date"""
+        distinct_from = "IS NOT"
+    else:
+        create_staging = "CREATE TEMP TABLE power_data_staging (LIKE power_data INCLUDING DEFAULTS) ON COMMIT DROP;"
+        select_staged = f"""
+        SELECT DISTINCT ON (reading_date) {column_list}
+        FROM power_data_staging
+        ORDER BY reading_date"""
+        distinct_from = "IS DISTINCT FROM"
+    upsert_query = f"""
+    INSERT INTO power_data ({column_list}){select_staged}
+    ON CONFLICT (reading_date) DO UPDATE
+    SET {', '.join(f'{c} = EXCLUDED.{c}' for c in value_columns)}
+    WHERE ({', '.join(f'power_data.{c}' for c in value_columns)})
+        {distinct_from} ({', '.join(f'EXCLUDED.{c}' for c in value_columns)});
+    """
+    since = pd.Timestamp(since) if since is not None else None
+    staged_rows = 0
+    high_water_mark = None
+    start = time.perf_counter()
+
+    with conn.cursor() as cur:
+        if sqlite:
+            # sqlite3 creates it outside the load transaction, so a failed run may have left it behind
+            cur.execute("DROP TABLE IF EXISTS temp.power_data_staging;")
+        cur.execute(create_staging)
+        for frame in frames:
+            if since is not None:
+                frame = frame[frame['reading_date'] > since]
+            if frame.empty:
+                continue
+            buffer = io.StringIO()
+            frame.to_csv(buffer, index=False, header=False, date_format='%Y-%m-%d')
+            buffer.seek(0)
+            cur.copy_expert(f"COPY power_data_staging ({column_list}) FROM STDIN WITH (FORMAT csv)", buffer)
+            staged_rows += len(frame)
+            chunk_max = frame['reading_date'].max()
+            high_water_mark = chunk_max if high_water_mark is None else max(high_water_mark, chunk_max)
+
+        changed_rows = 0
+        if staged_rows:
+            cur.execute(upsert_query)
+            changed_rows = cur.rowcount
+            _set_watermark(cur, high_water_mark.date())
+        if sqlite:
+            cur.execute("DROP TABLE temp.power_data_staging;")
+        conn.commit()
+
+    elapsed = time.perf_counter() - start
+    print(f"✅ Incremental load: staged {staged_rows} rows, {changed_rows} inserted or updated in {elapsed:.2f}s.")
+    return changed_rows
+
+
+def incremental_load(conn, frames, revision_window_days=REVISION_WINDOW_DAYS):
+    """
+    Loads only the new or recently revised dates from frames into power_data.
+
+    The stored watermark is moved back by ``revision_window_days`` so that
+    late corrections to the most recent readings are picked up as well.
+    """
+    watermark = get_watermark(conn)
+    since = None
+    if watermark is not None:
+        since = watermark - pd.Timedelta(days=revision_window_days)
+        print(f"Watermark is {watermark}; loading readings after {since}...")
+    else:
+        print("No watermark found; loading the full history...")
+    return upsert_data_from_frames(conn, frames, since=since)
@@ -0,0 +1,342 @@
+# db_handler/migrations.py
+
+from datetime import date
+
+from .connect import get_dialect
+
+# The eleven metrics the forecast pipeline writes, one "<metric>_pred" column
+# each in the wide layout and the first entries of the forecast_metrics registry
+FORECAST_METRIC_COLUMNS = [
+    "tneb_campus_htsc_91", "tneb_new_stp_htsc_178", "solar_generation",
+    "diesel_generation", "biogas_generation", "staff_quarters_util",
+    "academic_blocks_util", "hostels_util", "chiller_plant_util",
+    "stp_util", "total_consumption"
+]
+
+# Channel a publish NOTIFYs (with the new run id) when it moves the current run pointer
+FORECAST_PUBLISHED_CHANNEL = "forecast_published"
+
+
+def _now(dialect):
+    return "CURRENT_TIMESTAMP" if dialect == "sqlite" else "NOW()"
+
+
+def _create_power_data(cur, dialect):
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS power_data (
+        month VARCHAR(20),
+        reading_date DATE NOT NULL,
+        tneb_campus_htsc_91 FLOAT,
+        tneb_new_stp_htsc_178 FLOAT,
+        solar_generation FLOAT,
+        diesel_generation FLOAT,
+        biogas_generation FLOAT,
+        staff_quarters_util FLOAT,
+        academic_blocks_util FLOAT,
+        hostels_util FLOAT,
+        chiller_plant_util FLOAT,
+        stp_util FLOAT,
+        total_consumption FLOAT
+    );
+    """)
+
+
+def _add_power_data_reading_date_key(cur, dialect):
+    """
+    Adds the unique B-tree key on reading_date, which also serves every date-range query.
+
+    Tables filled by earlier append-only runs may hold the same date several
+    times, so duplicates are removed (keeping the most recently written row)
+    before the index is built.
+    """
+    if dialect == "sqlite":
+        cur.execute("""
+            DELETE FROM power_data WHERE rowid NOT IN (
+                SELECT MAX(rowid) FROM power_data GROUP BY reading_date
+            );
+        """)
+        if cur.rowcount:
+            print(f"  Removed {cur.rowcount} duplicate rows from 'power_data'.")
+        cur.execute("CREATE UNIQUE INDEX IF NOT EXISTS power_data_reading_date_key ON power_data (reading_date);")
+        return
+    cur.execute("SELECT to_regclass('power_data_reading_date_key');")
+    if cur.fetchone()[0] is not None:
+        return
+    cur.execute("""
+        DELETE FROM power_data a USING power_data b
+        WHERE a.reading_date = b.reading_date AND a.ctid < b.ctid;
+    """)
+    if cur.rowcount:
+        print(f"  Removed {cur.rowcount} duplicate rows from 'power_data'.")
+    cur.execute("ALTER TABLE power_data ALTER COLUMN reading_date SET NOT NULL;")
+    cur.execute("CREATE UNIQUE INDEX power_data_reading_date_key ON power_data (reading_date);")
+
+
+def _create_ingest_watermark(cur, dialect):
+    cur.execute(f"""
+        CREATE TABLE IF NOT EXISTS ingest_watermark (
+            table_name VARCHAR(63) PRIMARY KEY,
+            high_water_mark DATE NOT NULL,
+            updated_at TIMESTAMP NOT NULL DEFAULT {_now(dialect)}
+        );
+    """)
+
+
+def _partition_forecast_data_wide(cur, dialect):
+    """
+    Recreates forecast_data_wide as a table range-partitioned by year on reading_date.
+
+    Rows of an existing unpartitioned table are carried over so the API keeps
+    serving the current forecast until the next run replaces it. SQLite has no
+    partitioning, so there the table is a plain one keyed on reading_date.
+    """
+    if dialect == "sqlite":
+        column_definitions = ["reading_date DATE NOT NULL PRIMARY KEY", "month VARCHAR(20)"]
+        column_definitions += [f'"{col}_pred" FLOAT' for col in FORECAST_METRIC_COLUMNS]
+        cur.execute(f"CREATE TABLE IF NOT EXISTS forecast_data_wide ({', '.join(column_definitions)});")
+        return
+
+    cur.execute("SELECT to_regclass('forecast_data_wide');")
+    legacy_exists = cur.fetchone()[0] is not None
+    if legacy_exists:
+        cur.execute("ALTER TABLE forecast_data_wide RENAME TO forecast_data_wide_legacy;")
+        cur.execute("ALTER INDEX IF EXISTS forecast_data_wide_pkey RENAME TO forecast_data_wide_legacy_pkey;")
+
+    column_definitions = ["reading_date DATE NOT NULL", "month VARCHAR(20)"]
+    column_definitions += [f'"{col}_pred" FLOAT' for col in FORECAST_METRIC_COLUMNS]
+    column_definitions.append("PRIMARY KEY (reading_date)")
+    cur.execute(f"""
+        CREATE TABLE forecast_data_wide (
+            {', '.join(column_definitions)}
+        ) PARTITION BY RANGE (reading_date);
+    """)
+
+    if legacy_exists:
+        cur.execute("SELECT MIN(reading_date), MAX(reading_date) FROM forecast_data_wide_legacy;")
+        first, last = cur.fetchone()
+        if first is not None:
+            _create_yearly_partitions(cur, first.year, last.year)
+            cur.execute("""
+                SELECT column_name FROM information_schema.columns
+                WHERE table_name = 'forecast_data_wide_legacy';
+            """)
+            legacy_columns = {row[0] for row in cur.fetchall()}
+            shared = ", ".join(f'"{c}"' for c in ["reading_date", "month"] + [f"{m}_pred" for m in FORECAST_METRIC_COLUMNS] if c in legacy_columns)
+            cur.execute(f"INSERT INTO forecast_data_wide ({shared}) SELECT {shared} FROM forecast_data_wide_legacy;")
+        cur.execute("DROP TABLE forecast_data_wide_legacy;")
+
+
+def _add_forecast_resolution(cur, dialect):
+    """
+    Adds the period each forecast row covers, so long horizons can be stored
+    as weekly or monthly rows (reading_date is the period's first day).
+
+    Existing rows are daily ones covering just their own date.
+    """
+    if dialect == "sqlite":
+        cur.execute("ALTER TABLE forecast_data_wide ADD COLUMN resolution VARCHAR(10) NOT NULL DEFAULT 'day';")
+        cur.execute("ALTER TABLE forecast_data_wide ADD COLUMN period_end DATE;")
+    else:
+        cur.execute("""
+            ALTER TABLE forecast_data_wide
+                ADD COLUMN IF NOT EXISTS resolution VARCHAR(10) NOT NULL DEFAULT 'day',
+                ADD COLUMN IF NOT EXISTS period_end DATE;
+        """)
+    cur.execute("UPDATE forecast_data_wide SET period_end = reading_date WHERE period_end IS NULL;")
+
+
+def _month_name_sql(column, dialect):
+    if dialect == "sqlite":
+        names = ["January", "February", "March", "April", "May", "June", "July",
+                 "August", "September", "October", "November", "December"]
+        cases = " ".join(f"WHEN '{i:02d}' THEN '{name}'" for i, name in enumerate(names, 1))
+        return f"CASE strftime('%m', {column}) {cases} END"
+    return f"to_char({column}, 'FMMonth')"
+
+
+def create_forecast_view(cur, dialect):
+    """
+    (Re)creates forecast_data_wide as a view pivoting the current run of the
+    long-format store into one "<metric>_pred" column per registered metric.
+
+    Metric columns come last, in registry order, so a newly registered metric
+    only appends a column (which is all CREATE OR REPLACE VIEW allows).
+    """
+    cur.execute("SELECT metric_id, name FROM forecast_metrics ORDER BY metric_id;")
+    pivots = [f'MAX(CASE WHEN v.metric_id = {metric_id} THEN v.value END) AS "{name}_pred"' for metric_id, name in cur.fetchall()]
+    select = f"""
+        SELECT v.reading_date, {_month_name_sql('v.reading_date', dialect)} AS month,
+               CASE v.resolution WHEN 'w' THEN 'week' WHEN 'm' THEN 'month' ELSE 'day' END AS resolution,
+               v.period_end{''.join(', ' + p for p in pivots)}
+        FROM forecast_values v
+        WHERE v.run_id = (SELECT run_id FROM forecast_current_run)
+        GROUP BY v.reading_date, v.period_end, v.resolution
+    """
+    if dialect == "sqlite":
+        cur.execute("DROP VIEW IF EXISTS forecast_data_wide;")
+        cur.execute(f"CREATE VIEW forecast_data_wide AS {select};")
+    else:
+        cur.execute(f"CREATE OR REPLACE VIEW forecast_data_wide AS {select};")
+
+
+def _create_forecast_runs(cur, dialect):
+    """
+    Replaces the wide forecast table with a narrow, run-versioned store.
+
+    * forecast_metrics registers every forecast metric under a small integer id;
+    * forecast_runs records each publish, forecast_current_run points at the
+      one readers see;
+    * forecast_values holds one REAL per (run_id, metric_id, reading_date),
+      with period_end and a one-letter resolution ('d', 'w' or 'm').
+
+    On PostgreSQL forecast_values is list-partitioned by run, so a publish
+    loads a new partition and attaches it without touching the rows readers
+    use. forecast_data_wide becomes a view of the current run, and the rows
+    of the old table are carried over as run 1.
+    """
+    sqlite = dialect == "sqlite"
+    cur.execute(f"""
+        CREATE TABLE forecast_metrics (
+            metric_id {'INTEGER PRIMARY KEY' if sqlite else 'SMALLINT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY'},
+            name VARCHAR(63) NOT NULL UNIQUE
+        );
+    """)
+    cur.execute(f"""
+        CREATE TABLE forecast_runs (
+            run_id {'INTEGER PRIMARY KEY' if sqlite else 'INTEGER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY'},
+            created_at TIMESTAMP NOT NULL DEFAULT {_now(dialect)},
+            status VARCHAR(10) NOT NULL DEFAULT 'loading',
+            row_count INTEGER
+        );
+    """)
+    cur.execute("""
+        CREATE TABLE forecast_current_run (
+            singleton BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (singleton),
+            run_id INTEGER REFERENCES forecast_runs (run_id)
+        );
+    """)
+    cur.execute("INSERT INTO forecast_current_run (run_id) VALUES (NULL);")
+    cur.execute(f"""
+        CREATE TABLE forecast_values (
+            run_id INTEGER NOT NULL,
+            metric_id SMALLINT NOT NULL,
+            reading_date DATE NOT NULL,
+            period_end DATE NOT NULL,
+            value REAL,
+            resolution CHAR(1) NOT NULL DEFAULT 'd',
+            PRIMARY KEY (run_id, metric_id, reading_date)
+        ) {'WITHOUT ROWID' if sqlite else 'PARTITION BY LIST (run_id)'};
+    """)
+    # The primary key serves the per-metric reads, this index the per-date ones
+    cur.execute("CREATE INDEX forecast_values_run_date_idx ON forecast_values (run_id, reading_date);")
+
+    if sqlite:
+        cur.execute("PRAGMA table_info(forecast_data_wide);")
+        wide_columns = [row[1] for row in cur.fetchall()]
+    else:
+        cur.execute("SELECT column_name FROM information_schema.columns WHERE table_name = 'forecast_data_wide' ORDER BY ordinal_position;")
+        wide_columns = [row[0] for row in cur.fetchall()]
+    metrics = FORECAST_METRIC_COLUMNS + [c[:-len("_pred")] for c in wide_columns
+                                         if c.endswith("_pred") and c[:-len("_pred")] not in FORECAST_METRIC_COLUMNS]
+    cur.executemany("INSERT INTO forecast_metrics (name) VALUES (%s);", [(m,) for m in metrics])
+
+    cur.execute("SELECT COUNT(*) FROM forecast_data_wide;")
+    if cur.fetchone()[0]:
+        cur.execute("INSERT INTO forecast_runs (status) VALUES ('published') RETURNING run_id;")
+        run_id = cur.fetchone()[0]
+        if not sqlite:
+            cur.execute(f"CREATE TABLE forecast_values_r{run_id} PARTITION OF forecast_values FOR VALUES IN ({run_id});")
+        cur.execute("SELECT metric_id, name FROM forecast_metrics;")
+        for metric_id, name in cur.fetchall():
+            if f"{name}_pred" not in wide_columns:
+                continue
+            cur.execute(f"""
+                INSERT INTO forecast_values (run_id, metric_id, reading_date, period_end, value, resolution)
+                SELECT %s, %s, reading_date, COALESCE(period_end, reading_date), "{name}_pred", SUBSTR(resolution, 1, 1)
+                FROM forecast_data_wide WHERE "{name}_pred" IS NOT NULL;
+            """, (run_id, metric_id))
+        cur.execute("UPDATE forecast_runs SET row_count = (SELECT COUNT(*) FROM forecast_values WHERE run_id = %s) WHERE run_id = %s;", (run_id, run_id))
+        cur.execute("UPDATE forecast_current_run SET run_id = %s;", (run_id,))
+    cur.execute("DROP TABLE forecast_data_wide;")
+    create_forecast_view(cur, dialect)
+
+
+def _add_forecast_run_artifacts(cur, dialect):
+    """
+    Records which model artifact produced each metric's forecast in a run, as
+    a JSON object of metric name to model store key, so plots are drawn from
+    the models the published numbers came from. Runs stored before this have
+    no record.
+    """
+    cur.execute("ALTER TABLE forecast_runs ADD COLUMN artifact_keys TEXT;")
+
+
+# Ordered list of (version, description, step). A step is a function taking a
+# cursor and the dialect ('postgres' or 'sqlite') of its connection.
+# Never edit an applied migration; append a new one instead.
+MIGRATIONS = [
+    (1, "create power_data", _create_power_data),
+    (2, "unique B-tree key on power_data.reading_date", _add_power_data_reading_date_key),
+    (3, "create ingest_watermark", _create_ingest_watermark),
+    (4, "range-partition forecast_data_wide by year", _partition_forecast_data_wide),
+    (5, "resolution and period_end on forecast_data_wide", _add_forecast_resolution),
+    (6, "run-versioned long-format forecast store", _create_forecast_runs),
+    (7, "artifact_keys on forecast_runs", _add_forecast_run_artifacts),
+]
+
+
+def apply_migrations(conn):
+    """
+    Brings the database schema up to the latest version.
+
+    Each pending migration runs in its own transaction together with its
+    schema_migrations record, under an advisory lock so concurrent pipeline
+    runs cannot apply the same step twice. On SQLite the database-wide write
+    lock (BEGIN IMMEDIATE) plays the role of the advisory lock.
+
+    Returns:
+        int: The number of migrations applied.
+    """
+    dialect = get_dialect(conn)
+    with conn.cursor() as cur:
+        cur.execute(f"""
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version INTEGER PRIMARY KEY,
+                description TEXT NOT NULL,
+                applied_at TIMESTAMP NOT NULL DEFAULT {_now(dialect)}
+            );
+        """)
+        conn.commit()
+
+    applied = 0
+    for version, description, step in MIGRATIONS:
+        with conn.cursor() as cur:
+            if dialect == "sqlite":
+                cur.execute("BEGIN IMMEDIATE;")
+            else:
+                cur.execute("SELECT pg_advisory_xact_lock(hashtext('schema_migrations'));")
+            cur.execute("SELECT 1 FROM schema_migrations WHERE version = %s;", (version,))
+            if cur.fetchone():
+                conn.commit()
+                continue
+            print(f"Applying migration {version}: {description}...")
+            try:
+                step(cur, dialect)
+                cur.execute("INSERT INTO schema_migrations (version, description) VALUES (%s, %s);", (version, description))
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+        applied += 1
+
+    if applied:
+        print(f"✅ Applied {applied} migration(s).")
+    return applied
+
+
+def _create_yearly_partitions(cur, first_year, last_year, table_name='forecast_data_wide'):
+    for year in range(first_year, last_year + 1):
+        cur.execute(f"""
+            CREATE TABLE IF NOT EXISTS {table_name}_y{year} PARTITION OF {table_name}
+            FOR VALUES FROM ('{date(year, 1, 1)}') TO ('{date(year + 1, 1, 1)}');
+        """)
@@ -0,0 +1,191 @@
+# db_handler/pool.py
+
+import os
+import time
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from psycopg2 import OperationalError, extensions
+from psycopg2.pool import ThreadedConnectionPool
+
+from .connect import DB_BACKEND, get_connection_params
+
+# --- Configuration (read from the same .env as connect.py) ---
+POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN", "1"))
+POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX", "10"))
+# Seconds a caller waits for a free connection before giving up
+POOL_CHECKOUT_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+# Connections idle for longer than this are pinged before being handed out
+POOL_HEALTH_CHECK_IDLE = float(os.getenv("DB_POOL_HEALTH_CHECK_IDLE", "30"))
+# Server-side limit for every statement run on a pooled connection. Off by
+# default: the pipelines' bulk loads and publishes may legitimately run long
+# (the API limits its own queries, see API_STATEMENT_TIMEOUT_MS)
+STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))
+
+
+class ConnectionPool:
+    """
+    A thread-safe psycopg2 connection pool with health checks and metrics.
+
+    Callers block for up to ``checkout_timeout`` seconds when all ``maxconn``
+    connections are in use instead of failing straight away. Connections that
+    have been idle for a while are checked with ``SELECT 1`` before being
+    handed out and are replaced transparently if the server dropped them.
+    """
+
+    def __init__(self, minconn=POOL_MIN_SIZE, maxconn=POOL_MAX_SIZE,
+                 checkout_timeout=POOL_CHECKOUT_TIMEOUT, health_check_idle=POOL_HEALTH_CHECK_IDLE,
+                 statement_timeout_ms=STATEMENT_TIMEOUT_MS, **connect_kwargs):
+        if statement_timeout_ms:
+            connect_kwargs.setdefault("options", f"-c statement_timeout={statement_timeout_ms}")
+        self._pool = ThreadedConnectionPool(minconn, maxconn, **connect_kwargs)
+        self._slots = threading.BoundedSemaphore(maxconn)
+        self._lock = threading.Lock()
+        self._last_used = {}
+        self.maxconn = maxconn
+        self.checkout_timeout = checkout_timeout
+        self.health_check_idle = health_check_idle
+        self._stats = {
+            "checkouts": 0,
+            "in_use": 0,
+            "timeouts": 0,
+            "health_check_failures": 0,
+            "total_wait_seconds": 0.0,
+            "max_wait_seconds": 0.0,
+        }
+
+    def _is_healthy(self, conn):
+        if conn.closed:
+            return False
+        last_used = self._last_used.get(id(conn))
+        if last_used is None or time.monotonic() - last_used < self.health_check_idle:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1;")
+            conn.rollback()
+            return True
+        except Exception:
+            return False
+
+    def getconn(self):
+        """Checks out a healthy connection, waiting for a free slot if necessary."""
+        start = time.monotonic()
+        if not self._slots.acquire(timeout=self.checkout_timeout):
+            with self._lock:
+                self._stats["timeouts"] += 1
+            raise TimeoutError(f"No database connection became free within {self.checkout_timeout}s.")
+        waited = time.monotonic() - start
+
+        try:
+            conn = self._pool.getconn()
+            # After a server restart every idle connection is dead; each one is
+            # discarded until a live one turns up or the pool opens a new one
+            # (which is not checked, having never been idle)
+            while not self._is_healthy(conn):
+                with self._lock:
+                    self._stats["health_check_failures"] += 1
+                self._last_used.pop(id(conn), None)
+                self._pool.putconn(conn, close=True)
+                conn = self._pool.getconn()
+        except Exception:
+            self._slots.release()
+            raise
+
+        with self._lock:
+            self._stats["checkouts"] += 1
+            self._stats["in_use"] += 1
+            self._stats["total_wait_seconds"] += waited
+            self._stats["max_wait_seconds"] = max(self._stats["max_wait_seconds"], waited)
+        return conn
+
+    def putconn(self, conn):
+        """Returns a connection to the pool, rolling back any open transaction."""
+        close = bool(conn.closed)
+        if not close and conn.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+            try:
+                conn.rollback()
+            except Exception:
+                close = True
+        if close:
+            self._last_used.pop(id(conn), None)
+        else:
+            self._last_used[id(conn)] = time.monotonic()
+        self._pool.putconn(conn, close=close)
+        with self._lock:
+            self._stats["in_use"] -= 1
+        self._slots.release()
+
+    @contextmanager
+    def connection(self):
+        """Context manager that checks a connection out and always returns it."""
+        conn = self.getconn()
+        try:
+            yield conn
+        finally:
+            self.putconn(conn)
+
+    def metrics(self):
+        """Returns a snapshot of the pool counters."""
+        with self._lock:
+            stats = dict(self._stats)
+        stats["max_size"] = self.maxconn
+        stats["avg_wait_ms"] = round(1000 * stats["total_wait_seconds"] / stats["checkouts"], 3) if stats["checkouts"] else 0.0
+        stats["max_wait_ms"] = round(1000 * stats.pop("max_wait_seconds"), 3)
+        stats.pop("total_wait_seconds")
+        return stats
+
+    def closeall(self):
+        self._pool.closeall()
+
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+def get_pool():
+    """
+    Returns the process-wide connection pool, creating it on first use.
+
+    A pool is never shared across a fork; child processes build their own.
+    Returns None if the database cannot be reached. With DB_BACKEND=sqlite
+    the pool hands out connections to the embedded database file instead.
+    """
+    global _pool, _pool_pid
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            try:
+                if DB_BACKEND == "sqlite":
+                    from .sqlite_backend import SQLitePool
+                    _pool = SQLitePool(POOL_MAX_SIZE, POOL_CHECKOUT_TIMEOUT)
+                else:
+                    _pool = ConnectionPool(**get_connection_params())
+                _pool_pid = os.getpid()
+                print(f"Database connection pool ready ({DB_BACKEND}, min={POOL_MIN_SIZE}, max={POOL_MAX_SIZE}).")
+            except (OperationalError, sqlite3.Error) as e:
+                print(f"Could not connect to the database: {e}")
+                return None
+        return _pool
+
+@contextmanager
+def pooled_connection():
+    """
+    Borrows a connection from the shared pool for the duration of a with-block.
+
+    Yields None when the database is unreachable, mirroring get_db_connection().
+    """
+    pool = get_pool()
+    if pool is None:
+        yield None
+        return
+    with pool.connection() as conn:
+        yield conn
+
+def close_pool():
+    """Closes every connection held by the shared pool."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None and _pool_pid == os.getpid():
+            _pool.closeall()
+        _pool = None
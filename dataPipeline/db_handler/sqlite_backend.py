@@ -0,0 +1,266 @@
+# db_handler/sqlite_backend.py
+"""
+Embedded, file-based database backend built on SQLite.
+
+It implements the same power_data / forecast store contract as
+PostgreSQL closely enough that the pipeline, the forecasting job and the API
+run unchanged with ``DB_BACKEND=sqlite``:
+
+* connections and cursors accept psycopg2-style ``%s`` and asyncpg-style
+  ``$1`` placeholders and can be used as context managers;
+* ``cursor.copy_expert()`` understands ``COPY <table> (<cols>) FROM STDIN``
+  with CSV input;
+* DATE and TIMESTAMP columns come back as ``date`` / ``datetime`` objects.
+
+Statements that are specific to one engine (partitioning, advisory locks,
+``DISTINCT ON``...) are branched on ``connect.get_dialect(conn)`` by the caller.
+"""
+
+import os
+import re
+import csv
+import time
+import asyncio
+import sqlite3
+import threading
+from contextlib import contextmanager, asynccontextmanager
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+
+# --- Configuration ---
+DEFAULT_SQLITE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'localData', 'power.sqlite3')
+SQLITE_PATH = os.getenv("DB_SQLITE_PATH", DEFAULT_SQLITE_PATH)
+# Seconds a connection waits for another writer to release the database file
+SQLITE_BUSY_TIMEOUT = float(os.getenv("DB_SQLITE_BUSY_TIMEOUT", "30"))
+
+# --- Type conversion between Python and SQLite ---
+def _adapt_timestamp(ts):
+    # pandas represents calendar dates as midnight Timestamps; store those as plain dates
+    return ts.date().isoformat() if ts == ts.normalize() else ts.isoformat(sep=' ')
+
+sqlite3.register_adapter(date, date.isoformat)
+sqlite3.register_adapter(datetime, lambda dt: dt.isoformat(sep=' '))
+sqlite3.register_adapter(pd.Timestamp, _adapt_timestamp)
+for _type in (np.float64, np.float32):
+    sqlite3.register_adapter(_type, float)
+for _type in (np.int64, np.int32):
+    sqlite3.register_adapter(_type, int)
+sqlite3.register_converter("DATE", lambda raw: date.fromisoformat(raw.decode()[:10]))
+sqlite3.register_converter("TIMESTAMP", lambda raw: datetime.fromisoformat(raw.decode()))
+
+_PSYCOPG_PLACEHOLDER = re.compile(r"%s")
+_ASYNCPG_PLACEHOLDER = re.compile(r"\$(\d+)")
+_CURRENT_DATE = re.compile(r"\bCURRENT_DATE\b", re.IGNORECASE)
+_COPY_FROM_STDIN = re.compile(r"^\s*COPY\s+(\w+)\s*\(([^)]*)\)\s+FROM\s+STDIN\b", re.IGNORECASE)
+
+
+def translate_sql(query):
+    """Rewrites the PostgreSQL placeholders and CURRENT_DATE used across the repo for SQLite."""
+    query = _PSYCOPG_PLACEHOLDER.sub("?", query)
+    query = _ASYNCPG_PLACEHOLDER.sub(r"?\1", query)
+    # CURRENT_DATE is UTC in SQLite; the server's local date matches PostgreSQL and date.today()
+    return _CURRENT_DATE.sub("date('now', 'localtime')", query)
+
+
+class SQLiteCursor(sqlite3.Cursor):
+    """A sqlite3 cursor that behaves like the psycopg2 cursors used in db_handler."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def execute(self, query, params=()):
+        return super().execute(translate_sql(query), params)
+
+    def executemany(self, query, seq_of_params):
+        return super().executemany(translate_sql(query), seq_of_params)
+
+    def copy_expert(self, query, file):
+        """Emulates ``COPY <table> (<cols>) FROM STDIN WITH (FORMAT csv)`` with one executemany."""
+        match = _COPY_FROM_STDIN.match(query)
+        if not match:
+            raise sqlite3.NotSupportedError(f"Unsupported COPY statement: {query}")
+        table, columns = match.group(1), [c.strip() for c in match.group(2).split(',')]
+        insert_query = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['?'] * len(columns))})"
+        # As in PostgreSQL's CSV format, an empty unquoted field is NULL
+        rows = ([value if value != '' else None for value in row] for row in csv.reader(file))
+        super().executemany(insert_query, rows)
+
+
+class SQLiteConnection(sqlite3.Connection):
+    """A sqlite3 connection whose cursors are SQLiteCursor instances."""
+
+    dialect = "sqlite"
+
+    def cursor(self, factory=SQLiteCursor):
+        return super().cursor(factory)
+
+
+def connect_sqlite(path=None):
+    """Opens (and creates if needed) the embedded database file."""
+    path = path or SQLITE_PATH
+    if path != ":memory:":
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    conn = sqlite3.connect(
+        path,
+        timeout=SQLITE_BUSY_TIMEOUT,
+        detect_types=sqlite3.PARSE_DECLTYPES,
+        check_same_thread=False,
+        factory=SQLiteConnection,
+    )
+    # WAL lets the API keep reading while the pipeline writes
+    conn.execute("PRAGMA journal_mode=WAL;")
+    conn.execute("PRAGMA synchronous=NORMAL;")
+    return conn
+
+
+class SQLitePool:
+    """
+    Keeps a few open SQLite connections around, with the same interface and
+    metrics as pool.ConnectionPool.
+    """
+
+    def __init__(self, maxconn, checkout_timeout, path=None):
+        self.path = path or SQLITE_PATH
+        self.maxconn = maxconn
+        self.checkout_timeout = checkout_timeout
+        self._idle = []
+        self._slots = threading.BoundedSemaphore(maxconn)
+        self._lock = threading.Lock()
+        self._stats = {"checkouts": 0, "in_use": 0, "timeouts": 0, "health_check_failures": 0,
+                       "total_wait_seconds": 0.0, "max_wait_seconds": 0.0}
+        # Fail early, like psycopg2, when the file cannot be opened
+        self.putconn(self.getconn())
+        self._stats["checkouts"] = 0
+
+    def getconn(self):
+        start = time.monotonic()
+        if not self._slots.acquire(timeout=self.checkout_timeout):
+            with self._lock:
+                self._stats["timeouts"] += 1
+            raise TimeoutError(f"No database connection became free within {self.checkout_timeout}s.")
+        waited = time.monotonic() - start
+        with self._lock:
+            conn = self._idle.pop() if self._idle else None
+        if conn is None:
+            try:
+                conn = connect_sqlite(self.path)
+            except Exception:
+                self._slots.release()
+                raise
+        with self._lock:
+            self._stats["checkouts"] += 1
+            self._stats["in_use"] += 1
+            self._stats["total_wait_seconds"] += waited
+            self._stats["max_wait_seconds"] = max(self._stats["max_wait_seconds"], waited)
+        return conn
+
+    def putconn(self, conn):
+        if conn.in_transaction:
+            conn.rollback()
+        with self._lock:
+            self._idle.append(conn)
+            self._stats["in_use"] -= 1
+        self._slots.release()
+
+    @contextmanager
+    def connection(self):
+        conn = self.getconn()
+        try:
+            yield conn
+        finally:
+            self.putconn(conn)
+
+    def metrics(self):
+        with self._lock:
+            stats = dict(self._stats)
+        stats["max_size"] = self.maxconn
+        stats["avg_wait_ms"] = round(1000 * stats["total_wait_seconds"] / stats["checkouts"], 3) if stats["checkouts"] else 0.0
+        stats["max_wait_ms"] = round(1000 * stats.pop("max_wait_seconds"), 3)
+        stats.pop("total_wait_seconds")
+        return stats
+
+    def closeall(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+
+class AsyncSQLiteConnection:
+    """
+    The subset of asyncpg.Connection used by the API (fetch, fetchrow,
+    execute, executemany), running each call on a worker thread.
+
+    Rows are returned as dicts, which support the ``row["col"]``,
+    ``row.get()`` and ``dict(row)`` accesses the routes make on asyncpg records.
+    """
+
+    dialect = "sqlite"
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def _run(self, query, args, many=False):
+        cur = self._conn.cursor()
+        try:
+            if many:
+                cur.executemany(query, args)
+            else:
+                cur.execute(query, args)
+            rows = []
+            if cur.description:
+                columns = [d[0] for d in cur.description]
+                rows = [dict(zip(columns, row)) for row in cur.fetchall()]
+            # asyncpg runs every statement outside an explicit transaction in autocommit
+            self._conn.commit()
+            return rows
+        except Exception:
+            self._conn.rollback()
+            raise
+        finally:
+            cur.close()
+
+    async def fetch(self, query, *args):
+        return await asyncio.to_thread(self._run, query, args)
+
+    async def fetchrow(self, query, *args):
+        rows = await self.fetch(query, *args)
+        return rows[0] if rows else None
+
+    async def execute(self, query, *args):
+        await asyncio.to_thread(self._run, query, args)
+
+    async def executemany(self, query, args):
+        await asyncio.to_thread(self._run, query, list(args), True)
+
+
+class AsyncSQLitePool:
+    """Wraps a SQLitePool with the asyncpg.Pool methods used by the API."""
+
+    def __init__(self, maxconn, checkout_timeout, path=None):
+        self._pool = SQLitePool(maxconn, checkout_timeout, path)
+
+    @asynccontextmanager
+    async def acquire(self):
+        conn = await asyncio.to_thread(self._pool.getconn)
+        try:
+            yield AsyncSQLiteConnection(conn)
+        finally:
+            self._pool.putconn(conn)
+
+    def get_size(self):
+        return len(self._pool._idle) + self._pool.metrics()["in_use"]
+
+    def get_idle_size(self):
+        return len(self._pool._idle)
+
+    def get_max_size(self):
+        return self._pool.maxconn
+
+    async def close(self):
+        self._pool.closeall()
@@ -1,43 +1,71 @@
 # main.py
 
+import os
 import pandas as pd
-from db_handler.connect import get_db_connection
-from db_handler.manage_db import create_power_data_table, insert_data_from_df
+from db_handler.pool import pooled_connection, close_pool
+from db_handler.migrations import apply_migrations
+from db_handler.manage_db import insert_data_from_df, copy_data_from_frames, incremental_load
+from transform import read_transformed_chunks
+from process_data import arrow_file_path, read_arrow_chunks
 
 # --- Configuration ---
 CSV_FILE_PATH = 'cleanedData/data.csv'
+# 'csv' parses and transforms the cleaned CSV in chunks, 'arrow' memory-maps
+# the typed artifact written by process_data.py (run that first)
+SOURCE = os.getenv("PIPELINE_SOURCE", "csv")
+ARROW_FILE_PATH = arrow_file_path
+# 'incremental' upserts only dates after the stored watermark (safe to rerun),
+# 'copy' streams the whole CSV in chunks with COPY FROM STDIN,
+# 'insert' issues one INSERT per row
+LOAD_MODE = os.getenv("PIPELINE_LOAD_MODE", "incremental")
 
 def main():
     """Main function to run the data pipeline."""
     print("--- Starting Data to PostgreSQL Pipeline ---")
-    
-    # Step 1: Connect to the database
-    conn = get_db_connection()
-    if not conn:
-        print("Halting execution due to connection failure.")
+
+    if SOURCE not in ('csv', 'arrow'):
+        print(f"❌ Error: Unknown source '{SOURCE}'. Use 'csv' or 'arrow'.")
+        return
+    if SOURCE == 'arrow' and not os.path.exists(ARROW_FILE_PATH):
+        print(f"❌ Error: '{ARROW_FILE_PATH}' was not found. Run process_data.py first.")
         return
 
-    try:
-        # Step 2: Create the table if it doesn't exist
-        create_power_data_table(conn)
-        
-        # Step 3: Read data from the CSV file
-        print(f"Reading data from '{CSV_FILE_PATH}'...")
-        df = pd.read_csv(CSV_FILE_PATH)
-        
-        # Step 4: Insert data into the database
-        insert_data_from_df(conn, df)
-        
-    except FileNotFoundError:
-        print(f"❌ Error: The file '{CSV_FILE_PATH}' was not found.")
-    except Exception as e:
-        print(f"❌ An unexpected error occurred: {e}")
-    finally:
-        # Step 5: Always close the connection
-        if conn:
-            conn.close()
-            print("Database connection closed.")
-            
+    # Step 1: Borrow a connection from the shared pool
+    with pooled_connection() as conn:
+        if not conn:
+            print("Halting execution due to connection failure.")
+            return
+
+        try:
+            # Step 2: Bring the schema (tables and indexes) up to date
+            apply_migrations(conn)
+
+            # Step 3 & 4: Read the source data and load it into the database
+            if SOURCE == 'arrow':
+                print(f"Reading data from '{ARROW_FILE_PATH}'...")
+                frames = read_arrow_chunks(ARROW_FILE_PATH)
+            else:
+                print(f"Reading data from '{CSV_FILE_PATH}'...")
+                frames = read_transformed_chunks(CSV_FILE_PATH)
+
+            if LOAD_MODE == 'incremental':
+                incremental_load(conn, frames)
+            elif LOAD_MODE == 'copy':
+                copy_data_from_frames(conn, frames)
+            elif LOAD_MODE == 'insert':
+                insert_data_from_df(conn, pd.concat(frames, ignore_index=True))
+            else:
+                print(f"❌ Error: Unknown load mode '{LOAD_MODE}'. Use 'incremental', 'copy' or 'insert'.")
+
+        except FileNotFoundError:
+            print(f"❌ Error: The file '{CSV_FILE_PATH}' was not found.")
+        except Exception as e:
+            print(f"❌ An unexpected error occurred: {e}")
+
+    # Step 5: Always close the pooled connections
+    close_pool()
+    print("Database connections closed.")
+
     print("--- Pipeline Finished ---")
 
 if __name__ == '__main__':
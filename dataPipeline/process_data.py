@@ -1,9 +1,29 @@
 import pandas as pd
 import os
+import json
+import hashlib
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+
+import pyarrow as pa
+import pyarrow.feather as feather
+from openpyxl import load_workbook
+
+from transform import transform_frame, normalize_headers, parse_dates, CHUNK_SIZE, DATE_COLUMN, REJECT_FILE_PATH
 
 input_file_path = 'data/data.xlsx'
+# The daily readings; the other sheets are monthly reports and an older
+# database export. convert_excel_to_csv reads the same sheet.
+data_sheet_names = ['Current Year']
+# Excel turned day-first text such as '05/01/2025' into real dates (1 May).
+# Writing such cells back out the way Excel shows them lets parse_dates read
+# them day-first like the rest of the column, or reject them.
+excel_date_display_format = '%m/%d/%Y'
 output_folder_path = 'cleanedData'
 output_file_path = os.path.join(output_folder_path, 'data.csv')
+# Uncompressed Arrow IPC so the loader can memory-map it instead of parsing text
+arrow_file_path = os.path.join(output_folder_path, 'data.arrow')
+manifest_file_path = os.path.join(output_folder_path, 'data.manifest.json')
 
 def convert_excel_to_csv():
     """
@@ -16,7 +36,7 @@ def convert_excel_to_csv():
     os.makedirs(output_folder_path, exist_ok=True)
 
     try:
-        df = pd.read_excel(input_file_path)
+        df = pd.read_excel(input_file_path, sheet_name=data_sheet_names[0])
 
         df.to_csv(output_file_path, index=False)
 
@@ -25,5 +45,211 @@ def convert_excel_to_csv():
     except Exception as e:
         print(f"An error occurred: {e}")
 
+
+def _file_sha256(path):
+    """Hashes a file in 1 MiB blocks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _load_manifest():
+    if not os.path.exists(manifest_file_path):
+        return None
+    with open(manifest_file_path) as f:
+        return json.load(f)
+
+
+def _save_manifest(manifest):
+    with open(manifest_file_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+
+def workbook_is_unchanged():
+    """
+    Returns True when the Arrow artifact was built from the current workbook.
+
+    The cheap mtime/size check is tried first; if it fails the workbook is
+    hashed, so a touched but otherwise identical file is still skipped.
+    """
+    manifest = _load_manifest()
+    if manifest is None or not os.path.exists(arrow_file_path):
+        return False
+    if manifest.get('sheets') != data_sheet_names:
+        return False
+
+    stat = os.stat(input_file_path)
+    if stat.st_mtime_ns == manifest.get('mtime_ns') and stat.st_size == manifest.get('size'):
+        return True
+
+    if _file_sha256(input_file_path) == manifest.get('sha256'):
+        manifest.update(mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+        _save_manifest(manifest)
+        return True
+    return False
+
+
+def _sheet_to_frame(rows):
+    """
+    Builds a DataFrame from the raw rows of one worksheet.
+
+    The sheets use a two-row header: group titles such as 'DATE' on the first
+    row and the meter names underneath. The header starts at the first row
+    containing a 'DATE' cell; a column takes its sub-header when present and
+    the group title otherwise. Returns None for sheets without a DATE column
+    (the monthly report sheets).
+    """
+    rows = iter(rows)
+    for header in rows:
+        if any(isinstance(v, str) and v.strip().upper() == 'DATE' for v in header):
+            break
+    else:
+        return None
+
+    sub_header = next(rows, ())
+    names = []
+    for i, top in enumerate(header):
+        sub = sub_header[i] if i < len(sub_header) else None
+        name = sub if sub is not None else top
+        names.append(str(name) if name is not None else None)
+
+    date_index = next(i for i, n in enumerate(names) if n is not None and n.strip().upper() == 'DATE')
+    keep = [i for i, n in enumerate(names) if n is not None and n not in names[:i]]
+    records = []
+    for row in rows:
+        if date_index >= len(row) or row[date_index] is None:
+            continue
+        record = [row[i] if i < len(row) else None for i in keep]
+        date_value = row[date_index]
+        if isinstance(date_value, datetime):
+            record[keep.index(date_index)] = date_value.strftime(excel_date_display_format)
+        records.append(record)
+
+    df = pd.DataFrame(records, columns=[names[i] for i in keep])
+    return df.astype({names[date_index]: 'string'})
+
+
+def _read_sheet(path, sheet_name):
+    """Streams one worksheet in read-only mode; runs inside a worker process."""
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        return sheet_name, _sheet_to_frame(workbook[sheet_name].iter_rows(values_only=True))
+    finally:
+        workbook.close()
+
+
+def read_workbook_parallel(path, sheet_names=None, max_workers=None):
+    """
+    Reads the daily-data sheets of a workbook, one worker process per sheet.
+
+    Each worker opens the workbook in openpyxl's read-only streaming mode, so
+    memory use is bounded by a single sheet rather than the whole file.
+
+    Args:
+        path (str): The workbook.
+        sheet_names (list, optional): Sheets to read; defaults to data_sheet_names.
+        max_workers (int, optional): Worker processes; one per sheet by default.
+
+    Returns:
+        pd.DataFrame: Rows of the daily sheets with flattened source headers.
+    """
+    sheet_names = sheet_names or data_sheet_names
+
+    max_workers = max_workers or min(len(sheet_names), os.cpu_count() or 1)
+    if max_workers > 1 and len(sheet_names) > 1:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            results = list(pool.map(_read_sheet, [path] * len(sheet_names), sheet_names))
+    else:
+        results = [_read_sheet(path, name) for name in sheet_names]
+
+    frames = []
+    for sheet_name, df in results:
+        if df is None:
+            print(f"  Skipping sheet '{sheet_name}' (no DATE column).")
+            continue
+        print(f"  Read {len(df)} rows from sheet '{sheet_name}'.")
+        frames.append(df)
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+
+def sheet_date_range(source_df):
+    """
+    Returns the calendar year most of the rows are dated in, as (first, last).
+
+    A dragged fill series leaves some rows with the wrong year ('30.06.2026'
+    among the 2025 readings); the range lets transform_frame reject them.
+    """
+    years = parse_dates(normalize_headers(source_df)[DATE_COLUMN]).dt.year.dropna()
+    if years.empty:
+        return None
+    year = int(years.mode().iloc[0])
+    return datetime(year, 1, 1), datetime(year, 12, 31)
+
+
+def convert_excel_to_arrow(force=False, reject_path=REJECT_FILE_PATH):
+    """
+    Converts the workbook into a typed Arrow IPC file in the power_data layout.
+
+    The step is skipped when the workbook is unchanged since the last run.
+    Rows that fail the transform, or are dated outside the year the sheet
+    covers, go to the reject file.
+
+    Returns:
+        bool: True if the artifact was rebuilt, False if it was up to date or failed.
+    """
+    if not os.path.exists(input_file_path):
+        print(f"Error: Input file not found at '{input_file_path}'")
+        return False
+
+    if not force and workbook_is_unchanged():
+        print(f"'{arrow_file_path}' is up to date with '{input_file_path}'; skipping conversion.")
+        return False
+
+    os.makedirs(output_folder_path, exist_ok=True)
+
+    try:
+        source_df = read_workbook_parallel(input_file_path)
+        df = transform_frame(source_df, reject_path=reject_path, date_range=sheet_date_range(source_df))
+        df['reading_date'] = df['reading_date'].dt.date
+        table = pa.Table.from_pandas(df, preserve_index=False)
+
+        tmp_path = arrow_file_path + '.tmp'
+        feather.write_feather(table, tmp_path, compression='uncompressed', chunksize=CHUNK_SIZE)
+        os.replace(tmp_path, arrow_file_path)
+
+        stat = os.stat(input_file_path)
+        _save_manifest({
+            'source': input_file_path,
+            'mtime_ns': stat.st_mtime_ns,
+            'size': stat.st_size,
+            'sha256': _file_sha256(input_file_path),
+            'sheets': data_sheet_names,
+            'rows': len(df),
+        })
+        print(f"Successfully converted '{input_file_path}' to '{arrow_file_path}' ({len(df)} rows)")
+        return True
+
+    except Exception as e:
+        print(f"An error occurred: {e}")
+        return False
+
+
+def read_arrow_chunks(path=arrow_file_path):
+    """
+    Memory-maps the Arrow artifact and yields one DataFrame per record batch.
+
+    Only the batch being converted is materialised, so memory stays flat
+    regardless of the size of the file.
+    """
+    with pa.memory_map(path, 'r') as source:
+        reader = pa.ipc.open_file(source)
+        for i in range(reader.num_record_batches):
+            df = reader.get_batch(i).to_pandas()
+            # Same resolution as transform_frame's parsed dates
+            df['reading_date'] = pd.to_datetime(df['reading_date']).dt.as_unit('us')
+            yield df
+
 if __name__ == '__main__':
-    convert_excel_to_csv()
\ No newline at end of file
+    convert_excel_to_arrow()
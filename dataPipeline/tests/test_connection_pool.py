@@ -0,0 +1,75 @@
+import sys
+import os
+
+import pytest
+
+# Add project root to sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from db_handler.connect import DB_BACKEND, get_connection_params, get_db_connection
+from db_handler.pool import ConnectionPool, get_pool, pooled_connection, close_pool
+
+def test_pool_reuses_connections():
+    """
+    Tests that consecutive checkouts reuse the same pooled connection and are counted.
+    """
+    print("Running test: test_pool_reuses_connections...")
+    if DB_BACKEND == "sqlite":
+        pytest.skip("Backend sessions are only checked on PostgreSQL.")
+    if get_pool() is None:
+        pytest.skip("Could not connect to the database.")
+    try:
+        with pooled_connection() as first:
+            assert first is not None, "Pool could not hand out a connection."
+            first_backend = first.get_backend_pid()
+        with pooled_connection() as second:
+            assert second.get_backend_pid() == first_backend, "Connection was not reused."
+            with second.cursor() as cur:
+                cur.execute("SHOW statement_timeout;")
+                print(f"  statement_timeout = {cur.fetchone()[0]}")
+
+        metrics = get_pool().metrics()
+        assert metrics["checkouts"] >= 2, "Checkouts were not counted."
+        assert metrics["in_use"] == 0, "Connections were not returned to the pool."
+        print(f"  Pool metrics: {metrics}")
+        print("✅ PASS: Pooled connections are reused.")
+    finally:
+        close_pool()
+
+def test_dead_idle_connections_are_replaced():
+    """
+    Tests that after every idle connection was killed (as by a server
+    restart) the next checkout still gets a working connection.
+    """
+    print("Running test: test_dead_idle_connections_are_replaced...")
+    if DB_BACKEND == "sqlite":
+        pytest.skip("Backend sessions are only checked on PostgreSQL.")
+    admin = get_db_connection()
+    if admin is None:
+        pytest.skip("Could not connect to the database.")
+    pool = ConnectionPool(minconn=3, maxconn=3, health_check_idle=0, **get_connection_params())
+    try:
+        idle = [pool.getconn() for _ in range(3)]
+        pids = [conn.get_backend_pid() for conn in idle]
+        for conn in idle:
+            pool.putconn(conn)
+        with admin.cursor() as cur:
+            cur.execute("SELECT pg_terminate_backend(pid) FROM unnest(%s) AS pid;", (pids,))
+        admin.commit()
+
+        with pool.connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1;")
+                assert cur.fetchone()[0] == 1
+            assert conn.get_backend_pid() not in pids, "A killed connection was handed out."
+        metrics = pool.metrics()
+        assert metrics["health_check_failures"] == 3, f"Expected 3 failed health checks, got {metrics}"
+        print("✅ PASS: Dead idle connections are replaced.")
+    finally:
+        pool.closeall()
+        admin.close()
+
+if __name__ == "__main__":
+    print("--- Starting Connection Pool Test ---")
+    test_pool_reuses_connections()
+    test_dead_idle_connections_are_replaced()
+    print("--- Finished Connection Pool Test ---")
@@ -0,0 +1,83 @@
+# tests/test_index_usage.py
+import sys
+import os
+from datetime import date
+
+import pytest
+
+# Add project root to sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from db_handler.connect import DB_BACKEND, get_db_connection
+from db_handler.migrations import apply_migrations
+
+def _connect():
+    """Connects to PostgreSQL, skipping the test when there is no server to plan on."""
+    if DB_BACKEND == "sqlite":
+        pytest.skip("Query plans are only checked on PostgreSQL.")
+    conn = get_db_connection()
+    if conn is None:
+        pytest.skip("Could not connect to the database.")
+    return conn
+
+def _plan_nodes(plan):
+    """Flattens an EXPLAIN (FORMAT JSON) plan into a list of its nodes."""
+    nodes = [plan]
+    for child in plan.get("Plans", []):
+        nodes.extend(_plan_nodes(child))
+    return nodes
+
+def _explain(cur, query, params):
+    # The tables are small in development, so make sure the planner reports
+    # whether an index *can* serve the query rather than its cheapest plan.
+    cur.execute("SET LOCAL enable_seqscan = off;")
+    cur.execute(f"EXPLAIN (FORMAT JSON) {query}", params)
+    return _plan_nodes(cur.fetchone()[0][0]["Plan"])
+
+def test_power_data_range_uses_index():
+    """
+    Checks that a reading_date range query on power_data is served by an index.
+    """
+    print("\nRunning test: test_power_data_range_uses_index...")
+    conn = _connect()
+    try:
+        apply_migrations(conn)
+        with conn.cursor() as cur:
+            nodes = _explain(cur, "SELECT * FROM power_data WHERE reading_date BETWEEN %s AND %s;",
+                             (date(2025, 1, 1), date(2025, 3, 31)))
+            scans = {n["Node Type"] for n in nodes if "Scan" in n["Node Type"]}
+            assert scans and "Seq Scan" not in scans, f"Expected an index scan, got {scans}"
+            print(f"✅ PASS: power_data range query uses {scans}.")
+        conn.rollback()
+    finally:
+        conn.close()
+
+def test_forecast_metric_range_uses_run_partition():
+    """
+    Checks that a metric's date range in one run of forecast_values only
+    touches that run's partition and reads it through the primary key index.
+    """
+    print("\nRunning test: test_forecast_metric_range_uses_run_partition...")
+    conn = _connect()
+    try:
+        apply_migrations(conn)
+        with conn.cursor() as cur:
+            # Throwaway partitions, rolled back below
+            for run_id in (900001, 900002):
+                cur.execute(f"CREATE TABLE forecast_values_r{run_id} PARTITION OF forecast_values FOR VALUES IN ({run_id});")
+            nodes = _explain(cur, "SELECT * FROM forecast_values WHERE run_id = %s AND metric_id = %s AND reading_date BETWEEN %s AND %s;",
+                             (900002, 1, date(2026, 1, 1), date(2026, 12, 31)))
+            relations = {n["Relation Name"] for n in nodes if "Relation Name" in n}
+            scans = {n["Node Type"] for n in nodes if "Scan" in n["Node Type"]}
+            assert relations == {"forecast_values_r900002"}, f"Scanned partitions of other runs: {relations}"
+            assert "Seq Scan" not in scans, f"Expected an index scan, got {scans}"
+            print(f"✅ PASS: forecast metric query touches {relations} via {scans}.")
+        conn.rollback()
+    finally:
+        conn.close()
+
+# --- Main execution block ---
+if __name__ == "__main__":
+    print("--- Starting Index Usage Tests ---")
+    test_power_data_range_uses_index()
+    test_forecast_metric_range_uses_run_partition()
+    print("\n--- Finished Index Usage Tests ---")
@@ -0,0 +1,57 @@
+# tests/test_process_data.py
+import sys
+import os
+import tempfile
+
+# Add project root to sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+import process_data
+from transform import transform_frame
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WORKBOOK_PATH = os.path.join(PROJECT_DIR, 'data', 'data.xlsx')
+CSV_FILE_PATH = os.path.join(PROJECT_DIR, 'cleanedData', 'data.csv')
+
+def test_arrow_matches_csv(monkeypatch):
+    """
+    Checks that the Arrow artifact built from the sample workbook holds the same
+    rows as the cleaned CSV, and that the rows the workbook dates in the wrong
+    year are rejected rather than loaded.
+    """
+    print("\nRunning test: test_arrow_matches_csv...")
+    out_dir = tempfile.mkdtemp()
+    monkeypatch.setattr(process_data, 'input_file_path', WORKBOOK_PATH)
+    monkeypatch.setattr(process_data, 'output_folder_path', out_dir)
+    monkeypatch.setattr(process_data, 'arrow_file_path', os.path.join(out_dir, 'data.arrow'))
+    monkeypatch.setattr(process_data, 'manifest_file_path', os.path.join(out_dir, 'data.manifest.json'))
+    reject_path = os.path.join(out_dir, 'rejected_rows.csv')
+
+    assert process_data.convert_excel_to_arrow(reject_path=reject_path), "The workbook was not converted."
+    arrow_df = pd.concat(process_data.read_arrow_chunks(process_data.arrow_file_path), ignore_index=True)
+    csv_df = transform_frame(pd.read_csv(CSV_FILE_PATH, dtype={'DATE': 'string'}), reject_path=None)
+    rejects = pd.read_csv(reject_path, dtype={'DATE': 'string'})
+
+    assert arrow_df['reading_date'].is_unique, "The Arrow artifact has duplicate dates."
+    assert arrow_df['reading_date'].dt.year.eq(2025).all(), "The Arrow artifact has dates outside 2025."
+    assert set(rejects['reject_reason']) == {'out-of-range reading_date'}
+    assert len(arrow_df) + len(rejects) == len(csv_df), "Rows were lost without being rejected."
+    expected = csv_df[csv_df['reading_date'].isin(arrow_df['reading_date'])].reset_index(drop=True)
+    pd.testing.assert_frame_equal(arrow_df, expected)
+    print("✅ PASS: The Arrow artifact matches the cleaned CSV.")
+
+def test_unchanged_workbook_is_skipped(monkeypatch):
+    """
+    Checks that a second conversion of an unchanged workbook is skipped.
+    """
+    print("\nRunning test: test_unchanged_workbook_is_skipped...")
+    out_dir = tempfile.mkdtemp()
+    monkeypatch.setattr(process_data, 'input_file_path', WORKBOOK_PATH)
+    monkeypatch.setattr(process_data, 'output_folder_path', out_dir)
+    monkeypatch.setattr(process_data, 'arrow_file_path', os.path.join(out_dir, 'data.arrow'))
+    monkeypatch.setattr(process_data, 'manifest_file_path', os.path.join(out_dir, 'data.manifest.json'))
+
+    assert process_data.convert_excel_to_arrow(reject_path=None)
+    assert not process_data.convert_excel_to_arrow(reject_path=None), "An unchanged workbook was converted again."
+    print("✅ PASS: The unchanged workbook was skipped.")
@@ -0,0 +1,84 @@
+import sys
+import os
+import asyncio
+import tempfile
+from datetime import date
+
+import pandas as pd
+
+# Add project root to sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from db_handler.sqlite_backend import connect_sqlite, AsyncSQLitePool
+from db_handler.migrations import apply_migrations
+from db_handler.manage_db import POWER_DATA_COLUMNS, get_watermark, incremental_load, copy_data_from_frames
+
+def _sample_frame(days=10):
+    dates = pd.date_range("2025-01-01", periods=days, freq="D")
+    frame = pd.DataFrame({c: [float(i) for i in range(days)] for c in POWER_DATA_COLUMNS[2:]})
+    frame.insert(0, "reading_date", dates)
+    frame.insert(0, "month", dates.strftime("%B"))
+    frame.loc[3, "solar_generation"] = None
+    return frame[POWER_DATA_COLUMNS]
+
+def test_sqlite_incremental_load():
+    """
+    Tests that the embedded backend runs the migrations and an idempotent incremental load.
+    """
+    print("Running test: test_sqlite_incremental_load...")
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = connect_sqlite(os.path.join(tmp, "power.sqlite3"))
+        try:
+            assert apply_migrations(conn) > 0, "No migrations were applied."
+            assert apply_migrations(conn) == 0, "Migrations were applied twice."
+
+            frame = _sample_frame()
+            assert incremental_load(conn, [frame]) == 10, "First load should insert every row."
+            assert get_watermark(conn) == date(2025, 1, 10), "Watermark was not stored as a date."
+            assert incremental_load(conn, [frame]) == 0, "Reloading unchanged rows should change nothing."
+
+            frame.loc[9, "total_consumption"] = 99.0
+            assert incremental_load(conn, [frame]) == 1, "Only the revised row should be rewritten."
+
+            with conn.cursor() as cur:
+                cur.execute("SELECT reading_date, solar_generation, total_consumption FROM power_data WHERE reading_date BETWEEN %s AND %s ORDER BY reading_date;",
+                            (date(2025, 1, 4), date(2025, 1, 10)))
+                rows = cur.fetchall()
+            assert rows[0] == (date(2025, 1, 4), None, 3.0), f"Unexpected first row {rows[0]}"
+            assert rows[-1][2] == 99.0, "Revised value was not stored."
+            print("✅ PASS: Incremental load works on the embedded backend.")
+        finally:
+            conn.close()
+
+def test_sqlite_copy_and_async_fetch():
+    """
+    Tests the emulated COPY path and the asyncpg-style connection used by the API.
+    """
+    print("Running test: test_sqlite_copy_and_async_fetch...")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "power.sqlite3")
+        conn = connect_sqlite(path)
+        try:
+            apply_migrations(conn)
+            assert copy_data_from_frames(conn, [_sample_frame(5)]) == 5
+        finally:
+            conn.close()
+
+        async def fetch():
+            pool = AsyncSQLitePool(2, 5, path)
+            async with pool.acquire() as db:
+                rows = await db.fetch("SELECT reading_date, hostels_util FROM power_data WHERE reading_date >= $1 ORDER BY reading_date;", date(2025, 1, 4))
+                missing = await db.fetchrow("SELECT * FROM forecast_data_wide WHERE reading_date = $1;", date(2025, 1, 4))
+            await pool.close()
+            return rows, missing
+
+        rows, missing = asyncio.run(fetch())
+        assert [dict(r) for r in rows] == [{"reading_date": date(2025, 1, 4), "hostels_util": 3.0},
+                                           {"reading_date": date(2025, 1, 5), "hostels_util": 4.0}], rows
+        assert missing is None, "An empty result should give None like asyncpg's fetchrow."
+        print("✅ PASS: COPY emulation and async fetch work on the embedded backend.")
+
+if __name__ == "__main__":
+    print("--- Starting SQLite Backend Tests ---")
+    test_sqlite_incremental_load()
+    test_sqlite_copy_and_async_fetch()
+    print("--- Finished SQLite Backend Tests ---")
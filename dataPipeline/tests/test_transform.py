@@ -0,0 +1,53 @@
+# tests/test_transform.py
+import sys
+import os
+import tempfile
+
+# Add project root to sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+from transform import transform_frame
+from db_handler.manage_db import POWER_DATA_COLUMNS
+
+CSV_FILE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'cleanedData', 'data.csv')
+
+def test_transform_matches_csv():
+    """
+    Checks that every row of the cleaned CSV transforms into the power_data layout.
+    """
+    print("\nRunning test: test_transform_matches_csv...")
+    df = pd.read_csv(CSV_FILE_PATH, dtype={'DATE': 'string'})
+    transformed = transform_frame(df, reject_path=None)
+
+    assert list(transformed.columns) == POWER_DATA_COLUMNS, "Columns are not in power_data order."
+    assert len(transformed) == len(df), "Valid rows were rejected."
+    assert transformed['reading_date'].iloc[0] == pd.Timestamp(2025, 6, 30), "First date was parsed incorrectly."
+    assert transformed['total_consumption'].iloc[0] == df['Total Consumption (in units)'].iloc[0], "Total consumption mismatch"
+    print("✅ PASS: CSV transforms into the power_data layout.")
+
+def test_bad_rows_go_to_reject_file():
+    """
+    Checks that unparsable rows are written to the reject file instead of aborting the load.
+    """
+    print("\nRunning test: test_bad_rows_go_to_reject_file...")
+    df = pd.read_csv(CSV_FILE_PATH, dtype={'DATE': 'string'}).head(4).astype(object)
+    df.loc[1, 'DATE'] = '31.02.2025'
+    df.loc[2, 'Hostels'] = 'n/a'
+    df.loc[3, 'STP'] = ' 1,413 '
+
+    reject_path = os.path.join(tempfile.mkdtemp(), 'rejected_rows.csv')
+    transformed = transform_frame(df, reject_path=reject_path)
+    rejects = pd.read_csv(reject_path)
+
+    assert len(transformed) == 2, f"Expected 2 valid rows, got {len(transformed)}"
+    assert transformed['stp_util'].iloc[1] == 1413, "Thousands separator was not handled."
+    assert list(rejects['reject_reason']) == ['invalid reading_date', 'non-numeric hostels_util']
+    print("✅ PASS: Bad rows were rejected with a reason.")
+
+# --- Main execution block ---
+if __name__ == "__main__":
+    print("--- Starting Transform Tests ---")
+    test_transform_matches_csv()
+    test_bad_rows_go_to_reject_file()
+    print("\n--- Finished Transform Tests ---")
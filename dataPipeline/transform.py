@@ -0,0 +1,136 @@
+# transform.py
+
+import os
+import pandas as pd
+from db_handler.manage_db import POWER_DATA_COLUMNS
+
+# --- Configuration ---
+# Source header -> power_data column. Headers are matched case-insensitively with
+# surrounding whitespace stripped, since the Excel sheets pad some of them
+# (e.g. 'Staff Quarters ' and 'Academic blocks ') and spell 'MONTH' differently.
+COLUMN_MAP = {
+    'MONTH': 'month',
+    'DATE': 'reading_date',
+    'TNEB Campus HTSC-91': 'tneb_campus_htsc_91',
+    'TNEB New STP HTSC-178': 'tneb_new_stp_htsc_178',
+    'Power Generation by Solar Panels': 'solar_generation',
+    'Power Generation by Diesel Engines': 'diesel_generation',
+    'Power Generation by Biogas Engines': 'biogas_generation',
+    'Staff Quarters': 'staff_quarters_util',
+    'Academic blocks': 'academic_blocks_util',
+    'Hostels': 'hostels_util',
+    'Chiller plant': 'chiller_plant_util',
+    'STP': 'stp_util',
+    'Total Consumption (in units)': 'total_consumption',
+}
+DATE_COLUMN = 'reading_date'
+# Tried in order; the first matches exports like '30.06.2025', the second ISO dates
+DATE_FORMATS = ('%d/%m/%Y', '%Y-%m-%d')
+TEXT_COLUMNS = ['month']
+NUMERIC_COLUMNS = [c for c in POWER_DATA_COLUMNS if c not in TEXT_COLUMNS and c != DATE_COLUMN]
+
+REJECT_FILE_PATH = 'cleanedData/rejected_rows.csv'
+CHUNK_SIZE = 10000
+
+
+def normalize_headers(df):
+    """Renames source headers to power_data columns using COLUMN_MAP."""
+    source_headers = {}
+    for c in df.columns:
+        source_headers.setdefault(str(c).strip().casefold(), c)
+    missing = [h for h in COLUMN_MAP if h.casefold() not in source_headers]
+    if missing:
+        raise ValueError(f"Source data is missing expected columns: {missing}")
+    return df.rename(columns={source_headers[h.casefold()]: col for h, col in COLUMN_MAP.items()})
+
+
+def parse_dates(values):
+    """Parses a whole column of dates at once; unparsable entries become NaT."""
+    text = values.astype('string').str.strip().str.replace('.', '/', regex=False)
+    parsed = pd.to_datetime(text, format=DATE_FORMATS[0], errors='coerce')
+    for date_format in DATE_FORMATS[1:]:
+        parsed = parsed.fillna(pd.to_datetime(text, format=date_format, errors='coerce'))
+    return parsed
+
+
+def _clean_numeric_text(df):
+    """Strips thousands separators and blanks from text-typed numeric columns."""
+    numeric = df[NUMERIC_COLUMNS].copy()
+    text_columns = [c for c in NUMERIC_COLUMNS if not pd.api.types.is_numeric_dtype(numeric[c])]
+    for col in text_columns:
+        cleaned = numeric[col].astype('string').str.replace(',', '', regex=False).str.strip()
+        numeric[col] = cleaned.mask(cleaned == '')
+    return numeric
+
+
+def transform_frame(df, reject_path=REJECT_FILE_PATH, date_range=None):
+    """
+    Transforms a frame in the cleaned CSV layout into the power_data layout.
+
+    Dates and numbers are converted for the whole frame at once. Rows with an
+    unparsable date, a date that occurs more than once in the frame or falls
+    outside ``date_range``, or a value that is present but not numeric, are
+    dropped from the result and appended to ``reject_path`` together with a
+    ``reject_reason`` column, so one bad line does not abort the load.
+    Blank readings are kept and stored as NULL.
+
+    Args:
+        df (pd.DataFrame): Source rows with the original Excel headers.
+        reject_path (str, optional): CSV file that collects rejected rows.
+            Pass None to discard them.
+        date_range (tuple, optional): Inclusive (first, last) dates a reading
+            may have.
+
+    Returns:
+        pd.DataFrame: Valid rows with columns in POWER_DATA_COLUMNS order.
+    """
+    source = normalize_headers(df)
+
+    reading_date = parse_dates(source[DATE_COLUMN])
+    cleaned = _clean_numeric_text(source)
+    numeric = cleaned.apply(pd.to_numeric, errors='coerce').astype('float64')
+
+    reasons = pd.Series('', index=source.index, dtype='string')
+    reasons = reasons.mask(reading_date.isna(), reasons + f'invalid {DATE_COLUMN}; ')
+    # Every occurrence is rejected, since there is no telling which one is right
+    duplicated = reading_date.notna() & reading_date.duplicated(keep=False)
+    reasons = reasons.mask(duplicated, reasons + f'duplicate {DATE_COLUMN}; ')
+    if date_range is not None:
+        first, last = (pd.Timestamp(d) for d in date_range)
+        outside = reading_date.notna() & ((reading_date < first) | (reading_date > last))
+        reasons = reasons.mask(outside, reasons + f'out-of-range {DATE_COLUMN}; ')
+    present = cleaned.notna()
+    for col in NUMERIC_COLUMNS:
+        bad = present[col] & numeric[col].isna()
+        reasons = reasons.mask(bad, reasons + f'non-numeric {col}; ')
+
+    rejected = reasons != ''
+    if rejected.any():
+        print(f"⚠️ Rejected {int(rejected.sum())} of {len(df)} rows.")
+        if reject_path:
+            write_rejects(df[rejected.to_numpy()].assign(reject_reason=reasons[rejected].str.rstrip('; ')), reject_path)
+
+    transformed = numeric.copy()
+    transformed['month'] = source['month'].astype('string').str.strip()
+    transformed[DATE_COLUMN] = reading_date
+    return transformed.loc[~rejected, POWER_DATA_COLUMNS].reset_index(drop=True)
+
+
+def write_rejects(rejected_df, reject_path=REJECT_FILE_PATH):
+    """Appends rejected rows to the reject sidecar file, writing a header for a new file."""
+    os.makedirs(os.path.dirname(reject_path) or '.', exist_ok=True)
+    write_header = not os.path.exists(reject_path)
+    rejected_df.to_csv(reject_path, mode='a', header=write_header, index=False)
+
+
+def read_transformed_chunks(csv_path, chunksize=CHUNK_SIZE, reject_path=REJECT_FILE_PATH):
+    """
+    Reads a cleaned CSV in chunks and yields each chunk in the power_data layout.
+
+    The reject file is reset at the start of every run so it only lists rows
+    rejected by the latest load.
+    """
+    if reject_path and os.path.exists(reject_path):
+        os.remove(reject_path)
+    for chunk in pd.read_csv(csv_path, chunksize=chunksize, dtype={'DATE': 'string'}):
+        yield transform_frame(chunk, reject_path=reject_path)
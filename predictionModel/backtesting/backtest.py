@@ -0,0 +1,216 @@
+# predictionModel/backtesting/backtest.py
+import sys
+import os
+import json
+import time
+import hashlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+import pandas as pd
+
+# --- Add predictionModel and dataPipeline to the Python path ---
+prediction_model_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(prediction_model_path)
+sys.path.append(os.path.join(os.path.dirname(prediction_model_path), 'dataPipeline'))
+
+from models.prophet_model import HYPERPARAMETERS, train_and_forecast
+from model_store.store import artifact_key, CODE_VERSION
+from utils.parallel import thread_limits
+
+# --- Configuration ---
+# Rolling origin: the first fold trains on INITIAL days, every fold forecasts
+# HORIZON days, and the cutoffs are PERIOD days apart (ending HORIZON days
+# before the last observation)
+BACKTEST_INITIAL_DAYS = int(os.getenv("BACKTEST_INITIAL_DAYS", "90"))
+BACKTEST_HORIZON_DAYS = int(os.getenv("BACKTEST_HORIZON_DAYS", "30"))
+BACKTEST_PERIOD_DAYS = int(os.getenv("BACKTEST_PERIOD_DAYS", "15"))
+BACKTEST_WORKERS = int(os.getenv("BACKTEST_WORKERS", "0")) or (os.cpu_count() or 1)
+# Fold results are cached by the content of their train/test data, the
+# hyperparameters and the model code, so unchanged folds are never rerun
+BACKTEST_CACHE_DIR = os.getenv("BACKTEST_CACHE_DIR", os.path.join(prediction_model_path, 'backtest_cache'))
+BACKTEST_REPORT_PATH = os.getenv("BACKTEST_REPORT_PATH", os.path.join(prediction_model_path, 'backtest_report.json'))
+METRICS = ('mape', 'rmse', 'mae')
+
+
+def rolling_origins(df, initial_days=BACKTEST_INITIAL_DAYS, horizon_days=BACKTEST_HORIZON_DAYS, period_days=BACKTEST_PERIOD_DAYS):
+    """
+    Returns the fold cutoffs (last training day) of a series, oldest first.
+    """
+    ds = pd.to_datetime(df['ds'])
+    first, last = ds.min(), ds.max()
+    cutoffs = []
+    cutoff = last - pd.Timedelta(days=horizon_days)
+    while cutoff >= first + pd.Timedelta(days=initial_days - 1):
+        cutoffs.append(cutoff)
+        cutoff -= pd.Timedelta(days=period_days)
+    return cutoffs[::-1]
+
+
+def _fold_key(column, train_df, test_df, horizon_days):
+    digest = hashlib.sha256(f"{column}:{artifact_key(train_df)}".encode())
+    digest.update(pd.to_datetime(test_df['ds']).to_numpy(dtype='datetime64[ns]').tobytes())
+    digest.update(np.ascontiguousarray(test_df['y'].to_numpy(dtype='float64')).tobytes())
+    digest.update(str(horizon_days).encode())
+    return digest.hexdigest()
+
+
+def fold_errors(actual, predicted):
+    """MAPE (%, over non-zero actuals), RMSE and MAE of one fold; missing actuals are skipped."""
+    mask = ~np.isnan(actual)
+    actual, predicted = actual[mask], predicted[mask]
+    if not len(actual):
+        return {m: None for m in METRICS}
+    nonzero = actual != 0
+    mape = float(np.mean(np.abs((actual[nonzero] - predicted[nonzero]) / actual[nonzero])) * 100) if nonzero.any() else None
+    return {
+        'mape': mape,
+        'rmse': float(np.sqrt(np.mean((actual - predicted) ** 2))),
+        'mae': float(np.mean(np.abs(actual - predicted))),
+    }
+
+
+def run_fold(column, train_df, test_df, horizon_days, n_jobs=None):
+    """
+    Trains the production hybrid model on one fold and scores its forecast
+    (runs in a worker process).
+    """
+    start = time.perf_counter()
+    _, forecast = train_and_forecast(train_df.copy(), periods=horizon_days, n_jobs=n_jobs)
+    seconds = time.perf_counter() - start
+
+    predicted = forecast.set_index('ds')['yhat'].reindex(pd.to_datetime(test_df['ds'])).to_numpy(dtype='float64')
+    return {
+        'column': column,
+        'cutoff': str(pd.to_datetime(train_df['ds']).max().date()),
+        'train_rows': len(train_df),
+        'test_rows': int(test_df['y'].notna().sum()),
+        **fold_errors(test_df['y'].to_numpy(dtype='float64'), predicted),
+        'seconds': seconds,
+    }
+
+
+def _load_cached(key, cache_dir):
+    try:
+        with open(os.path.join(cache_dir, f"{key}.json")) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _store_cached(key, result, cache_dir):
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp = os.path.join(cache_dir, f".{key}.{os.getpid()}")
+    with open(tmp, 'w') as f:
+        json.dump(result, f)
+    os.replace(tmp, os.path.join(cache_dir, f"{key}.json"))
+
+
+def _summary(folds):
+    summary = {}
+    for metric in METRICS:
+        values = [f[metric] for f in folds if f[metric] is not None]
+        summary[metric] = float(np.mean(values)) if values else None
+    summary['folds'] = len(folds)
+    summary['fold_seconds_mean'] = float(np.mean([f['seconds'] for f in folds])) if folds else None
+    return summary
+
+
+def run_backtest(data_frames, workers=BACKTEST_WORKERS, cache_dir=BACKTEST_CACHE_DIR,
+                 initial_days=BACKTEST_INITIAL_DAYS, horizon_days=BACKTEST_HORIZON_DAYS, period_days=BACKTEST_PERIOD_DAYS):
+    """
+    Rolling-origin backtest of the hybrid model on every series in data_frames.
+
+    Folds whose data, hyperparameters and model code are unchanged come from
+    the cache; the rest are fanned out to a process pool.
+
+    Returns:
+        dict: The report, with every fold's errors and runtime and a summary per column.
+    """
+    wall_start = time.perf_counter()
+    results, pending = {}, {}
+    for column, df in data_frames.items():
+        ds = pd.to_datetime(df['ds'])
+        for cutoff in rolling_origins(df, initial_days, horizon_days, period_days):
+            train_df = df[ds <= cutoff].reset_index(drop=True)
+            test_df = df[(ds > cutoff) & (ds <= cutoff + pd.Timedelta(days=horizon_days))].reset_index(drop=True)
+            key = _fold_key(column, train_df, test_df, horizon_days)
+            cached = _load_cached(key, cache_dir)
+            if cached is not None:
+                results[key] = {**cached, 'cached': True}
+            else:
+                pending[key] = (column, train_df, test_df)
+
+    print(f"Backtesting {len(results) + len(pending)} folds ({len(results)} cached, {len(pending)} to run)...")
+    failures = {}
+    if pending and workers <= 1:
+        for key, (column, train_df, test_df) in pending.items():
+            try:
+                results[key] = run_fold(column, train_df, test_df, horizon_days)
+            except Exception as e:
+                print(f"❌ Fold failed for {column}: {e}")
+                failures[key] = e
+    elif pending:
+        threads = max(1, (os.cpu_count() or 1) // workers)
+        with thread_limits(threads), ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            futures = {pool.submit(run_fold, column, train_df, test_df, horizon_days, threads): key
+                       for key, (column, train_df, test_df) in pending.items()}
+            for future in as_completed(futures):
+                key = futures[future]
+                try:
+                    results[key] = future.result()
+                except Exception as e:
+                    print(f"❌ Fold failed for {pending[key][0]}: {e}")
+                    failures[key] = e
+    for key in pending:
+        if key in results:
+            _store_cached(key, results[key], cache_dir)
+            results[key]['cached'] = False
+
+    columns = {}
+    for column in data_frames:
+        folds = sorted((r for r in results.values() if r['column'] == column), key=lambda r: r['cutoff'])
+        columns[column] = {**_summary(folds), 'fold_results': folds}
+    return {
+        'generated_at': pd.Timestamp.now().isoformat(),
+        'code_version': CODE_VERSION,
+        'hyperparameters': HYPERPARAMETERS,
+        'config': {'initial_days': initial_days, 'horizon_days': horizon_days, 'period_days': period_days, 'workers': workers},
+        'wall_seconds': time.perf_counter() - wall_start,
+        'cached_folds': sum(1 for r in results.values() if r.get('cached')),
+        'failed_folds': len(failures),
+        'columns': columns,
+    }
+
+
+def main():
+    from main import COLUMNS_TO_FORECAST
+    from data_loader.loader import load_power_frame, get_metric_frame
+    from db_handler.pool import close_pool
+
+    print("--- Starting Rolling-Origin Backtest ---")
+    frame = load_power_frame(COLUMNS_TO_FORECAST)
+    close_pool()
+    if frame is None:
+        print("❌ Could not load data for the backtest.")
+        return
+    data_frames = {}
+    for column in COLUMNS_TO_FORECAST:
+        df = get_metric_frame(column)
+        if df is None or len(df) < BACKTEST_INITIAL_DAYS + BACKTEST_HORIZON_DAYS:
+            print(f"Skipping {column}: not enough history for one fold.")
+            continue
+        data_frames[column] = df.copy()
+
+    report = run_backtest(data_frames)
+    with open(BACKTEST_REPORT_PATH, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    summary = pd.DataFrame({c: {k: v for k, v in s.items() if k != 'fold_results'} for c, s in report['columns'].items()}).T
+    print("\n--- Backtest Summary ---")
+    print(summary.round(3).to_string())
+    print(f"\n✅ Report written to {BACKTEST_REPORT_PATH} ({report['wall_seconds']:.1f}s, {report['cached_folds']} cached folds).")
+
+if __name__ == "__main__":
+    main()
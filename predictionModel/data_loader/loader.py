@@ -1,5 +1,6 @@
 import os
 import sys
+import numpy as np
 import pandas as pd
 
 # --- Add dataPipeline to the Python path ---
@@ -10,12 +11,79 @@ sys.path.append(data_pipeline_path)
 # ---------------------------------------------
 
 from dotenv import find_dotenv, load_dotenv
-from db_handler.connect import get_db_connection # This import works because of the path modification above
+from db_handler.pool import pooled_connection # This import works because of the path modification above
 
 # Find and load the .env file from the dataPipeline directory
 dotenv_path = find_dotenv(os.path.join(data_pipeline_path, '.env'))
 load_dotenv(dotenv_path=dotenv_path)
 
+# The wide frame of the current run, fetched once and shared by every metric
+_power_frame = None
+
+def _downcast(column):
+    """Returns the column as float32 when that round-trips every value exactly, else as float64."""
+    values = column.astype('float64')
+    compact = values.astype('float32')
+    if np.array_equal(compact.to_numpy(dtype='float64'), values.to_numpy(), equal_nan=True):
+        return compact
+    return values
+
+def load_power_frame(columns, refresh=False):
+    """
+    Fetches reading_date and all requested columns of power_data in a single query.
+
+    The result is cached for the rest of the process, so the forecast run
+    scans power_data once instead of once per metric. Metric columns are
+    stored as float32 where that is lossless (the meters report whole kWh),
+    which halves the memory of the frame.
+
+    Args:
+        columns (list[str]): The power_data columns to fetch.
+        refresh (bool): Ignore the cached frame and query the database again.
+
+    Returns:
+        pd.DataFrame: The wide frame, or None on error.
+    """
+    global _power_frame
+    if not refresh and _power_frame is not None:
+        if set(columns) <= set(_power_frame.columns):
+            return _power_frame
+        # Keep the columns already cached so callers asking for one metric at a time don't evict each other
+        columns = list(dict.fromkeys([*_power_frame.columns.drop('reading_date'), *columns]))
+
+    print(f"Fetching {len(columns)} columns from power_data...")
+    try:
+        with pooled_connection() as conn:
+            quoted_columns = ", ".join(f'"{c}"' for c in columns)
+            query = f'SELECT reading_date, {quoted_columns} FROM power_data ORDER BY reading_date;'
+            df = pd.read_sql_query(query, conn)
+    except Exception as e:
+        print(f"❌ Failed to fetch data: {e}")
+        return None
+
+    df['reading_date'] = pd.to_datetime(df['reading_date'])
+    for column in columns:
+        df[column] = _downcast(df[column])
+    _power_frame = df
+    print(f"✅ Successfully fetched {len(df)} records ({df.memory_usage(deep=True).sum() / 1024:.1f} KiB).")
+    return df
+
+def get_metric_frame(target_column):
+    """
+    Returns a DataFrame with Prophet's 'ds' and 'y' columns for one metric of the cached wide frame.
+
+    The columns share memory with the cached frame; pandas copies them only
+    if the caller writes to them.
+    """
+    frame = load_power_frame([target_column])
+    if frame is None:
+        return None
+    return pd.DataFrame({'ds': frame['reading_date'], 'y': frame[target_column]}, copy=False)
+
+def clear_power_frame_cache():
+    global _power_frame
+    _power_frame = None
+
 def fetch_power_data(target_column):
     """
     Fetches data from the database and prepares it for Prophet.
@@ -27,12 +95,11 @@ def fetch_power_data(target_column):
         pd.DataFrame: A DataFrame with 'ds' and 'y' columns, or None on error.
     """
     print(f"Fetching data for target column: {target_column}...")
-    conn = None
     try:
-        conn = get_db_connection()
-        # Ensure column names with spaces/special characters are quoted
-        query = f'SELECT reading_date, "{target_column}" FROM power_data ORDER BY reading_date;'
-        df = pd.read_sql_query(query, conn)
+        with pooled_connection() as conn:
+            # Ensure column names with spaces/special characters are quoted
+            query = f'SELECT reading_date, "{target_column}" FROM power_data ORDER BY reading_date;'
+            df = pd.read_sql_query(query, conn)
         
         # Prophet requires columns to be named 'ds' and 'y'
         df.rename(columns={'reading_date': 'ds', target_column: 'y'}, inplace=True)
@@ -41,7 +108,4 @@ def fetch_power_data(target_column):
         return df
     except Exception as e:
         print(f"❌ Failed to fetch data: {e}")
-        return None
-    finally:
-        if conn:
-            conn.close()
\ No newline at end of file
+        return None
\ No newline at end of file
@@ -1,38 +1,203 @@
 # predictionModel/db_writer/writer.py
+import io
+import os
+import json
+import time
 
-def create_wide_forecast_table(conn, columns_to_forecast):
-    """Dynamically creates a 'wide' table for storing all forecasts."""
-    column_definitions = ["reading_date DATE PRIMARY KEY", "month VARCHAR(20)"]
-    
-    for col in columns_to_forecast:
-        column_definitions.append(f'"{col}_pred" FLOAT')
-    
-    create_table_query = f"""
-    CREATE TABLE IF NOT EXISTS forecast_data_wide (
-        {', '.join(column_definitions)}
-    );
+import numpy as np
+import pandas as pd
+
+from db_handler.connect import get_dialect
+from db_handler.migrations import apply_migrations, create_forecast_view, FORECAST_PUBLISHED_CHANNEL
+
+# --- Configuration ---
+# How long attaching a run's partition may wait for other schema changes on
+# forecast_values before the publish gives up (readers never block it)
+PUBLISH_LOCK_TIMEOUT = os.getenv("PUBLISH_LOCK_TIMEOUT", "10s")
+# Published runs kept in the store, the current one included; older runs are
+# dropped after each publish
+FORECAST_RUNS_KEPT = max(1, int(os.getenv("FORECAST_RUNS_KEPT", "2")))
+
+VALUE_COLUMNS = "run_id, metric_id, reading_date, period_end, value, resolution"
+
+
+def register_metrics(conn, metrics):
+    """
+    Adds any metric the forecast_metrics registry does not know yet (which
+    also gives forecast_data_wide a column for it).
+
+    Returns:
+        dict: The registry id of every metric, keyed by name.
+    """
+    dialect = get_dialect(conn)
+    with conn.cursor() as cur:
+        cur.execute("SELECT name, metric_id FROM forecast_metrics;")
+        metric_ids = dict(cur.fetchall())
+        new_metrics = [m for m in metrics if m not in metric_ids]
+        if new_metrics:
+            cur.executemany("INSERT INTO forecast_metrics (name) VALUES (%s);", [(m,) for m in new_metrics])
+            create_forecast_view(cur, dialect)
+            cur.execute("SELECT name, metric_id FROM forecast_metrics;")
+            metric_ids = dict(cur.fetchall())
+            print(f"Registered {len(new_metrics)} new forecast metric(s): {', '.join(new_metrics)}.")
+        conn.commit()
+    return metric_ids
+
+
+def _long_frame(run_id, metric_ids, wide_df):
+    """Unpivots the wide forecast frame into forecast_values rows."""
+    metrics = [m for m in metric_ids if f"{m}_pred" in wide_df.columns]
+    n = len(wide_df)
+    reading_date = pd.to_datetime(wide_df['reading_date']).to_numpy()
+    period_end = pd.to_datetime(wide_df['period_end']).to_numpy() if 'period_end' in wide_df else reading_date
+    resolution = wide_df['resolution'].str[0].to_numpy() if 'resolution' in wide_df else np.full(n, 'd')
+    long_df = pd.DataFrame({
+        'run_id': run_id,
+        'metric_id': np.repeat([metric_ids[m] for m in metrics], n),
+        'reading_date': np.tile(reading_date, len(metrics)),
+        'period_end': np.tile(period_end, len(metrics)),
+        # REAL keeps ~7 significant digits, far more than the forecasts carry
+        'value': np.concatenate([wide_df[f"{m}_pred"].to_numpy(dtype='float32') for m in metrics]) if metrics else [],
+        'resolution': np.tile(resolution, len(metrics)),
+    })
+    return long_df[long_df['value'].notna()]
+
+
+def publish_forecast_run(conn, columns_to_forecast, wide_df, artifact_keys=None):
     """
+    Stores the forecast as a new run and makes it the current one.
+
+    The rows are COPY'd into a table of their own, which on PostgreSQL gets
+    its keys and is attached to forecast_values as the run's partition. One
+    short transaction then marks the run published and moves the
+    forecast_current_run pointer, so readers switch from the whole previous
+    run to the whole new one and no table they read is rewritten or locked.
+    On SQLite the rows go straight into forecast_values inside that
+    transaction (readers keep their WAL snapshot until it commits).
+
+    artifact_keys maps each metric to the key of the stored models its
+    forecast came from; it is kept with the run so the API plots exactly
+    those models.
+
+    Returns:
+        int: The id of the published run.
+    """
+    print("Publishing the forecast as a new run...")
+    start = time.perf_counter()
+    apply_migrations(conn)
+    sqlite = get_dialect(conn) == "sqlite"
+    metric_ids = register_metrics(conn, columns_to_forecast)
     with conn.cursor() as cur:
-        cur.execute("DROP TABLE IF EXISTS forecast_data_wide;")
-        cur.execute(create_table_query)
+        cur.execute("INSERT INTO forecast_runs (status, artifact_keys) VALUES ('loading', %s) RETURNING run_id;",
+                    (json.dumps(artifact_keys) if artifact_keys else None,))
+        run_id = cur.fetchone()[0]
         conn.commit()
-    print("✅ Table 'forecast_data_wide' is ready.")
-
-
-def insert_wide_forecast_data(conn, wide_df):
-    """Inserts the combined wide forecast DataFrame into the database."""
-    print("Inserting wide forecast data into the database...")
-    
-    # --- THIS IS THE CORRECTED PART ---
-    # This now correctly formats each column name with quotes and joins them.
-    cols = ", ".join([f'"{c}"' for c in wide_df.columns])
-    
-    placeholders = ', '.join(['%s'] * len(wide_df.columns))
-    
-    insert_query = f"INSERT INTO forecast_data_wide ({cols}) VALUES ({placeholders});"
-    
+
+    long_df = _long_frame(run_id, metric_ids, wide_df)
+    buffer = io.StringIO()
+    long_df.to_csv(buffer, index=False, header=False, date_format='%Y-%m-%d')
+    buffer.seek(0)
+    partition = f"forecast_values_r{run_id}"
+
+    try:
+        with conn.cursor() as cur:
+            if sqlite:
+                cur.execute("BEGIN IMMEDIATE;")
+                cur.copy_expert(f"COPY forecast_values ({VALUE_COLUMNS}) FROM STDIN WITH (FORMAT csv)", buffer)
+            else:
+                cur.execute(f"CREATE TABLE {partition} (LIKE forecast_values INCLUDING DEFAULTS);")
+                cur.copy_expert(f"COPY {partition} ({VALUE_COLUMNS}) FROM STDIN WITH (FORMAT csv)", buffer)
+                # Same keys as the parent's indexes, so attaching adopts them instead
+                # of building new ones, and a CHECK that spares the attach a scan
+                cur.execute(f"""
+                    ALTER TABLE {partition}
+                        ADD PRIMARY KEY (run_id, metric_id, reading_date),
+                        ADD CONSTRAINT {partition}_run_check CHECK (run_id = {run_id});
+                """)
+                cur.execute(f"CREATE INDEX {partition}_run_date_idx ON {partition} (run_id, reading_date);")
+                cur.execute(f"ANALYZE {partition};")
+                conn.commit()
+                cur.execute(f"SET LOCAL lock_timeout = '{PUBLISH_LOCK_TIMEOUT}';")
+                # Only takes a SHARE UPDATE EXCLUSIVE lock, which readers do not conflict with
+                cur.execute(f"ALTER TABLE forecast_values ATTACH PARTITION {partition} FOR VALUES IN ({run_id});")
+            cur.execute("UPDATE forecast_runs SET status = 'published', row_count = %s WHERE run_id = %s;", (len(long_df), run_id))
+            cur.execute("UPDATE forecast_current_run SET run_id = %s;", (run_id,))
+            if not sqlite:
+                # Delivered on commit; API servers drop their cached responses
+                cur.execute("SELECT pg_notify(%s, %s);", (FORECAST_PUBLISHED_CHANNEL, str(run_id)))
+            conn.commit()
+    except Exception:
+        conn.rollback()
+        with conn.cursor() as cur:
+            if not sqlite:
+                cur.execute(f"DROP TABLE IF EXISTS {partition};")
+            cur.execute("DELETE FROM forecast_runs WHERE run_id = %s;", (run_id,))
+            conn.commit()
+        raise
+    print(f"✅ Published run {run_id} ({len(long_df)} values for {len(wide_df)} dates) in {time.perf_counter() - start:.2f}s.")
+    prune_forecast_runs(conn)
+    return run_id
+
+
+def prune_forecast_runs(conn, keep=FORECAST_RUNS_KEPT):
+    """
+    Drops every published run but the newest `keep` ones; the current run is
+    always kept. Runs still marked 'loading' that are older than the newest
+    published run were left behind by a publish that was killed, and are
+    dropped together with their tables.
+
+    On PostgreSQL (14+) a run's partition is detached CONCURRENTLY before it
+    is dropped, which waits for readers instead of blocking them.
+    """
+    sqlite = get_dialect(conn) == "sqlite"
     with conn.cursor() as cur:
-        for index, row in wide_df.iterrows():
-            cur.execute(insert_query, tuple(row))
+        cur.execute("""
+            SELECT run_id FROM forecast_runs
+            WHERE status = 'published' AND run_id NOT IN (
+                SELECT run_id FROM forecast_current_run WHERE run_id IS NOT NULL
+            )
+            ORDER BY run_id DESC;
+        """)
+        stale = [row[0] for row in cur.fetchall()][keep - 1:]
+        cur.execute("""
+            SELECT run_id FROM forecast_runs
+            WHERE status = 'loading'
+              AND run_id < (SELECT MAX(run_id) FROM forecast_runs WHERE status = 'published');
+        """)
+        abandoned = [row[0] for row in cur.fetchall()]
         conn.commit()
-    print(f"✅ Successfully inserted {len(wide_df)} rows into 'forecast_data_wide'.")
\ No newline at end of file
+
+    for run_id in stale:
+        with conn.cursor() as cur:
+            if sqlite:
+                cur.execute("DELETE FROM forecast_values WHERE run_id = %s;", (run_id,))
+            else:
+                partition = f"forecast_values_r{run_id}"
+                if conn.server_version >= 140000:
+                    # DETACH ... CONCURRENTLY cannot run inside a transaction block
+                    conn.autocommit = True
+                    try:
+                        cur.execute(f"ALTER TABLE forecast_values DETACH PARTITION {partition} CONCURRENTLY;")
+                    finally:
+                        conn.autocommit = False
+                else:
+                    cur.execute(f"ALTER TABLE forecast_values DETACH PARTITION {partition};")
+                cur.execute(f"DROP TABLE {partition};")
+            cur.execute("DELETE FROM forecast_runs WHERE run_id = %s;", (run_id,))
+            conn.commit()
+
+    for run_id in abandoned:
+        with conn.cursor() as cur:
+            if sqlite:
+                cur.execute("DELETE FROM forecast_values WHERE run_id = %s;", (run_id,))
+            else:
+                # Attaching happens in the transaction that marks a run
+                # published, so a loading run's table is never a partition
+                cur.execute(f"DROP TABLE IF EXISTS forecast_values_r{run_id};")
+            cur.execute("DELETE FROM forecast_runs WHERE run_id = %s;", (run_id,))
+            conn.commit()
+
+    if stale:
+        print(f"Dropped {len(stale)} old forecast run(s).")
+    if abandoned:
+        print(f"Dropped {len(abandoned)} abandoned forecast run(s).")
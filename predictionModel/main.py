@@ -1,6 +1,8 @@
 # predictionModel/main.py
 import sys
 import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import pandas as pd
 
 # --- Add dataPipeline to the Python path ---
@@ -8,10 +10,17 @@ project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 data_pipeline_path = os.path.join(project_root, 'dataPipeline')
 sys.path.append(data_pipeline_path)
 
-from data_loader.loader import fetch_power_data
-from models.prophet_model import train_and_forecast
-from db_writer.writer import create_wide_forecast_table, insert_wide_forecast_data
-from db_handler.connect import get_db_connection
+from data_loader.loader import load_power_frame, get_metric_frame
+from models.prophet_model import fit_hybrid, fit_hybrid_warm, forecast_hybrid, fit_global, forecast_global
+from models.horizon import horizon_tiers, aggregate_baseline
+from models.hierarchy import HIERARCHY, leaf_columns, reconcile
+from model_store.store import (
+    artifact_key, load_models, save_models, load_meta, latest_key, extends_series, evict_artifacts,
+    artifact_key_global, load_global_models, save_global_models
+)
+from utils.parallel import thread_limits
+from db_writer.writer import publish_forecast_run
+from db_handler.pool import pooled_connection, close_pool
 
 # --- Configuration ---
 COLUMNS_TO_FORECAST = [
@@ -21,27 +30,190 @@ COLUMNS_TO_FORECAST = [
     "stp_util", "total_consumption"
 ]
 FORECAST_PERIOD_DAYS = 3740
+# Columns trained at the same time, one worker process each; 1 trains them
+# one after another in this process
+FORECAST_WORKERS = int(os.getenv("FORECAST_WORKERS", "0")) or min(len(COLUMNS_TO_FORECAST), os.cpu_count() or 1)
+# Native threads (OpenMP/BLAS, Stan, XGBoost) each worker may use, so that
+# workers x threads does not oversubscribe the machine
+THREADS_PER_WORKER = max(1, (os.cpu_count() or 1) // FORECAST_WORKERS)
+# Consecutive warm-started refits allowed before a full refit bounds the
+# drift they accumulate; 0 always fits from scratch
+WARM_START_MAX_RUNS = int(os.getenv("WARM_START_MAX_RUNS", "7"))
+# "per_series" fits one residual model per column; "global" fits a single
+# residual model on all columns stacked together (no warm starts)
+RESIDUAL_MODEL = os.getenv("RESIDUAL_MODEL", "per_series").lower()
+# "daily" forecasts every day of FORECAST_PERIOD_DAYS with the hybrid model;
+# "tiered" does so for the first DAILY_WINDOW_DAYS only, then stores weekly
+# rows for WEEKLY_WINDOW_DAYS and monthly rows after that, each the mean of
+# the Prophet baseline over the period
+FORECAST_HORIZON_MODE = os.getenv("FORECAST_HORIZON_MODE", "daily").lower()
+DAILY_WINDOW_DAYS = int(os.getenv("DAILY_WINDOW_DAYS", "365"))
+WEEKLY_WINDOW_DAYS = int(os.getenv("WEEKLY_WINDOW_DAYS", "730"))
+# "bottom_up" trains only the leaf metrics of models.hierarchy.HIERARCHY and
+# derives the aggregates from them; "off" trains every column independently
+FORECAST_HIERARCHY = os.getenv("FORECAST_HIERARCHY", "off").lower()
+
+def _fit_models(column, data_df, n_jobs=None):
+    """
+    Fits a column's models, warm-starting from its previous models when the
+    series only gained new days since they were fitted.
+
+    Returns:
+        tuple: The (prophet_model, xgb_regressor) pair and the number of
+        warm starts since the last full fit.
+    """
+    previous_key = latest_key(column)
+    meta = load_meta(previous_key) if previous_key else None
+    if meta and meta.get('warm_starts', 0) < WARM_START_MAX_RUNS and extends_series(meta, data_df):
+        previous = load_models(previous_key)
+        if previous is not None:
+            print(f"Warm-starting {column} from {previous_key[:12]} ({len(data_df) - meta['rows']} new day(s))...")
+            models = fit_hybrid_warm(data_df, *previous, new_since=meta['last_ds'], n_jobs=n_jobs)
+            return models, meta.get('warm_starts', 0) + 1
+    return fit_hybrid(data_df, n_jobs=n_jobs), 0
+
+def _forecast_column(column, data_df, periods, n_jobs=None, tail=None):
+    """
+    Returns one column's forecast (runs in a worker process): periods daily
+    rows, followed by the baseline mean of every period in tail.
+
+    Models already fitted on exactly this series are loaded from the artifact
+    store; otherwise they are trained (warm-started where possible) and
+    stored for the next run.
+    """
+    key = artifact_key(data_df)
+    models = load_models(key)
+    if models is not None:
+        print(f"Loaded cached models for {column} ({key[:12]}).")
+    else:
+        models, warm_starts = _fit_models(column, data_df, n_jobs)
+        save_models(key, column, *models, data_df, warm_starts=warm_starts)
+    forecast = forecast_hybrid(*models, data_df, periods=periods)
+    return _append_tail(forecast[['ds', 'yhat']], models[0], tail)
+
+def _append_tail(forecast, prophet_model, tail):
+    if tail is None or tail.empty:
+        return forecast
+    return pd.concat([forecast, aggregate_baseline(prophet_model, tail)], ignore_index=True)
+
+def train_all_columns(data_frames, periods, workers=FORECAST_WORKERS, threads_per_worker=THREADS_PER_WORKER, tail=None):
+    """
+    Trains a model per column, fanning the columns out to a process pool when workers > 1.
+
+    Workers are started with 'spawn' so they initialise their own OpenMP and
+    Stan runtimes under the thread limits instead of inheriting the parent's.
+
+    Returns:
+        tuple[dict, dict]: The forecasts and the errors, both keyed by column.
+    """
+    forecasts, failures = {}, {}
+    if workers <= 1:
+        for column, data_df in data_frames.items():
+            print(f"\n--- Processing Column: {column} ---")
+            try:
+                forecasts[column] = _forecast_column(column, data_df, periods, tail=tail)
+            except Exception as e:
+                print(f"❌ Training failed for {column}: {e}")
+                failures[column] = e
+        return forecasts, failures
+
+    print(f"Training {len(data_frames)} columns on {workers} worker processes ({threads_per_worker} thread(s) each)...")
+    with thread_limits(threads_per_worker), ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        futures = {pool.submit(_forecast_column, column, data_df, periods, threads_per_worker, tail): column
+                   for column, data_df in data_frames.items()}
+        for future in as_completed(futures):
+            column = futures[future]
+            try:
+                forecasts[column] = future.result()
+                print(f"✅ Finished {column}.")
+            except Exception as e:
+                print(f"❌ Training failed for {column}: {e}")
+                failures[column] = e
+    # Keep the configured column order for the merge below
+    return {c: forecasts[c] for c in data_frames if c in forecasts}, failures
+
+def train_global(data_frames, periods, tail=None):
+    """
+    Trains the shared residual model on every column at once, or loads it
+    from the artifact store when no series changed.
+
+    Returns:
+        tuple[dict, dict]: The forecasts and the errors, like train_all_columns.
+    """
+    key = artifact_key_global(data_frames)
+    try:
+        models = load_global_models(key)
+        if models is not None:
+            print(f"Loaded cached global residual model ({key[:12]}).")
+        else:
+            models = fit_global(data_frames, n_jobs=THREADS_PER_WORKER)
+            save_global_models(key, *models)
+        forecasts = forecast_global(*models, data_frames, periods=periods)
+    except Exception as e:
+        print(f"❌ Global training failed: {e}")
+        return {}, {column: e for column in data_frames}
+    prophet_models = models[0]
+    return {column: _append_tail(forecast[['ds', 'yhat']], prophet_models[column], tail)
+            for column, forecast in forecasts.items()}, {}
+
+def _artifact_keys(data_frames, forecasts):
+    """The store key of the models behind each trained column's forecast."""
+    if RESIDUAL_MODEL == "global":
+        key = artifact_key_global(data_frames)
+        return {column: key for column in forecasts}
+    return {column: artifact_key(data_frames[column]) for column in forecasts}
 
 def main():
     print("--- Starting Wide Forecast Pipeline ---")
     
-    all_forecasts = {}
     last_historical_date = None
 
+    # One query for every metric; each column below is a view of this frame
+    if load_power_frame(COLUMNS_TO_FORECAST) is None:
+        print("Halting execution due to data loading error.")
+        return
+
+    data_frames = {}
     for column in COLUMNS_TO_FORECAST:
-        print(f"\n--- Processing Column: {column} ---")
-        
-        data_df = fetch_power_data(column)
+        data_df = get_metric_frame(column)
         
         if data_df is not None and not data_df.empty:
             if last_historical_date is None:
                 last_historical_date = pd.to_datetime(data_df['ds'].max())
-
-            model, forecast = train_and_forecast(data_df, periods=FORECAST_PERIOD_DAYS)
-            all_forecasts[column] = forecast[['ds', 'yhat']]
+            data_frames[column] = data_df
         else:
             print(f"Skipping {column} due to data loading error.")
 
+    if not data_frames:
+        print("No forecasts were generated. Halting.")
+        return
+
+    daily_days = min(DAILY_WINDOW_DAYS, FORECAST_PERIOD_DAYS) if FORECAST_HORIZON_MODE == "tiered" else FORECAST_PERIOD_DAYS
+    tiers = horizon_tiers(last_historical_date + pd.Timedelta(days=1), FORECAST_PERIOD_DAYS, daily_days, WEEKLY_WINDOW_DAYS)
+    tail = tiers[tiers['resolution'] != 'day'].reset_index(drop=True)
+    if not tail.empty:
+        print(f"Tiered horizon: {daily_days} daily rows, then {len(tail)} weekly/monthly rows.")
+
+    if FORECAST_HIERARCHY == "bottom_up":
+        leaves = leaf_columns(data_frames)
+        print(f"Bottom-up mode: training {len(leaves)} leaf columns, deriving {', '.join(c for c in HIERARCHY if c in data_frames)}.")
+        data_frames = {c: data_frames[c] for c in leaves}
+
+    if RESIDUAL_MODEL == "global":
+        all_forecasts, failures = train_global(data_frames, daily_days, tail)
+    else:
+        all_forecasts, failures = train_all_columns(data_frames, daily_days, tail=tail)
+    # Derived aggregates have no models of their own, so nothing to plot
+    artifact_keys = _artifact_keys(data_frames, all_forecasts)
+
+    if FORECAST_HIERARCHY == "bottom_up" and all_forecasts:
+        reconciled = reconcile(all_forecasts)
+        all_forecasts = {c: reconciled[c] for c in COLUMNS_TO_FORECAST if c in reconciled}
+    if failures:
+        print(f"❌ {len(failures)} column(s) failed: {', '.join(failures)}")
+    evict_artifacts()
+
     if not all_forecasts:
         print("No forecasts were generated. Halting.")
         return
@@ -62,6 +234,7 @@ def main():
     future_df = final_df[final_df['reading_date'] > last_historical_date].copy()
     
     future_df['month'] = future_df['reading_date'].dt.strftime('%B')
+    future_df = future_df.merge(tiers.rename(columns={'ds': 'reading_date'}), on='reading_date', how='left')
     
     cols = future_df.columns.tolist()
     cols.insert(1, cols.pop(cols.index('month')))
@@ -71,18 +244,15 @@ def main():
     print("Sample of the final wide table:")
     print(future_df.head())
 
-    conn = None
     try:
-        conn = get_db_connection()
-        if conn:
-            create_wide_forecast_table(conn, COLUMNS_TO_FORECAST)
-            insert_wide_forecast_data(conn, future_df)
+        with pooled_connection() as conn:
+            if conn:
+                publish_forecast_run(conn, COLUMNS_TO_FORECAST, future_df, artifact_keys)
     except Exception as e:
         print(f"❌ An error occurred during database operations: {e}")
     finally:
-        if conn:
-            conn.close()
-            print("\nDatabase connection closed.")
+        close_pool()
+        print("\nDatabase connections closed.")
             
     print("\n--- Wide Forecast Pipeline Finished ---")
 
@@ -0,0 +1,261 @@
+# predictionModel/model_store/store.py
+import os
+import json
+import time
+import shutil
+import hashlib
+import tempfile
+
+import numpy as np
+import pandas as pd
+import prophet
+import xgboost as xgb
+from prophet.serialize import model_to_json, model_from_json
+
+from models import prophet_model
+
+# --- Configuration ---
+MODEL_STORE_DIR = os.getenv("MODEL_STORE_DIR", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'model_artifacts'))
+# Artifacts not used for this many days are removed...
+MODEL_STORE_MAX_AGE_DAYS = float(os.getenv("MODEL_STORE_MAX_AGE_DAYS", "30"))
+# ...and the least recently used ones beyond this total size as well
+MODEL_STORE_MAX_BYTES = int(os.getenv("MODEL_STORE_MAX_MB", "500")) * 1024 * 1024
+
+PROPHET_FILE = 'prophet.json'
+XGBOOST_FILE = 'xgboost.ubj'
+META_FILE = 'meta.json'
+LATEST_DIR = 'latest'
+# Latest-pointer name of the global residual model
+GLOBAL_COLUMN = '__global__'
+
+
+def _code_version():
+    """Hash of the model code and library versions; any change invalidates every artifact."""
+    with open(prophet_model.__file__, 'rb') as f:
+        source = f.read()
+    return hashlib.sha256(source + f"prophet={prophet.__version__};xgboost={xgb.__version__}".encode()).hexdigest()[:16]
+
+CODE_VERSION = _code_version()
+
+
+def _series_digest(df):
+    digest = hashlib.sha256()
+    digest.update(pd.to_datetime(df['ds']).to_numpy(dtype='datetime64[ns]').tobytes())
+    digest.update(np.ascontiguousarray(df['y'].to_numpy(dtype='float64')).tobytes())
+    return digest
+
+
+def artifact_key(df, hyperparameters=None):
+    """
+    Content address of the models fitted on df: a hash of the ds/y series,
+    the hyperparameters and the code version.
+    """
+    hyperparameters = hyperparameters or prophet_model.HYPERPARAMETERS
+    digest = _series_digest(df)
+    digest.update(json.dumps(hyperparameters, sort_keys=True).encode())
+    digest.update(CODE_VERSION.encode())
+    return digest.hexdigest()
+
+
+def load_models(key, store_dir=MODEL_STORE_DIR):
+    """
+    Loads the Prophet model and XGBRegressor stored under key.
+
+    Returns:
+        tuple: (prophet_model, xgb_regressor), or None on a cache miss.
+    """
+    path = os.path.join(store_dir, key)
+    try:
+        with open(os.path.join(path, PROPHET_FILE)) as f:
+            prophet_fit = model_from_json(f.read())
+        xgb_regressor = xgb.XGBRegressor()
+        xgb_regressor.load_model(os.path.join(path, XGBOOST_FILE))
+    except (OSError, ValueError, xgb.core.XGBoostError):
+        return None
+    # The directory's mtime records the last use for the LRU eviction
+    os.utime(path)
+    return prophet_fit, xgb_regressor
+
+
+def _write_artifact(key, prophet_files, xgb_regressor, meta, store_dir):
+    """
+    Writes an artifact unless key is already stored.
+
+    The files go to a temporary directory that is renamed into place, so
+    concurrent workers and interrupted runs never leave a partial artifact.
+
+    Args:
+        prophet_files (dict): Fitted Prophet models keyed by file name.
+    """
+    os.makedirs(store_dir, exist_ok=True)
+    path = os.path.join(store_dir, key)
+    if os.path.isdir(path):
+        return
+    tmp = tempfile.mkdtemp(dir=store_dir, prefix='.tmp-')
+    try:
+        for filename, prophet_fit in prophet_files.items():
+            with open(os.path.join(tmp, filename), 'w') as f:
+                f.write(model_to_json(prophet_fit))
+        xgb_regressor.save_model(os.path.join(tmp, XGBOOST_FILE))
+        with open(os.path.join(tmp, META_FILE), 'w') as f:
+            json.dump({'created_at': time.time(), 'code_version': CODE_VERSION, **meta}, f)
+        os.rename(tmp, path)
+    except OSError:
+        # Another worker stored the same artifact first
+        shutil.rmtree(tmp, ignore_errors=True)
+        if not os.path.isdir(path):
+            raise
+
+
+def save_models(key, column, prophet_fit, xgb_regressor, df, store_dir=MODEL_STORE_DIR, **meta):
+    """Stores fitted models under key and marks them as the latest models of column."""
+    _write_artifact(key, {PROPHET_FILE: prophet_fit}, xgb_regressor, {
+        'column': column,
+        'rows': len(df),
+        'last_ds': str(pd.to_datetime(df['ds']).max().date()),
+        'series_sha': _series_digest(df).hexdigest(),
+        **meta,
+    }, store_dir)
+    _set_latest(column, key, store_dir)
+
+
+def artifact_key_global(frames, hyperparameters=None):
+    """Content address of a global residual model fitted on every series in frames."""
+    hyperparameters = hyperparameters or prophet_model.HYPERPARAMETERS
+    digest = hashlib.sha256(b'global')
+    for column, df in frames.items():
+        digest.update(column.encode())
+        digest.update(_series_digest(df).digest())
+    digest.update(json.dumps(hyperparameters, sort_keys=True).encode())
+    digest.update(CODE_VERSION.encode())
+    return digest.hexdigest()
+
+
+def load_global_models(key, store_dir=MODEL_STORE_DIR):
+    """
+    Loads the per-series Prophet models and the shared XGBRegressor stored under key.
+
+    Returns:
+        tuple: (prophet_models, xgb_regressor, series), or None on a cache miss.
+    """
+    path = os.path.join(store_dir, key)
+    meta = load_meta(key, store_dir)
+    if not meta or 'series' not in meta:
+        return None
+    try:
+        prophet_models = {}
+        for column in meta['series']:
+            with open(os.path.join(path, f"prophet_{column}.json")) as f:
+                prophet_models[column] = model_from_json(f.read())
+        xgb_regressor = xgb.XGBRegressor()
+        xgb_regressor.load_model(os.path.join(path, XGBOOST_FILE))
+    except (OSError, ValueError, xgb.core.XGBoostError):
+        return None
+    os.utime(path)
+    return prophet_models, xgb_regressor, meta['series']
+
+
+def save_global_models(key, prophet_models, xgb_regressor, series, store_dir=MODEL_STORE_DIR):
+    """Stores a global residual model like save_models, under the GLOBAL_COLUMN pointer."""
+    prophet_files = {f"prophet_{column}.json": prophet_fit for column, prophet_fit in prophet_models.items()}
+    _write_artifact(key, prophet_files, xgb_regressor, {'column': GLOBAL_COLUMN, 'series': series}, store_dir)
+    _set_latest(GLOBAL_COLUMN, key, store_dir)
+
+
+def load_meta(key, store_dir=MODEL_STORE_DIR):
+    try:
+        with open(os.path.join(store_dir, key, META_FILE)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def extends_series(meta, df):
+    """
+    True when df is the series the artifact described by meta was fitted on
+    plus newly appended days, under the same code version.
+    """
+    rows = meta.get('rows', 0)
+    return (meta.get('code_version') == CODE_VERSION and 'series_sha' in meta
+            and len(df) > rows and _series_digest(df.iloc[:rows]).hexdigest() == meta['series_sha'])
+
+
+def _set_latest(column, key, store_dir):
+    latest_dir = os.path.join(store_dir, LATEST_DIR)
+    os.makedirs(latest_dir, exist_ok=True)
+    tmp = os.path.join(latest_dir, f".{column}.{os.getpid()}")
+    with open(tmp, 'w') as f:
+        f.write(key)
+    os.replace(tmp, os.path.join(latest_dir, column))
+
+
+def latest_key(column, store_dir=MODEL_STORE_DIR):
+    """Returns the key of the models most recently stored for column, or None."""
+    try:
+        with open(os.path.join(store_dir, LATEST_DIR, column)) as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+def load_prophet(key, column, store_dir=MODEL_STORE_DIR):
+    """
+    Loads the Prophet model of column stored under key, which may be the
+    column's own artifact or a global residual model covering it.
+
+    Returns:
+        Prophet: The fitted model, or None when the artifact is missing.
+    """
+    path = os.path.join(store_dir, key)
+    for filename in (PROPHET_FILE, f"prophet_{column}.json"):
+        try:
+            with open(os.path.join(path, filename)) as f:
+                prophet_fit = model_from_json(f.read())
+        except (OSError, ValueError):
+            continue
+        os.utime(path)
+        return prophet_fit
+    return None
+
+
+def _dir_size(path):
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names)
+
+
+def evict_artifacts(max_age_days=MODEL_STORE_MAX_AGE_DAYS, max_bytes=MODEL_STORE_MAX_BYTES, store_dir=MODEL_STORE_DIR):
+    """
+    Removes artifacts unused for more than max_age_days, then the least
+    recently used ones until the store fits in max_bytes. The latest
+    artifact of every column is always kept.
+
+    Returns:
+        int: The number of artifacts removed.
+    """
+    if not os.path.isdir(store_dir):
+        return 0
+    latest_dir = os.path.join(store_dir, LATEST_DIR)
+    protected = set()
+    if os.path.isdir(latest_dir):
+        protected = {latest_key(column, store_dir) for column in os.listdir(latest_dir) if not column.startswith('.')}
+
+    artifacts = []
+    for name in os.listdir(store_dir):
+        path = os.path.join(store_dir, name)
+        if name == LATEST_DIR or name.startswith('.') or not os.path.isdir(path):
+            continue
+        artifacts.append((os.path.getmtime(path), _dir_size(path), name, path))
+    artifacts.sort()
+
+    now = time.time()
+    total = sum(size for _, size, _, _ in artifacts)
+    removed = 0
+    for mtime, size, name, path in artifacts:
+        expired = now - mtime > max_age_days * 86400
+        if name in protected or not (expired or total > max_bytes):
+            continue
+        shutil.rmtree(path, ignore_errors=True)
+        total -= size
+        removed += 1
+    if removed:
+        print(f"Evicted {removed} model artifact(s); the store now holds {total / 1024 / 1024:.1f} MiB.")
+    return removed
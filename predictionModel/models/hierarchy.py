@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+
+# How the metrics add up: each aggregate equals the sum of every group of
+# leaves listed for it. total_consumption has two breakdowns, by where the
+# power is used and by where it comes from.
+HIERARCHY = {
+    'total_consumption': [
+        ['staff_quarters_util', 'academic_blocks_util', 'hostels_util', 'chiller_plant_util', 'stp_util'],
+        ['tneb_campus_htsc_91', 'tneb_new_stp_htsc_178', 'solar_generation', 'diesel_generation', 'biogas_generation'],
+    ],
+}
+
+
+def leaf_columns(columns, hierarchy=HIERARCHY):
+    """The columns that are not aggregates, i.e. the ones a bottom-up run trains."""
+    return [c for c in columns if c not in hierarchy]
+
+
+def reconcile(forecasts, hierarchy=HIERARCHY):
+    """
+    Derives every aggregate from its leaves' forecasts and makes each
+    breakdown add up to it.
+
+    An aggregate's forecast is the mean of its groups' sums. Each group's gap
+    to it is then spread over the group's leaves in proportion to their
+    absolute size, so small meters move little.
+
+    Args:
+        forecasts (dict): ds/yhat DataFrames of the leaves, keyed by column.
+
+    Returns:
+        dict: The reconciled leaves plus every aggregate whose leaves were all
+        forecast, as ds/yhat DataFrames.
+    """
+    yhat = pd.concat({c: f.set_index('ds')['yhat'] for c, f in forecasts.items()}, axis=1).astype('float64')
+    for aggregate, groups in hierarchy.items():
+        if not all(leaf in yhat for group in groups for leaf in group):
+            missing = sorted({leaf for group in groups for leaf in group} - set(yhat))
+            print(f"❌ Cannot derive {aggregate}: no forecast for {', '.join(missing)}.")
+            continue
+        total = np.mean([yhat[group].sum(axis=1).to_numpy() for group in groups], axis=0)
+        for group in groups:
+            values = yhat[group].to_numpy()
+            weights = np.abs(values)
+            weight_sums = weights.sum(axis=1, keepdims=True)
+            # All-zero days split the gap evenly
+            shares = np.where(weight_sums > 0, weights / np.where(weight_sums > 0, weight_sums, 1), 1 / len(group))
+            yhat[group] = values + (total - values.sum(axis=1))[:, None] * shares
+        yhat[aggregate] = total
+    return {c: pd.DataFrame({'ds': yhat.index, 'yhat': yhat[c].to_numpy()}) for c in yhat.columns}
@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+
+from models.prophet_model import predict_baseline
+
+def horizon_tiers(start, total_days, daily_days, weekly_days=0):
+    """
+    Splits a forecast horizon into daily, weekly and monthly periods.
+
+    The first daily_days are one row each, the next weekly_days are 7-day
+    blocks and the rest are calendar months; the first and last block of a
+    tier may be shorter where the tiers meet or the horizon ends.
+
+    Returns:
+        pd.DataFrame: One row per period with its first day (ds), its last
+        day (period_end) and its resolution.
+    """
+    start = pd.Timestamp(start).normalize()
+    end = start + pd.Timedelta(days=total_days - 1)
+    daily_end = min(end, start + pd.Timedelta(days=daily_days - 1))
+    weekly_end = min(end, daily_end + pd.Timedelta(days=weekly_days))
+
+    days = pd.date_range(start, daily_end, freq='D')
+    rows = [(day, day, 'day') for day in days]
+    period_start = daily_end + pd.Timedelta(days=1)
+    while period_start <= weekly_end:
+        period_end = min(weekly_end, period_start + pd.Timedelta(days=6))
+        rows.append((period_start, period_end, 'week'))
+        period_start = period_end + pd.Timedelta(days=1)
+    while period_start <= end:
+        period_end = min(end, period_start + pd.offsets.MonthEnd(0))
+        rows.append((period_start, period_end, 'month'))
+        period_start = period_end + pd.Timedelta(days=1)
+    return pd.DataFrame(rows, columns=['ds', 'period_end', 'resolution'])
+
+
+def baseline_yhat(prophet_model, dates):
+    """Prophet's point forecast for dates, skipping the uncertainty sampling."""
+    return predict_baseline(prophet_model, pd.DataFrame({'ds': dates}), intervals='none')['yhat'].to_numpy(dtype='float64')
+
+
+def aggregate_baseline(prophet_model, periods):
+    """
+    Averages the Prophet baseline over each of the contiguous periods
+    returned by horizon_tiers, so every value stays a per-day figure.
+
+    Returns:
+        pd.DataFrame: The ds/yhat rows of the periods.
+    """
+    if periods.empty:
+        return pd.DataFrame({'ds': pd.Series(dtype='datetime64[ns]'), 'yhat': pd.Series(dtype='float64')})
+    days = pd.date_range(periods['ds'].iloc[0], periods['period_end'].iloc[-1], freq='D')
+    period_of_day = np.searchsorted(periods['ds'].to_numpy(dtype='datetime64[ns]'), days.to_numpy(dtype='datetime64[ns]'), side='right') - 1
+    totals = np.bincount(period_of_day, weights=baseline_yhat(prophet_model, days), minlength=len(periods))
+    lengths = np.bincount(period_of_day, minlength=len(periods))
+    return pd.DataFrame({'ds': periods['ds'].to_numpy(), 'yhat': totals / lengths})
@@ -1,8 +1,52 @@
+import os
+from statistics import NormalDist
 import pandas as pd
 from prophet import Prophet
 import xgboost as xgb
 import numpy as np
 
+# --- Configuration ---
+# 'recursive' feeds each day's prediction back in as the next days' lags;
+# 'direct' predicts the whole horizon in one call from lags at least as old
+# as the horizon, using one residual model stacked over horizon buckets
+FORECAST_STRATEGY = os.getenv("FORECAST_STRATEGY", "recursive")
+# 'vectorized' runs the recursive forecast on preallocated NumPy arrays;
+# 'legacy' is the original one-DataFrame-per-day loop, kept for comparison
+FORECAST_ENGINE = os.getenv("FORECAST_ENGINE", "vectorized")
+# Longest horizon (days) of each direct-strategy bucket; days further out
+# than the last bucket get calendar features only
+DIRECT_HORIZON_BUCKETS = [int(h) for h in os.getenv("DIRECT_HORIZON_BUCKETS", "7,14,28,56").split(",")]
+
+CALENDAR_FEATURES = ['dayofyear', 'dayofweek', 'month', 'year', 'weekofyear']
+FEATURES = CALENDAR_FEATURES + ['lag_7', 'lag_14', 'rolling_mean_7']
+DIRECT_FEATURES = CALENDAR_FEATURES + ['horizon_bucket', 'lag_h', 'lag_h_7', 'rolling_mean_h']
+TARGET = 'error'
+# Number of past values the lag/rolling features look at
+LAG_WINDOW = 14
+
+# Prediction intervals of the Prophet baseline: 'full' simulates the model's
+# uncertainty_samples paths (Prophet's default), 'subsample' only
+# PROPHET_INTERVAL_SAMPLES of them, 'analytic' uses the closed-form variance
+# of those simulations and 'none' leaves the bounds empty. yhat is the same
+# in every mode, and the residual pass never computes intervals.
+PROPHET_INTERVALS = os.getenv("PROPHET_INTERVALS", "analytic")
+PROPHET_INTERVAL_SAMPLES = int(os.getenv("PROPHET_INTERVAL_SAMPLES", "100"))
+
+# Warm starts grow WARM_START_ROUNDS_PER_DAY extra XGBoost trees per newly
+# appended day (at most WARM_START_BOOST_ROUNDS) at a reduced learning rate,
+# on a trailing window of WARM_START_WINDOW_DAYS that ends with the new days
+WARM_START_ROUNDS_PER_DAY = int(os.getenv("WARM_START_ROUNDS_PER_DAY", "3"))
+WARM_START_BOOST_ROUNDS = int(os.getenv("WARM_START_BOOST_ROUNDS", "20"))
+WARM_START_LEARNING_RATE = float(os.getenv("WARM_START_LEARNING_RATE", "0.01"))
+WARM_START_WINDOW_DAYS = int(os.getenv("WARM_START_WINDOW_DAYS", str(4 * LAG_WINDOW)))
+
+HYPERPARAMETERS = {
+    'prophet': {'weekly_seasonality': True},
+    'xgboost': {'n_estimators': 500, 'learning_rate': 0.05, 'max_depth': 5, 'random_state': 42},
+    'strategy': FORECAST_STRATEGY,
+    'direct_horizon_buckets': DIRECT_HORIZON_BUCKETS,
+}
+
 def create_features(df):
     """
     Creates time series features from a datetime index (ds).
@@ -27,46 +71,41 @@ def create_features(df):
     
     return df
 
-def train_and_forecast(df, periods=30, freq='D'):
-    print("--- Starting ADVANCED Hybrid Prophet + XGBoost Model ---")
-    df['ds'] = pd.to_datetime(df['ds'])
-
-    # === Step 1: Train Prophet for baseline forecast ===
-    print("Step 1: Training Prophet model...")
-    prophet_model = Prophet(weekly_seasonality=True)
-    prophet_model.fit(df)
-    forecast_on_history = prophet_model.predict(df)
-    
-    # === Step 2: Calculate Prophet's errors (residuals) ===
-    print("Step 2: Calculating residuals...")
-    df_with_errors = pd.merge(df, forecast_on_history[['ds', 'yhat']], on='ds')
-    df_with_errors['error'] = df_with_errors['y'] - df_with_errors['yhat']
-
-    # === Step 3: Train XGBoost to predict the errors using advanced features ===
-    print("Step 3: Training XGBoost on residuals with lag/rolling features...")
-    df_for_xgb_train = create_features(df_with_errors.copy())
-    
-    # Drop rows with NaN values created by lag/rolling features
-    df_for_xgb_train.dropna(inplace=True)
-
-    FEATURES = ['dayofyear', 'dayofweek', 'month', 'year', 'weekofyear', 'lag_7', 'lag_14', 'rolling_mean_7']
-    TARGET = 'error'
+def create_direct_features(df, buckets=DIRECT_HORIZON_BUCKETS):
+    """
+    Builds the stacked training rows of the direct strategy.
 
-    X_train_xgb = df_for_xgb_train[FEATURES]
-    y_train_xgb = df_for_xgb_train[TARGET]
+    df is repeated once per horizon bucket. In the copy for a bucket whose
+    longest horizon is H, the lags are taken H and H + 7 days back and the
+    rolling mean covers the 7 days ending H days back, so every feature is
+    already known when forecasting up to H days ahead. A final copy without
+    lags serves the days beyond the last bucket.
+    """
+    base = create_features(df)
+    y = df['y'].reset_index(drop=True)
+    frames = []
+    for bucket, horizon in enumerate(buckets):
+        frame = base.copy()
+        frame['horizon_bucket'] = bucket
+        frame['lag_h'] = y.shift(horizon).to_numpy()
+        frame['lag_h_7'] = y.shift(horizon + 7).to_numpy()
+        frame['rolling_mean_h'] = y.shift(horizon).rolling(window=7).mean().to_numpy()
+        frames.append(frame.dropna(subset=['lag_h', 'lag_h_7', 'rolling_mean_h']))
+    frame = base.copy()
+    frame['horizon_bucket'] = len(buckets)
+    frame['lag_h'] = frame['lag_h_7'] = frame['rolling_mean_h'] = np.nan
+    frames.append(frame)
+    return pd.concat(frames, ignore_index=True)
 
-    xgb_regressor = xgb.XGBRegressor(n_estimators=500, learning_rate=0.05, max_depth=5, random_state=42)
-    xgb_regressor.fit(X_train_xgb, y_train_xgb)
-    
-    # === Step 4: Make future forecast using a recursive loop ===
-    print("Step 4: Making recursive future forecast...")
-    future = prophet_model.make_future_dataframe(periods=periods, freq=freq)
-    prophet_forecast = prophet_model.predict(future)
-    
+def _recursive_forecast_legacy(xgb_regressor, df, history, prophet_forecast):
+    """
+    The original recursive loop: builds a one-row feature DataFrame and calls
+    predict once per future day. Updates prophet_forecast in place.
+    """
     future_forecast_only = prophet_forecast[prophet_forecast['ds'] > df['ds'].max()].copy()
     
     # Combine historical and future data to create rolling features
-    full_df = pd.concat([df_with_errors, future_forecast_only[['ds']]], ignore_index=True)
+    full_df = pd.concat([history[['ds', 'y']], future_forecast_only[['ds']]], ignore_index=True)
 
     # Loop one day at a time to predict recursively
     for i in range(len(df), len(full_df)):
@@ -95,5 +134,481 @@ def train_and_forecast(df, periods=30, freq='D'):
         prophet_forecast.loc[i, 'yhat_lower'] += predicted_error[0]
         prophet_forecast.loc[i, 'yhat_upper'] += predicted_error[0]
 
+
+def _recursive_forecast_vectorized(xgb_regressor, history, prophet_forecast):
+    """
+    Same recursion as _recursive_forecast_legacy, computed on NumPy arrays.
+
+    Calendar features for the whole horizon are built once, the last
+    LAG_WINDOW values of y live in a ring buffer and yhat and its bounds are
+    written into preallocated arrays, so each day costs one booster call.
+    The lags, the rolling mean (pandas' NaN-skipping mean, summed in the
+    same order) and the float arithmetic match the legacy loop exactly.
+    Updates prophet_forecast in place.
+    """
+    n_history = len(history)
+    horizon = len(prophet_forecast) - n_history
+    booster = xgb_regressor.get_booster()
+
+    features = np.empty((horizon, len(FEATURES)))
+    calendar = create_features(prophet_forecast[['ds']].iloc[n_history:].assign(y=np.nan))
+    features[:, :len(CALENDAR_FEATURES)] = calendar[CALENDAR_FEATURES].to_numpy(dtype='float64')
+    lag_7, lag_14, rolling_mean_7 = (FEATURES.index(f) for f in ('lag_7', 'lag_14', 'rolling_mean_7'))
+
+    # ring[head:head + LAG_WINDOW] always holds the last LAG_WINDOW values of y,
+    # oldest first; every value is written twice so that slice never wraps
+    ring = np.full(2 * LAG_WINDOW, np.nan)
+    tail = history['y'].to_numpy(dtype='float64')[-LAG_WINDOW:]
+    ring[LAG_WINDOW - len(tail):LAG_WINDOW] = tail
+    ring[2 * LAG_WINDOW - len(tail):] = tail
+    head = 0
+
+    yhat = prophet_forecast['yhat'].to_numpy(dtype='float64', copy=True)
+    yhat_lower = prophet_forecast['yhat_lower'].to_numpy(dtype='float64', copy=True)
+    yhat_upper = prophet_forecast['yhat_upper'].to_numpy(dtype='float64', copy=True)
+
+    for step in range(horizon):
+        i = n_history + step
+        window = ring[head:head + LAG_WINDOW]
+        row = features[step]
+        row[lag_7] = window[LAG_WINDOW - 7] if i - 7 >= 0 else np.nan
+        row[lag_14] = window[LAG_WINDOW - 14] if i - 14 >= 0 else np.nan
+        if i - 7 >= 0:
+            recent = window[LAG_WINDOW - 7:].copy()
+            missing = np.isnan(recent)
+            recent[missing] = 0
+            count = np.float64(7 - missing.sum())
+            row[rolling_mean_7] = recent.sum() / count if count > 0 else np.nan
+        else:
+            row[rolling_mean_7] = np.nan
+
+        predicted_error = booster.inplace_predict(features[step:step + 1])[0]
+        final_yhat = yhat[i] + predicted_error
+        yhat[i] = final_yhat
+        yhat_lower[i] += predicted_error
+        yhat_upper[i] += predicted_error
+
+        ring[head] = ring[head + LAG_WINDOW] = final_yhat
+        head = (head + 1) % LAG_WINDOW
+
+    prophet_forecast['yhat'] = yhat
+    prophet_forecast['yhat_lower'] = yhat_lower
+    prophet_forecast['yhat_upper'] = yhat_upper
+
+
+def _take(values, index):
+    """values[index], with NaN where index falls outside values."""
+    out = np.full(len(index), np.nan)
+    valid = (index >= 0) & (index < len(values))
+    out[valid] = values[index[valid]]
+    return out
+
+
+def _direct_forecast_features(history, prophet_forecast, buckets=DIRECT_HORIZON_BUCKETS):
+    """Returns the direct-strategy features of every future day of prophet_forecast."""
+    n_history = len(history)
+    future = prophet_forecast.iloc[n_history:]
+    steps = np.arange(1, len(future) + 1)
+    bucket_of_step = np.searchsorted(buckets, steps)
+
+    y = history['y'].to_numpy(dtype='float64')
+    rolling = history['y'].astype('float64').rolling(window=7).mean().to_numpy()
+
+    # Position in the history of the value H days before each future day
+    bucket_horizon = np.array(list(buckets) + [0])[bucket_of_step]
+    source = n_history - 1 + steps - bucket_horizon
+    open_ended = bucket_of_step == len(buckets)
+    source[open_ended] = -1
+
+    features = create_features(future[['ds']].assign(y=np.nan))[CALENDAR_FEATURES]
+    features['horizon_bucket'] = bucket_of_step
+    features['lag_h'] = _take(y, source)
+    features['lag_h_7'] = _take(y, np.where(open_ended, -1, source - 7))
+    features['rolling_mean_h'] = _take(rolling, source)
+    return features[DIRECT_FEATURES]
+
+
+def _add_predicted_error(prophet_forecast, n_history, predicted_error):
+    for column in ('yhat', 'yhat_lower', 'yhat_upper'):
+        values = prophet_forecast[column].to_numpy(dtype='float64', copy=True)
+        values[n_history:] += predicted_error
+        prophet_forecast[column] = values
+
+
+def _direct_forecast(xgb_regressor, history, prophet_forecast, buckets=DIRECT_HORIZON_BUCKETS):
+    """
+    Adds the predicted residuals of the whole horizon to prophet_forecast
+    with a single predict call. Updates prophet_forecast in place.
+    """
+    features = _direct_forecast_features(history, prophet_forecast, buckets)
+    predicted_error = xgb_regressor.predict(features).astype('float64')
+    _add_predicted_error(prophet_forecast, len(history), predicted_error)
+
+
+def _predict_with_samples(prophet_model, future, samples):
+    saved = prophet_model.uncertainty_samples
+    prophet_model.uncertainty_samples = samples
+    try:
+        return prophet_model.predict(future)
+    finally:
+        prophet_model.uncertainty_samples = saved
+
+
+def _analytic_intervals(prophet_model, forecast):
+    """
+    Adds Prophet's intervals to a point forecast without simulating them.
+
+    Prophet's simulated paths add Gaussian observation noise and, after the
+    history, a trend whose slope changes at random: at each future step with
+    probability p = changepoints * step, by a Laplace(0, b) amount where b is
+    the mean size of the fitted changepoints. The slope changes are averaged
+    over neighbouring steps and summed twice, so at the n-th future step the
+    trend's variance is step^2 * p * 2b^2 * n(2n-1)(2n+1)/12. The bounds are
+    yhat -/+ z * sd of that noise and trend, z being the normal quantile of
+    the model's interval_width.
+    """
+    t = ((forecast['ds'] - prophet_model.start) / prophet_model.t_scale).to_numpy(dtype='float64')
+    future = t > 1
+    trend_var = np.zeros(len(t))
+    if future.any() and prophet_model.growth == 'linear':
+        steps = np.diff(t[future]).mean() if future.sum() > 1 else np.diff(prophet_model.history['t']).mean()
+        likelihood = min(1.0, len(prophet_model.changepoints_t) * steps)
+        mean_delta = np.mean(np.abs(prophet_model.params['delta'][0])) + 1e-8
+        n = np.arange(1, future.sum() + 1, dtype='float64')
+        trend_var[future] = steps ** 2 * likelihood * 2 * mean_delta ** 2 * n * (2 * n - 1) * (2 * n + 1) / 12
+
+    z = NormalDist().inv_cdf((1 + prophet_model.interval_width) / 2)
+    trend_sd = np.sqrt(trend_var) * prophet_model.y_scale
+    multiplier = np.abs(1 + forecast['multiplicative_terms'].to_numpy(dtype='float64'))
+    noise_sd = prophet_model.params['sigma_obs'][0] * prophet_model.y_scale
+    yhat_sd = np.sqrt((trend_sd * multiplier) ** 2 + noise_sd ** 2)
+    forecast['trend_lower'] = forecast['trend'] - z * trend_sd
+    forecast['trend_upper'] = forecast['trend'] + z * trend_sd
+    forecast['yhat_lower'] = forecast['yhat'] - z * yhat_sd
+    forecast['yhat_upper'] = forecast['yhat'] + z * yhat_sd
+    return forecast
+
+
+def predict_baseline(prophet_model, future, intervals=PROPHET_INTERVALS):
+    """
+    Prophet's forecast for the dates in future, with intervals computed the
+    PROPHET_INTERVALS way. The analytic form covers a linear or flat trend
+    fitted by MAP; other models fall back to a subsample.
+    """
+    if intervals == 'full':
+        return prophet_model.predict(future)
+    analytic_ok = prophet_model.growth in ('linear', 'flat') and prophet_model.mcmc_samples == 0
+    if intervals == 'subsample' or (intervals == 'analytic' and not analytic_ok):
+        return _predict_with_samples(prophet_model, future, min(prophet_model.uncertainty_samples, PROPHET_INTERVAL_SAMPLES))
+
+    forecast = _predict_with_samples(prophet_model, future, 0)
+    if intervals == 'analytic':
+        return _analytic_intervals(prophet_model, forecast)
+    for column in ('trend_lower', 'trend_upper', 'yhat_lower', 'yhat_upper'):
+        forecast[column] = np.nan
+    return forecast
+
+
+def _residual_training_frame(prophet_model, df, strategy, forecast_on_history=None):
+    """
+    Returns the XGBoost training rows (Prophet's in-sample errors with their
+    lag/rolling features) and the feature columns of the given strategy.
+    """
+    if forecast_on_history is None:
+        forecast_on_history = predict_baseline(prophet_model, df, intervals='none')
+    
+    # === Step 2: Calculate Prophet's errors (residuals) ===
+    print("Step 2: Calculating residuals...")
+    df_with_errors = pd.merge(df, forecast_on_history[['ds', 'yhat']], on='ds')
+    df_with_errors['error'] = df_with_errors['y'] - df_with_errors['yhat']
+
+    # === Step 3: Train XGBoost to predict the errors using advanced features ===
+    if strategy == 'direct':
+        print("Step 3: Training XGBoost on residuals with horizon-bucketed features...")
+        df_for_xgb_train = create_direct_features(df_with_errors)
+        return df_for_xgb_train.dropna(subset=[TARGET]), DIRECT_FEATURES
+
+    print("Step 3: Training XGBoost on residuals with lag/rolling features...")
+    df_for_xgb_train = create_features(df_with_errors.copy())
+    
+    # Drop rows with NaN values created by lag/rolling features
+    df_for_xgb_train.dropna(inplace=True)
+    return df_for_xgb_train, FEATURES
+
+
+def _fit_prophet(df):
+    print("--- Starting ADVANCED Hybrid Prophet + XGBoost Model ---")
+    df['ds'] = pd.to_datetime(df['ds'])
+    # The loader may hand out float32 columns; fit and forecast in double precision
+    df['y'] = df['y'].astype('float64')
+
+    # === Step 1: Train Prophet for baseline forecast ===
+    print("Step 1: Training Prophet model...")
+    prophet_model = Prophet(**HYPERPARAMETERS['prophet'])
+    prophet_model.fit(df)
+    return prophet_model
+
+
+def _fit_residual_model(prophet_model, df, strategy=None, n_jobs=None, forecast_on_history=None):
+    df_for_xgb_train, features = _residual_training_frame(
+        prophet_model, df, strategy or HYPERPARAMETERS['strategy'], forecast_on_history)
+
+    X_train_xgb = df_for_xgb_train[features]
+    y_train_xgb = df_for_xgb_train[TARGET]
+
+    xgb_regressor = xgb.XGBRegressor(**HYPERPARAMETERS['xgboost'], n_jobs=n_jobs)
+    xgb_regressor.fit(X_train_xgb, y_train_xgb)
+    return xgb_regressor
+
+
+def fit_hybrid(df, n_jobs=None, strategy=None):
+    """
+    Fits the Prophet baseline and the XGBoost model of its residuals for the
+    given strategy (HYPERPARAMETERS['strategy'] by default).
+
+    Returns:
+        tuple: The fitted Prophet model and XGBRegressor.
+    """
+    prophet_model = _fit_prophet(df)
+    return prophet_model, _fit_residual_model(prophet_model, df, strategy, n_jobs)
+
+
+def stan_init(model):
+    """Returns the fitted parameters of a Prophet model in the form Prophet.fit(init=...) expects."""
+    init = {name: model.params[name][0][0] for name in ['k', 'm', 'sigma_obs']}
+    init.update({name: model.params[name][0] for name in ['delta', 'beta']})
+    return init
+
+
+def fit_hybrid_warm(df, previous_prophet, previous_xgb, new_since, n_jobs=None, boost_rounds=WARM_START_BOOST_ROUNDS):
+    """
+    Refits the hybrid model after new days were appended to the series.
+
+    Prophet is optimised again on the whole series but starts from the
+    previous model's parameters, which needs far fewer iterations than a cold
+    start. The residual model keeps its trees and grows a few more, in
+    proportion to the days dated after ``new_since`` (at most
+    ``boost_rounds``) and at a reduced learning rate, on the trailing
+    WARM_START_WINDOW_DAYS. Fitting the window rather than just the new rows
+    keeps the added trees from chasing a handful of residuals, which
+    repeated warm starts would otherwise compound.
+
+    Returns:
+        tuple: The refitted Prophet model and XGBRegressor.
+    """
+    print("--- Starting WARM Hybrid Prophet + XGBoost Refit ---")
+    df['ds'] = pd.to_datetime(df['ds'])
+    df['y'] = df['y'].astype('float64')
+
+    print("Step 1: Refitting Prophet from the previous parameters...")
+    prophet_model = Prophet(**HYPERPARAMETERS['prophet'])
+    prophet_model.fit(df, init=stan_init(previous_prophet))
+    strategy = 'direct' if _is_direct(previous_xgb) else 'recursive'
+    df_for_xgb_train, features = _residual_training_frame(prophet_model, df, strategy)
+
+    new_days = df_for_xgb_train.loc[df_for_xgb_train['ds'] > pd.Timestamp(new_since), 'ds'].nunique()
+    rounds = min(boost_rounds, WARM_START_ROUNDS_PER_DAY * new_days)
+    if rounds <= 0:
+        return prophet_model, previous_xgb
+    window_start = df_for_xgb_train['ds'].max() - pd.Timedelta(days=max(WARM_START_WINDOW_DAYS, new_days) - 1)
+    window = df_for_xgb_train[df_for_xgb_train['ds'] >= window_start]
+    xgb_regressor = xgb.XGBRegressor(**{**HYPERPARAMETERS['xgboost'], 'n_estimators': rounds,
+                                        'learning_rate': WARM_START_LEARNING_RATE}, n_jobs=n_jobs)
+    xgb_regressor.fit(window[features], window[TARGET], xgb_model=previous_xgb.get_booster())
+    return prophet_model, xgb_regressor
+
+
+def _is_direct(xgb_regressor):
+    return 'horizon_bucket' in (xgb_regressor.get_booster().feature_names or [])
+
+
+def forecast_hybrid(prophet_model, xgb_regressor, df, periods=30, freq='D', engine=FORECAST_ENGINE, prophet_forecast=None):
+    """
+    Forecasts ``periods`` days past the end of df with already fitted models.
+
+    The strategy follows the residual model: one trained on horizon-bucketed
+    features forecasts directly, any other recursively with ``engine``.
+    Only the ds and y history of df is used, so models loaded from the
+    artifact store forecast exactly like freshly fitted ones. A baseline
+    already predicted over history and future can be passed as
+    prophet_forecast; it is updated in place.
+    """
+    df['ds'] = pd.to_datetime(df['ds'])
+    df['y'] = df['y'].astype('float64')
+    if prophet_forecast is None:
+        future = prophet_model.make_future_dataframe(periods=periods, freq=freq)
+        prophet_forecast = predict_baseline(prophet_model, future)
+
+    if _is_direct(xgb_regressor):
+        print("Step 4: Making direct future forecast...")
+        _direct_forecast(xgb_regressor, df, prophet_forecast)
+        print("✅ Advanced hybrid forecast complete.")
+        return prophet_forecast
+
+    # === Step 4: Make future forecast using a recursive loop ===
+    print(f"Step 4: Making recursive future forecast ({engine} engine)...")
+    if engine == 'legacy':
+        _recursive_forecast_legacy(xgb_regressor, df, df, prophet_forecast)
+    else:
+        _recursive_forecast_vectorized(xgb_regressor, df, prophet_forecast)
+
     print("✅ Advanced hybrid forecast complete.")
-    return prophet_model, prophet_forecast
\ No newline at end of file
+    return prophet_forecast
+
+
+def train_and_forecast(df, periods=30, freq='D', engine=FORECAST_ENGINE, n_jobs=None, strategy=None):
+    # One Prophet predict over history and future: its history rows are the
+    # in-sample forecast the residual model is trained on
+    prophet_model = _fit_prophet(df)
+    prophet_forecast = predict_baseline(prophet_model, prophet_model.make_future_dataframe(periods=periods, freq=freq))
+    forecast_on_history = prophet_forecast.iloc[:len(prophet_model.history_dates)]
+    xgb_regressor = _fit_residual_model(prophet_model, df, strategy, n_jobs, forecast_on_history)
+    return prophet_model, forecast_hybrid(prophet_model, xgb_regressor, df, periods, freq, engine, prophet_forecast)
+
+
+# --- Global residual model ---
+# One booster learns the residuals of every series. Each series' lags and
+# residuals are divided by its own scale so meters of very different size
+# share the trees, and a series_id feature tells the series apart.
+SCALED_FEATURES = ['lag_7', 'lag_14', 'rolling_mean_7', 'lag_h', 'lag_h_7', 'rolling_mean_h']
+
+
+def _series_scale(y):
+    scale = float(np.nanstd(y.to_numpy(dtype='float64'))) if y.notna().any() else 0.0
+    return scale if scale > 0 else 1.0
+
+
+def fit_global(frames, n_jobs=None, strategy=None):
+    """
+    Fits a Prophet baseline per series and a single XGBoost model of all
+    their residuals, stacked in long format with a series_id column.
+
+    Args:
+        frames (dict): ds/y DataFrames keyed by series (column) name.
+
+    Returns:
+        tuple: (prophet_models, xgb_regressor, series) where prophet_models and
+        series are keyed like frames and series holds each one's id and scale.
+    """
+    strategy = strategy or HYPERPARAMETERS['strategy']
+    prophet_models, series, stacked = {}, {}, []
+    for series_id, (name, df) in enumerate(frames.items()):
+        print(f"--- Fitting Prophet baseline for {name} (global residual model) ---")
+        df['ds'] = pd.to_datetime(df['ds'])
+        df['y'] = df['y'].astype('float64')
+        prophet_model = Prophet(**HYPERPARAMETERS['prophet'])
+        prophet_model.fit(df)
+        train, features = _residual_training_frame(prophet_model, df, strategy)
+
+        scale = _series_scale(df['y'])
+        train = train.copy()
+        for column in [c for c in SCALED_FEATURES if c in features] + [TARGET]:
+            train[column] = train[column] / scale
+        train['series_id'] = series_id
+        stacked.append(train)
+        prophet_models[name] = prophet_model
+        series[name] = {'id': series_id, 'scale': scale}
+
+    features = ['series_id'] + features
+    stacked = pd.concat(stacked, ignore_index=True)
+    print(f"Training one XGBoost model on {len(stacked)} residual rows of {len(frames)} series...")
+    xgb_regressor = xgb.XGBRegressor(**HYPERPARAMETERS['xgboost'], n_jobs=n_jobs)
+    xgb_regressor.fit(stacked[features], stacked[TARGET])
+    return prophet_models, xgb_regressor, series
+
+
+def _recursive_forecast_global(xgb_regressor, histories, prophet_forecasts, series):
+    """
+    Recursive forecast of every series at once: each future day is one
+    predict call on a row per series. Updates the prophet_forecasts in place.
+    """
+    names = list(histories)
+    count = len(names)
+    booster = xgb_regressor.get_booster()
+    n_history = np.array([len(histories[n]) for n in names])
+    horizon = min(len(prophet_forecasts[n]) - len(histories[n]) for n in names)
+    scales = np.array([series[n]['scale'] for n in names])
+
+    feature_names = booster.feature_names
+    features = np.empty((count, horizon, len(feature_names)))
+    features[:, :, feature_names.index('series_id')] = np.array([series[n]['id'] for n in names])[:, None]
+    for row, name in enumerate(names):
+        calendar = create_features(prophet_forecasts[name][['ds']].iloc[n_history[row]:n_history[row] + horizon].assign(y=np.nan))
+        for column in CALENDAR_FEATURES:
+            features[row, :, feature_names.index(column)] = calendar[column].to_numpy(dtype='float64')
+    lag_7, lag_14, rolling_mean_7 = (feature_names.index(f) for f in ('lag_7', 'lag_14', 'rolling_mean_7'))
+
+    # Same mirrored ring buffer as the single-series engine, one row per series, in scaled units
+    ring = np.full((count, 2 * LAG_WINDOW), np.nan)
+    for row, name in enumerate(names):
+        tail = histories[name]['y'].to_numpy(dtype='float64')[-LAG_WINDOW:] / scales[row]
+        ring[row, LAG_WINDOW - len(tail):LAG_WINDOW] = tail
+        ring[row, 2 * LAG_WINDOW - len(tail):] = tail
+    head = 0
+
+    yhat = {n: prophet_forecasts[n]['yhat'].to_numpy(dtype='float64', copy=True) for n in names}
+    predicted = np.empty((count, horizon))
+    for step in range(horizon):
+        window = ring[:, head:head + LAG_WINDOW]
+        i = n_history + step
+        rows = features[:, step, :]
+        rows[:, lag_7] = np.where(i - 7 >= 0, window[:, LAG_WINDOW - 7], np.nan)
+        rows[:, lag_14] = np.where(i - 14 >= 0, window[:, 0], np.nan)
+        recent = window[:, LAG_WINDOW - 7:]
+        valid = ~np.isnan(recent)
+        total = np.where(valid, recent, 0).sum(axis=1)
+        counted = valid.sum(axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            rows[:, rolling_mean_7] = np.where((i - 7 >= 0) & (counted > 0), total / counted, np.nan)
+
+        error = booster.inplace_predict(np.ascontiguousarray(rows)).astype('float64') * scales
+        predicted[:, step] = error
+        for row, name in enumerate(names):
+            yhat[name][i[row]] += error[row]
+        next_values = np.array([yhat[name][i[row]] for row, name in enumerate(names)]) / scales
+        ring[:, head] = ring[:, head + LAG_WINDOW] = next_values
+        head = (head + 1) % LAG_WINDOW
+
+    for row, name in enumerate(names):
+        _add_predicted_error(prophet_forecasts[name], n_history[row], predicted[row])
+
+
+def forecast_global(prophet_models, xgb_regressor, series, frames, periods=30, freq='D'):
+    """
+    Forecasts every series with its Prophet baseline and the shared residual
+    model. Direct models score all series and days in one predict call;
+    recursive ones in one call per day.
+
+    Returns:
+        dict: The Prophet-style forecast DataFrame of each series.
+    """
+    forecasts, histories = {}, {}
+    for name, df in frames.items():
+        df['ds'] = pd.to_datetime(df['ds'])
+        df['y'] = df['y'].astype('float64')
+        future = prophet_models[name].make_future_dataframe(periods=periods, freq=freq)
+        forecasts[name] = predict_baseline(prophet_models[name], future)
+        histories[name] = df
+
+    if not _is_direct(xgb_regressor):
+        print(f"Making recursive future forecast for {len(frames)} series at once...")
+        _recursive_forecast_global(xgb_regressor, histories, forecasts, series)
+        return forecasts
+
+    print(f"Making direct future forecast for {len(frames)} series at once...")
+    feature_names = xgb_regressor.get_booster().feature_names
+    blocks = []
+    for name, df in histories.items():
+        block = _direct_forecast_features(df, forecasts[name])
+        for column in ('lag_h', 'lag_h_7', 'rolling_mean_h'):
+            block[column] = block[column] / series[name]['scale']
+        block['series_id'] = series[name]['id']
+        blocks.append(block)
+    predicted = xgb_regressor.predict(pd.concat(blocks, ignore_index=True)[feature_names]).astype('float64')
+
+    offset = 0
+    for (name, df), block in zip(histories.items(), blocks):
+        error = predicted[offset:offset + len(block)] * series[name]['scale']
+        _add_predicted_error(forecasts[name], len(df), error)
+        offset += len(block)
+    return forecasts
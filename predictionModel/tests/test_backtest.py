@@ -0,0 +1,66 @@
+import sys
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+
+# Add the parent 'predictionModel' directory to the path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.join(project_root, 'predictionModel'))
+
+from backtesting.backtest import rolling_origins, run_backtest
+
+def _frames(days=150, seed=5):
+    rng = np.random.default_rng(seed)
+    t = np.arange(days)
+    ds = pd.date_range("2025-01-01", periods=days, freq="D")
+    return {
+        'total_consumption': pd.DataFrame({'ds': ds, 'y': 20000 + 10 * t + 2000 * np.sin(2 * np.pi * t / 7) + rng.normal(0, 300, days)}),
+        'solar_generation': pd.DataFrame({'ds': ds, 'y': 500 + 50 * np.sin(2 * np.pi * t / 7) + rng.normal(0, 20, days)}),
+    }
+
+def test_backtest_report_and_cache():
+    """
+    Tests the fold layout, the report's metrics, that a process-pool run
+    scores every fold like the serial run and that an unchanged rerun is
+    served entirely from the fold cache.
+    """
+    print("Running test: test_backtest_report_and_cache...")
+    frames = _frames()
+    cutoffs = rolling_origins(frames['total_consumption'], initial_days=90, horizon_days=30, period_days=15)
+    assert [str(c.date()) for c in cutoffs] == ['2025-03-31', '2025-04-15', '2025-04-30'], cutoffs
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        report = run_backtest(frames, workers=1, cache_dir=cache_dir, initial_days=90, horizon_days=30, period_days=15)
+        assert report['cached_folds'] == 0 and report['failed_folds'] == 0
+        for column, summary in report['columns'].items():
+            assert summary['folds'] == 3, f"{column} should have 3 folds."
+            for metric in ('mape', 'rmse', 'mae', 'fold_seconds_mean'):
+                assert summary[metric] is not None and np.isfinite(summary[metric]), f"{column} {metric} is invalid."
+            assert all(f['test_rows'] == 30 for f in summary['fold_results'])
+
+        with tempfile.TemporaryDirectory() as parallel_cache_dir:
+            parallel = run_backtest(frames, workers=2, cache_dir=parallel_cache_dir, initial_days=90, horizon_days=30, period_days=15)
+        assert parallel['cached_folds'] == 0 and parallel['failed_folds'] == 0
+        for column, summary in report['columns'].items():
+            serial_folds, parallel_folds = summary['fold_results'], parallel['columns'][column]['fold_results']
+            assert [f['cutoff'] for f in parallel_folds] == [f['cutoff'] for f in serial_folds]
+            for serial_fold, parallel_fold in zip(serial_folds, parallel_folds):
+                for metric in ('mape', 'rmse', 'mae'):
+                    assert np.isclose(parallel_fold[metric], serial_fold[metric], rtol=1e-6), \
+                        f"{column} {metric} at {serial_fold['cutoff']} differs between the pool and the serial run."
+
+        rerun = run_backtest(frames, workers=1, cache_dir=cache_dir, initial_days=90, horizon_days=30, period_days=15)
+        assert rerun['cached_folds'] == 6, "An unchanged rerun should be fully cached."
+        assert rerun['columns']['total_consumption']['mape'] == report['columns']['total_consumption']['mape']
+
+        frames['solar_generation'].loc[140, 'y'] += 1
+        changed = run_backtest(frames, workers=1, cache_dir=cache_dir, initial_days=90, horizon_days=30, period_days=15)
+        assert changed['cached_folds'] == 5, "Only the fold that sees the changed day should rerun."
+        print(f"  first run {report['wall_seconds']:.2f}s, 2 workers {parallel['wall_seconds']:.2f}s, cached rerun {rerun['wall_seconds']:.2f}s")
+    print("✅ PASS: Backtest report is complete, the process pool matches the serial run and folds are cached by data.")
+
+if __name__ == "__main__":
+    print("--- Starting Backtest Suite Test ---")
+    test_backtest_report_and_cache()
+    print("--- Finished Backtest Suite Test ---")
@@ -0,0 +1,117 @@
+import sys
+import os
+import json
+import tempfile
+import pandas as pd
+import pytest
+
+# Add the parent 'predictionModel' directory to the path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.join(project_root, 'predictionModel'))
+sys.path.append(os.path.join(project_root, 'dataPipeline'))
+
+from db_handler.sqlite_backend import connect_sqlite
+from db_handler.migrations import FORECAST_METRIC_COLUMNS
+from db_writer.writer import publish_forecast_run
+
+def _wide_frame(days, value, metrics=FORECAST_METRIC_COLUMNS):
+    dates = pd.date_range("2025-07-03", periods=days, freq="D")
+    frame = pd.DataFrame({'reading_date': dates, 'month': dates.strftime('%B')})
+    for column in metrics:
+        frame[f"{column}_pred"] = float(value)
+    frame['resolution'] = 'day'
+    frame['period_end'] = dates
+    return frame
+
+def test_publish_moves_the_current_run():
+    """
+    Tests that each publish becomes the current run seen through
+    forecast_data_wide and records its model artifacts, that old runs are
+    pruned, and that a failed publish keeps the previous forecast.
+    """
+    print("Running test: test_publish_moves_the_current_run...")
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = connect_sqlite(os.path.join(tmp, "power.sqlite3"))
+        try:
+            first = publish_forecast_run(conn, FORECAST_METRIC_COLUMNS, _wide_frame(400, 1))
+            second = publish_forecast_run(conn, FORECAST_METRIC_COLUMNS, _wide_frame(300, 2))
+            third = publish_forecast_run(conn, FORECAST_METRIC_COLUMNS, _wide_frame(200, 3), {'total_consumption': 'abc123'})
+            with conn.cursor() as cur:
+                cur.execute("SELECT run_id FROM forecast_current_run;")
+                assert cur.fetchone()[0] == third
+                cur.execute("SELECT COUNT(*), MIN(total_consumption_pred), MAX(total_consumption_pred), MIN(month) FROM forecast_data_wide;")
+                assert cur.fetchone() == (200, 3.0, 3.0, 'August'), "The view does not show the latest run."
+                cur.execute("SELECT artifact_keys FROM forecast_runs WHERE run_id = %s;", (third,))
+                assert json.loads(cur.fetchone()[0]) == {'total_consumption': 'abc123'}, "The run's artifacts were not recorded."
+                cur.execute("SELECT run_id FROM forecast_runs ORDER BY run_id;")
+                assert [r[0] for r in cur.fetchall()] == [second, third], "Old runs were not pruned."
+                cur.execute("SELECT COUNT(*) FROM forecast_values WHERE run_id = %s;", (first,))
+                assert cur.fetchone()[0] == 0
+
+            broken = _wide_frame(10, 4)
+            broken.loc[5, 'reading_date'] = broken.loc[4, 'reading_date']  # duplicate key
+            with pytest.raises(Exception) as failure:
+                publish_forecast_run(conn, FORECAST_METRIC_COLUMNS, broken)
+            print(f"  failed publish raised: {failure.value}")
+            with conn.cursor() as cur:
+                cur.execute("SELECT COUNT(*), MAX(total_consumption_pred) FROM forecast_data_wide;")
+                assert cur.fetchone() == (200, 3.0), "A failed publish must keep the previous forecast."
+                cur.execute("SELECT COUNT(*) FROM forecast_runs WHERE status <> 'published';")
+                assert cur.fetchone()[0] == 0, "A failed publish left its run behind."
+            print("✅ PASS: Publishing moves the current run atomically.")
+        finally:
+            conn.close()
+
+def test_new_metric_needs_no_schema_change():
+    """
+    Tests that publishing an unknown metric registers it and gives the wide
+    view a column for it.
+    """
+    print("Running test: test_new_metric_needs_no_schema_change...")
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = connect_sqlite(os.path.join(tmp, "power.sqlite3"))
+        try:
+            metrics = FORECAST_METRIC_COLUMNS + ["library_util"]
+            publish_forecast_run(conn, metrics, _wide_frame(30, 5, metrics))
+            with conn.cursor() as cur:
+                cur.execute("SELECT COUNT(*), SUM(library_util_pred) FROM forecast_data_wide;")
+                assert cur.fetchone() == (30, 150.0)
+                cur.execute("SELECT COUNT(*) FROM forecast_metrics;")
+                assert cur.fetchone()[0] == len(metrics)
+            print("✅ PASS: New metrics are registered without a migration.")
+        finally:
+            conn.close()
+
+def test_killed_publish_is_cleaned_up():
+    """
+    Tests that a run left 'loading' by a publish that never finished is
+    dropped, with its rows, by the next successful publish.
+    """
+    print("Running test: test_killed_publish_is_cleaned_up...")
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = connect_sqlite(os.path.join(tmp, "power.sqlite3"))
+        try:
+            publish_forecast_run(conn, FORECAST_METRIC_COLUMNS, _wide_frame(30, 1))
+            with conn.cursor() as cur:
+                # What a process killed halfway through a publish leaves behind
+                cur.execute("INSERT INTO forecast_runs (status) VALUES ('loading') RETURNING run_id;")
+                abandoned = cur.fetchone()[0]
+                cur.execute("INSERT INTO forecast_values (run_id, metric_id, reading_date, period_end, value) VALUES (%s, 1, '2025-07-03', '2025-07-03', 9);", (abandoned,))
+                conn.commit()
+
+            latest = publish_forecast_run(conn, FORECAST_METRIC_COLUMNS, _wide_frame(30, 2))
+            with conn.cursor() as cur:
+                cur.execute("SELECT run_id, status FROM forecast_runs WHERE run_id >= %s;", (abandoned,))
+                assert cur.fetchall() == [(latest, 'published')], "The abandoned run was not dropped."
+                cur.execute("SELECT COUNT(*) FROM forecast_values WHERE run_id = %s;", (abandoned,))
+                assert cur.fetchone()[0] == 0, "The abandoned run's rows were kept."
+            print("✅ PASS: Runs left by a killed publish are dropped.")
+        finally:
+            conn.close()
+
+if __name__ == "__main__":
+    print("--- Starting Forecast Runs Test ---")
+    test_publish_moves_the_current_run()
+    test_new_metric_needs_no_schema_change()
+    test_killed_publish_is_cleaned_up()
+    print("--- Finished Forecast Runs Test ---")
@@ -0,0 +1,63 @@
+import sys
+import os
+import time
+import numpy as np
+import pandas as pd
+
+# Add the parent 'predictionModel' directory to the path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.join(project_root, 'predictionModel'))
+
+from models.prophet_model import fit_hybrid, forecast_hybrid, fit_global, forecast_global
+
+# --- Configuration ---
+SERIES_COUNT = 4
+HISTORY_DAYS = 240
+HORIZON_DAYS = 365
+
+def _frames(seed=11):
+    """Meters of very different size, sharing a weekly pattern."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(HISTORY_DAYS)
+    frames = {}
+    for i in range(SERIES_COUNT):
+        level = 10 ** (2 + i)
+        y = level * (1 + 0.001 * t + 0.1 * np.sin(2 * np.pi * t / 7)) + rng.normal(0, level * 0.02, HISTORY_DAYS)
+        frames[f"meter_{i}"] = pd.DataFrame({'ds': pd.date_range("2025-01-01", periods=HISTORY_DAYS, freq="D"), 'y': y})
+    frames["meter_0"].loc[[30, 200], 'y'] = np.nan
+    return frames
+
+def test_global_model_forecasts_every_series():
+    """
+    Tests that one booster forecasts every series for both strategies, and
+    compares its runtime with fitting a model per series.
+    """
+    print("Running test: test_global_model_forecasts_every_series...")
+    for strategy in ('recursive', 'direct'):
+        frames = _frames()
+        start = time.perf_counter()
+        prophet_models, xgb_regressor, series = fit_global({k: v.copy() for k, v in frames.items()}, strategy=strategy)
+        forecasts = forecast_global(prophet_models, xgb_regressor, series, frames, periods=HORIZON_DAYS)
+        global_seconds = time.perf_counter() - start
+
+        assert set(forecasts) == set(frames), "Every series must be forecast."
+        assert sorted(s['id'] for s in series.values()) == list(range(SERIES_COUNT))
+        for name, forecast in forecasts.items():
+            assert len(forecast) == HISTORY_DAYS + HORIZON_DAYS, f"{name} has the wrong horizon."
+            assert np.isfinite(forecast['yhat']).all(), f"{name} forecast has invalid values."
+            # The shared trees work in scaled units; the forecast must stay at the meter's level
+            level = np.nanmean(frames[name]['y'])
+            future = forecast['yhat'].to_numpy()[HISTORY_DAYS:HISTORY_DAYS + 30]
+            assert np.all(np.abs(future / level - 1) < 0.5), f"{name} forecast drifted off its level."
+
+        start = time.perf_counter()
+        for df in _frames().values():
+            forecast_hybrid(*fit_hybrid(df.copy(), strategy=strategy), df.copy(), periods=HORIZON_DAYS)
+        per_series_seconds = time.perf_counter() - start
+        print(f"  {strategy}: global {global_seconds:.2f}s, per series {per_series_seconds:.2f}s")
+    print("✅ PASS: The global residual model forecasts every series.")
+
+if __name__ == "__main__":
+    print("--- Starting Global Residual Model Test ---")
+    test_global_model_forecasts_every_series()
+    print("--- Finished Global Residual Model Test ---")
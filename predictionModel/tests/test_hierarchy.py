@@ -0,0 +1,47 @@
+import sys
+import os
+import numpy as np
+import pandas as pd
+
+# Add the parent 'predictionModel' directory to the path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.join(project_root, 'predictionModel'))
+
+from models.hierarchy import HIERARCHY, leaf_columns, reconcile
+
+HIERARCHY_UNDER_TEST = {'total': [['a', 'b'], ['c', 'd', 'e']]}
+
+def _forecast(values):
+    return pd.DataFrame({'ds': pd.date_range("2025-07-01", periods=len(values), freq="D"), 'yhat': values})
+
+def test_reconciled_breakdowns_add_up():
+    """
+    Tests that the derived total is the mean of the breakdowns' sums and that
+    every breakdown is adjusted to add up to it, in proportion to leaf size.
+    """
+    print("Running test: test_reconciled_breakdowns_add_up...")
+    forecasts = {
+        'a': _forecast([60.0, 0.0]), 'b': _forecast([40.0, 0.0]),
+        'c': _forecast([90.0, 10.0]), 'd': _forecast([10.0, 0.0]), 'e': _forecast([10.0, 0.0]),
+    }
+    reconciled = reconcile(forecasts, HIERARCHY_UNDER_TEST)
+    total = reconciled['total']['yhat'].to_numpy()
+    assert np.allclose(total, [105.0, 5.0]), total
+    for group in HIERARCHY_UNDER_TEST['total']:
+        assert np.allclose(sum(reconciled[c]['yhat'].to_numpy() for c in group), total), f"{group} does not add up."
+    assert np.isclose(reconciled['a']['yhat'][0], 63.0) and np.isclose(reconciled['b']['yhat'][0], 42.0), "Gap not split by size."
+    assert np.allclose([reconciled[c]['yhat'][1] for c in ('a', 'b')], [2.5, 2.5]), "All-zero leaves should split the gap evenly."
+    print("✅ PASS: Reconciled breakdowns add up to the derived total.")
+
+def test_missing_leaf_skips_the_aggregate():
+    print("Running test: test_missing_leaf_skips_the_aggregate...")
+    reconciled = reconcile({'a': _forecast([1.0]), 'b': _forecast([2.0]), 'c': _forecast([3.0])}, HIERARCHY_UNDER_TEST)
+    assert 'total' not in reconciled and reconciled['a']['yhat'][0] == 1.0
+    assert 'total_consumption' not in leaf_columns(['total_consumption'] + HIERARCHY['total_consumption'][0])
+    print("✅ PASS: An aggregate with a missing leaf is not derived.")
+
+if __name__ == "__main__":
+    print("--- Starting Hierarchy Test ---")
+    test_reconciled_breakdowns_add_up()
+    test_missing_leaf_skips_the_aggregate()
+    print("--- Finished Hierarchy Test ---")
@@ -0,0 +1,58 @@
+import sys
+import os
+import numpy as np
+import pandas as pd
+from prophet import Prophet
+
+# Add the parent 'predictionModel' directory to the path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.join(project_root, 'predictionModel'))
+
+from models.horizon import horizon_tiers, aggregate_baseline, baseline_yhat
+
+def test_tiers_cover_the_horizon_once():
+    """
+    Tests that the daily, weekly and monthly periods cover every day of the
+    horizon exactly once, in that order.
+    """
+    print("Running test: test_tiers_cover_the_horizon_once...")
+    tiers = horizon_tiers("2025-07-01", 3740, daily_days=365, weekly_days=730)
+    lengths = (tiers['period_end'] - tiers['ds']).dt.days + 1
+    assert lengths.sum() == 3740, f"Tiers cover {lengths.sum()} days instead of 3740."
+    assert (tiers['ds'].iloc[1:].to_numpy() == (tiers['period_end'].iloc[:-1] + pd.Timedelta(days=1)).to_numpy()).all(), "Tiers have gaps or overlaps."
+    assert tiers['resolution'].value_counts()['day'] == 365
+    assert list(dict.fromkeys(tiers['resolution'])) == ['day', 'week', 'month'], "Tiers are out of order."
+    months = tiers[tiers['resolution'] == 'month']
+    assert (months['period_end'].iloc[:-1].dt.is_month_end).all(), "Monthly periods must end on month ends."
+
+    daily_only = horizon_tiers("2025-07-01", 400, daily_days=400)
+    assert (daily_only['resolution'] == 'day').all() and len(daily_only) == 400
+    print("✅ PASS: Tiers cover the horizon exactly once.")
+
+def test_aggregates_are_baseline_means():
+    """
+    Tests that every weekly/monthly value is the mean of Prophet's daily
+    point forecast over its period.
+    """
+    print("Running test: test_aggregates_are_baseline_means...")
+    t = np.arange(200)
+    df = pd.DataFrame({'ds': pd.date_range("2025-01-01", periods=200, freq="D"),
+                       'y': 1000 + 2 * t + 100 * np.sin(2 * np.pi * t / 7)})
+    model = Prophet(weekly_seasonality=True).fit(df)
+
+    tiers = horizon_tiers("2025-07-20", 400, daily_days=30, weekly_days=60)
+    tail = tiers[tiers['resolution'] != 'day'].reset_index(drop=True)
+    aggregated = aggregate_baseline(model, tail)
+    assert len(aggregated) == len(tail)
+
+    for i in (0, len(tail) // 2, len(tail) - 1):
+        days = pd.date_range(tail['ds'][i], tail['period_end'][i], freq='D')
+        assert np.isclose(aggregated['yhat'][i], baseline_yhat(model, days).mean()), f"Period {i} is not the baseline mean."
+    assert model.uncertainty_samples, "The model's uncertainty setting must be restored."
+    print("✅ PASS: Aggregated rows are the baseline's per-day means.")
+
+if __name__ == "__main__":
+    print("--- Starting Horizon Tiers Test ---")
+    test_tiers_cover_the_horizon_once()
+    test_aggregates_are_baseline_means()
+    print("--- Finished Horizon Tiers Test ---")
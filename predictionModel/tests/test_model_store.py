@@ -0,0 +1,112 @@
+import sys
+import os
+import time
+import tempfile
+import numpy as np
+import pandas as pd
+
+# Add the parent 'predictionModel' directory to the path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.join(project_root, 'predictionModel'))
+
+from models.prophet_model import HYPERPARAMETERS, fit_hybrid, fit_hybrid_warm, forecast_hybrid
+from model_store.store import (
+    artifact_key, load_models, save_models, load_meta, latest_key, extends_series, evict_artifacts
+)
+
+def _series(days=120, seed=3):
+    rng = np.random.default_rng(seed)
+    t = np.arange(days)
+    return pd.DataFrame({
+        'ds': pd.date_range("2025-01-01", periods=days, freq="D"),
+        'y': (10000 + 20 * t + 800 * np.sin(2 * np.pi * t / 7) + rng.normal(0, 200, days)).astype('float32'),
+    })
+
+def test_cached_models_forecast_like_fresh_ones():
+    """
+    Tests that stored models are found by content, forecast exactly like the
+    freshly fitted ones, and that eviction keeps each column's latest artifact.
+    """
+    print("Running test: test_cached_models_forecast_like_fresh_ones...")
+    with tempfile.TemporaryDirectory() as store_dir:
+        df = _series()
+        key = artifact_key(df)
+        assert load_models(key, store_dir) is None, "Empty store should miss."
+
+        models = fit_hybrid(df.copy())
+        save_models(key, 'total_consumption', *models, df, store_dir=store_dir)
+        cached = load_models(key, store_dir)
+        assert cached is not None, "Stored models were not found."
+        assert latest_key('total_consumption', store_dir) == key
+
+        fresh = forecast_hybrid(*models, df.copy(), periods=60)
+        loaded = forecast_hybrid(*cached, df.copy(), periods=60)
+        assert np.array_equal(fresh['yhat'].to_numpy(), loaded['yhat'].to_numpy()), "Cached models forecast differently."
+
+        changed = df.copy()
+        changed.loc[len(df) - 1, 'y'] += 1
+        new_key = artifact_key(changed)
+        assert new_key != key, "A changed series must get a new key."
+
+        save_models(new_key, 'total_consumption', *models, changed, store_dir=store_dir)
+        assert evict_artifacts(max_age_days=30, max_bytes=0, store_dir=store_dir) == 1, "The superseded artifact should be evicted."
+        assert load_models(new_key, store_dir) is not None, "The latest artifact must survive eviction."
+    print("✅ PASS: Model artifacts are cached, reused and evicted correctly.")
+
+def test_warm_start_after_new_days():
+    """
+    Tests that a series with appended days is recognised as an extension of
+    the stored one and that the warm refit keeps boosting the stored trees.
+    """
+    print("Running test: test_warm_start_after_new_days...")
+    with tempfile.TemporaryDirectory() as store_dir:
+        full = _series(127)
+        old = full.iloc[:120].copy()
+        old_key = artifact_key(old)
+
+        start = time.perf_counter()
+        save_models(old_key, 'hostels_util', *fit_hybrid(old.copy()), old, store_dir=store_dir, warm_starts=0)
+        cold_seconds = time.perf_counter() - start
+
+        meta = load_meta(old_key, store_dir)
+        assert extends_series(meta, full), "Appended days should allow a warm start."
+        revised = full.copy()
+        revised.loc[100, 'y'] += 5
+        assert not extends_series(meta, revised), "A revised history must force a full refit."
+
+        start = time.perf_counter()
+        prophet_fit, xgb_regressor = fit_hybrid_warm(full.copy(), *load_models(old_key, store_dir), new_since=meta['last_ds'])
+        warm_seconds = time.perf_counter() - start
+
+        trees = xgb_regressor.get_booster().num_boosted_rounds()
+        assert trees > HYPERPARAMETERS['xgboost']['n_estimators'], f"Expected the stored trees to be extended, got {trees}."
+        forecast = forecast_hybrid(prophet_fit, xgb_regressor, full.copy(), periods=30)
+        assert np.isfinite(forecast['yhat']).all(), "Warm-started forecast contains invalid values."
+        print(f"  cold fit {cold_seconds:.2f}s, warm refit {warm_seconds:.2f}s")
+    print("✅ PASS: Warm starts extend the stored models.")
+
+def test_warm_starts_stay_close_to_a_cold_fit():
+    """
+    Tests that a week of daily warm starts, each on one new day, forecasts
+    within 3% of the models fitted from scratch on the same series.
+    """
+    print("Running test: test_warm_starts_stay_close_to_a_cold_fit...")
+    full = _series(127)
+    models = fit_hybrid(full.iloc[:120].copy())
+    for end in range(121, len(full) + 1):
+        new_since = str(full['ds'].iloc[end - 2].date())
+        models = fit_hybrid_warm(full.iloc[:end].copy(), *models, new_since=new_since)
+
+    warm = forecast_hybrid(*models, full.copy(), periods=30)['yhat'].to_numpy()[-30:]
+    cold = forecast_hybrid(*fit_hybrid(full.copy()), full.copy(), periods=30)['yhat'].to_numpy()[-30:]
+    drift = np.mean(np.abs(warm - cold)) / np.mean(np.abs(cold))
+    assert drift < 0.03, f"Warm-started forecast drifted {drift:.1%} from a cold fit."
+    print(f"  warm vs cold forecast: {drift:.2%} mean absolute difference")
+    print("✅ PASS: Repeated warm starts stay close to a cold fit.")
+
+if __name__ == "__main__":
+    print("--- Starting Model Store Test ---")
+    test_cached_models_forecast_like_fresh_ones()
+    test_warm_start_after_new_days()
+    test_warm_starts_stay_close_to_a_cold_fit()
+    print("--- Finished Model Store Test ---")
@@ -0,0 +1,139 @@
+import sys
+import os
+import time
+import signal
+import asyncio
+import tempfile
+import numpy as np
+import pandas as pd
+
+# Add the parent 'predictionModel' and the 'apiServer' directories to the path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.join(project_root, 'predictionModel'))
+sys.path.append(os.path.join(project_root, 'apiServer'))
+
+from models.prophet_model import fit_hybrid
+from model_store.store import artifact_key, save_models, load_prophet
+from utils.visualizer import render_forecast_plot
+from app.plot_renderer import PlotRenderer, PlotRendererUnavailable
+
+def _store_model(store_dir, column='total_consumption', days=120):
+    t = np.arange(days)
+    df = pd.DataFrame({'ds': pd.date_range("2025-01-01", periods=days, freq="D"),
+                       'y': 10000 + 20 * t + 800 * np.sin(2 * np.pi * t / 7)})
+    key = artifact_key(df)
+    save_models(key, column, *fit_hybrid(df.copy()), df, store_dir=store_dir)
+    return key
+
+def test_renders_stored_models():
+    """
+    Tests that plots are rendered from the requested stored model in both
+    formats, even after newer models were stored, and that a missing
+    artifact renders nothing.
+    """
+    print("Running test: test_renders_stored_models...")
+    with tempfile.TemporaryDirectory() as store_dir:
+        key = _store_model(store_dir)
+        newer_key = _store_model(store_dir, days=150)
+        png = render_forecast_plot(key, 'total_consumption', 'forecast', 'png', periods=30, store_dir=store_dir)
+        svg = render_forecast_plot(key, 'total_consumption', 'components', 'svg', periods=30, store_dir=store_dir)
+        assert png.startswith(b'\x89PNG'), "Not a PNG image."
+        assert b'<svg' in svg[:1000], "Not an SVG image."
+        assert len(load_prophet(key, 'total_consumption', store_dir).history) == 120, "The newer model was loaded."
+        assert len(load_prophet(newer_key, 'total_consumption', store_dir).history) == 150
+        assert render_forecast_plot('0' * 64, 'total_consumption', store_dir=store_dir) is None
+    print("✅ PASS: Stored models are rendered headless.")
+
+def test_renderer_caches_and_evicts():
+    """
+    Tests that the API's renderer serves repeat requests from its cache,
+    renders concurrent requests for one plot once, and keeps the cache
+    within its size bound.
+    """
+    print("Running test: test_renderer_caches_and_evicts...")
+    with tempfile.TemporaryDirectory() as store_dir, tempfile.TemporaryDirectory() as cache_dir:
+        key = _store_model(store_dir)
+        # Read by the worker processes when they start
+        os.environ['MODEL_STORE_DIR'] = store_dir
+        renderer = PlotRenderer(workers=1, cache_dir=cache_dir)
+
+        async def scenario():
+            first, second = await asyncio.gather(renderer.get(key, 'total_consumption'), renderer.get(key, 'total_consumption'))
+            assert first == second and first.startswith(b'\x89PNG')
+            start = time.perf_counter()
+            assert await renderer.get(key, 'total_consumption') == first
+            assert time.perf_counter() - start < 0.5, "A cached plot should not be rendered again."
+            assert await renderer.get('0' * 64, 'total_consumption') is None
+            return len(first)
+
+        try:
+            size = asyncio.run(scenario())
+        finally:
+            renderer.close()
+        assert os.listdir(os.path.join(cache_dir, key)) == ['total_consumption_forecast.png']
+
+        # Older artifacts' images go first once the cache is over its bound
+        for age in (1, 2, 3):
+            os.makedirs(os.path.join(cache_dir, f"old{age}"))
+            path = os.path.join(cache_dir, f"old{age}", 'total_consumption_forecast.png')
+            with open(path, 'wb') as f:
+                f.write(b'x' * size)
+            os.utime(path, (age, age))
+        renderer.max_bytes = 2 * size
+        assert renderer.evict() == 2
+        assert sorted(os.listdir(cache_dir)) == sorted([key, 'old3']), "The least recently served images should be evicted."
+    print("✅ PASS: Plots are cached per model artifact and evicted by size.")
+
+async def _kill_workers(renderer, times):
+    """Kills the render worker as soon as one is running, `times` times over."""
+    killed = []
+    while len(killed) < times:
+        pool = renderer._pool
+        pids = [pid for pid in (pool._processes or {}) if pid not in killed] if pool is not None else []
+        for pid in pids[:1]:
+            os.kill(pid, signal.SIGKILL)
+            killed.append(pid)
+        await asyncio.sleep(0.05)
+    return killed
+
+def test_renderer_survives_a_killed_worker():
+    """
+    Tests that a render whose worker is killed (as by the OOM killer) is
+    retried on a fresh pool, that a second death is reported as
+    PlotRendererUnavailable, and that the next request works again.
+    """
+    print("Running test: test_renderer_survives_a_killed_worker...")
+    with tempfile.TemporaryDirectory() as store_dir, tempfile.TemporaryDirectory() as cache_dir:
+        key = _store_model(store_dir)
+        os.environ['MODEL_STORE_DIR'] = store_dir
+        renderer = PlotRenderer(workers=1, cache_dir=cache_dir)
+
+        async def scenario():
+            render = asyncio.ensure_future(renderer.get(key, 'total_consumption'))
+            await _kill_workers(renderer, 1)
+            image = await render
+            assert image is not None and image.startswith(b'\x89PNG'), "The render was not retried on a new pool."
+
+            render = asyncio.ensure_future(renderer.get(key, 'total_consumption', 'components'))
+            await _kill_workers(renderer, 2)
+            try:
+                await render
+                raise AssertionError("Workers dying twice should make the renderer unavailable.")
+            except PlotRendererUnavailable as e:
+                print(f"  second failure raised: {e}")
+            assert renderer._pool is None, "The broken pool was kept."
+            image = await renderer.get(key, 'total_consumption', 'components')
+            assert image is not None and image.startswith(b'\x89PNG'), "The renderer did not recover."
+
+        try:
+            asyncio.run(scenario())
+        finally:
+            renderer.close()
+    print("✅ PASS: Killed render workers are replaced.")
+
+if __name__ == "__main__":
+    print("--- Starting Plot Rendering Test ---")
+    test_renders_stored_models()
+    test_renderer_caches_and_evicts()
+    test_renderer_survives_a_killed_worker()
+    print("--- Finished Plot Rendering Test ---")
@@ -0,0 +1,65 @@
+import sys
+import os
+import time
+import numpy as np
+import pandas as pd
+
+# Add the parent 'predictionModel' directory to the path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.join(project_root, 'predictionModel'))
+
+from models.prophet_model import fit_hybrid, forecast_hybrid, train_and_forecast, predict_baseline
+
+# --- Configuration ---
+HORIZON_DAYS = 3740
+
+def _series(days=365, seed=1):
+    rng = np.random.default_rng(seed)
+    t = np.arange(days)
+    df = pd.DataFrame({'ds': pd.date_range("2024-07-01", periods=days, freq="D"),
+                       'y': 15000 + 8 * t + 1500 * np.sin(2 * np.pi * t / 7) + rng.normal(0, 600, days)})
+    df.loc[[40, 300], 'y'] = np.nan
+    return df
+
+def test_interval_modes_keep_yhat():
+    """
+    Tests that every interval mode gives the same yhat and that the analytic
+    intervals track Prophet's simulated ones across the horizon.
+    """
+    print("Running test: test_interval_modes_keep_yhat...")
+    df = _series()
+    prophet_model, _ = fit_hybrid(df.copy())
+    future = prophet_model.make_future_dataframe(periods=HORIZON_DAYS)
+
+    forecasts, seconds = {}, {}
+    for mode in ('full', 'subsample', 'analytic', 'none'):
+        start = time.perf_counter()
+        forecasts[mode] = predict_baseline(prophet_model, future, intervals=mode)
+        seconds[mode] = time.perf_counter() - start
+        assert np.array_equal(forecasts[mode]['yhat'].to_numpy(), forecasts['full']['yhat'].to_numpy()), f"yhat changed in '{mode}' mode."
+    assert forecasts['none']['yhat_lower'].isna().all()
+
+    width = {m: (forecasts[m]['yhat_upper'] - forecasts[m]['yhat_lower']).to_numpy() for m in ('full', 'analytic')}
+    for row in (100, len(df) + 30, len(df) + 1800, len(df) + HORIZON_DAYS - 1):
+        ratio = width['analytic'][row] / width['full'][row]
+        assert 0.8 < ratio < 1.25, f"Analytic interval at row {row} is {ratio:.2f}x the simulated one."
+    print("  " + ", ".join(f"{m} {s:.3f}s" for m, s in seconds.items()))
+    print("✅ PASS: Interval modes keep yhat and analytic intervals match the simulation.")
+
+def test_single_predict_matches_separate_steps():
+    """
+    Tests that train_and_forecast, which predicts history and future once,
+    forecasts exactly like fitting and forecasting separately.
+    """
+    print("Running test: test_single_predict_matches_separate_steps...")
+    df = _series()
+    _, combined = train_and_forecast(df.copy(), periods=400)
+    separate = forecast_hybrid(*fit_hybrid(df.copy()), df.copy(), periods=400)
+    assert np.array_equal(combined['yhat'].to_numpy(), separate['yhat'].to_numpy()), "Reusing the predict changed the forecast."
+    print("✅ PASS: One predict over history and future gives the same forecast.")
+
+if __name__ == "__main__":
+    print("--- Starting Prophet Fast Path Test ---")
+    test_interval_modes_keep_yhat()
+    test_single_predict_matches_separate_steps()
+    print("--- Finished Prophet Fast Path Test ---")
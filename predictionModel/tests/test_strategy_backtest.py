@@ -0,0 +1,84 @@
+import sys
+import os
+import time
+import numpy as np
+import pandas as pd
+import pytest
+
+# Add the parent 'predictionModel' directory to the path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.join(project_root, 'predictionModel'))
+sys.path.append(os.path.join(project_root, 'dataPipeline'))
+
+from data_loader.loader import load_power_frame, get_metric_frame
+from models.prophet_model import fit_hybrid, forecast_hybrid
+
+# --- Configuration ---
+METRICS_TO_TEST = ["total_consumption", "solar_generation", "hostels_util"]
+HOLDOUT_DAYS = 28
+# Length of the production forecast, to time the forecast step at full scale
+FULL_HORIZON_DAYS = 3740
+# The direct strategy may trade a little accuracy for speed, but its holdout
+# RMSE must stay within this factor of the recursive strategy's
+DIRECT_RMSE_TOLERANCE = 1.5
+
+def _errors(actual, predicted):
+    mask = ~np.isnan(actual)
+    actual, predicted = actual[mask], predicted[mask]
+    nonzero = actual != 0
+    mape = np.mean(np.abs((actual[nonzero] - predicted[nonzero]) / actual[nonzero])) * 100 if nonzero.any() else np.nan
+    rmse = np.sqrt(np.mean((actual - predicted) ** 2))
+    return mape, rmse
+
+def test_direct_vs_recursive_backtest():
+    """
+    Holds out the last HOLDOUT_DAYS of each metric, forecasts them with the
+    recursive and the direct strategy and compares error and runtime: the
+    direct forecast must be about as accurate and faster over the full horizon.
+    """
+    print(f"--- Starting Direct vs Recursive Backtest ({HOLDOUT_DAYS}-day holdout) ---")
+    if load_power_frame(METRICS_TO_TEST) is None:
+        pytest.skip("no database")
+
+    rows = []
+    for metric in METRICS_TO_TEST:
+        df = get_metric_frame(metric)
+        if df is None or len(df) < 120:
+            print(f"❌ Not enough historical data to backtest {metric}.")
+            continue
+        train, actual = df.iloc[:-HOLDOUT_DAYS].copy(), df['y'].iloc[-HOLDOUT_DAYS:].to_numpy(dtype='float64')
+
+        for strategy in ('recursive', 'direct'):
+            start = time.perf_counter()
+            models = fit_hybrid(train.copy(), strategy=strategy)
+            fit_seconds = time.perf_counter() - start
+
+            forecast = forecast_hybrid(*models, train.copy(), periods=HOLDOUT_DAYS)
+            mape, rmse = _errors(actual, forecast['yhat'].to_numpy()[-HOLDOUT_DAYS:])
+
+            start = time.perf_counter()
+            forecast_hybrid(*models, train.copy(), periods=FULL_HORIZON_DAYS)
+            forecast_seconds = time.perf_counter() - start
+
+            assert np.isfinite(forecast['yhat']).all(), f"{strategy} forecast for {metric} has invalid values."
+            rows.append({'metric': metric, 'strategy': strategy, 'mape_%': mape, 'rmse': rmse,
+                         'fit_s': fit_seconds, f'forecast_{FULL_HORIZON_DAYS}d_s': forecast_seconds})
+
+    if not rows:
+        pytest.skip("not enough historical data")
+    results = pd.DataFrame(rows)
+    print("\n--- Backtest Results ---")
+    print(results.round(3).to_string(index=False))
+    print("\n--- Mean by strategy ---")
+    print(results.drop(columns='metric').groupby('strategy').mean().round(3).to_string())
+
+    by_strategy = results.pivot(index='metric', columns='strategy')
+    for metric, row in by_strategy.iterrows():
+        assert row[('rmse', 'direct')] <= DIRECT_RMSE_TOLERANCE * row[('rmse', 'recursive')], \
+            f"Direct RMSE for {metric} is more than {DIRECT_RMSE_TOLERANCE}x the recursive one."
+    seconds = by_strategy[f'forecast_{FULL_HORIZON_DAYS}d_s'].sum()
+    assert seconds['direct'] < seconds['recursive'], "The direct forecast should be faster over the full horizon."
+    print("✅ PASS: The direct strategy matches the recursive one's accuracy and is faster.")
+
+if __name__ == "__main__":
+    test_direct_vs_recursive_backtest()
@@ -0,0 +1,19 @@
+# utils/parallel.py
+import os
+from contextlib import contextmanager
+
+THREAD_LIMIT_ENV_VARS = ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS", "STAN_NUM_THREADS")
+
+@contextmanager
+def thread_limits(threads):
+    """Caps native thread pools for processes started inside the block."""
+    saved = {var: os.environ.get(var) for var in THREAD_LIMIT_ENV_VARS}
+    os.environ.update({var: str(threads) for var in THREAD_LIMIT_ENV_VARS})
+    try:
+        yield
+    finally:
+        for var, value in saved.items():
+            if value is None:
+                os.environ.pop(var, None)
+            else:
+                os.environ[var] = value
@@ -1,25 +1,41 @@
 # utils/visualizer.py
+import io
 import os
 
-def save_forecast_plots(model, forecast, target_column):
+# --- Configuration ---
+# Days past the end of the history shown in rendered plots
+PLOT_HORIZON_DAYS = int(os.getenv("PLOT_HORIZON_DAYS", "365"))
+PLOT_KINDS = ('forecast', 'components')
+PLOT_FORMATS = {'png': 'image/png', 'svg': 'image/svg+xml'}
+
+
+def render_forecast_plot(key, column, kind='forecast', fmt='png', periods=PLOT_HORIZON_DAYS, store_dir=None):
     """
-    Generates and saves Prophet's forecast plots to a file.
+    Renders Prophet's forecast or components figure for the model of column
+    stored under key.
+
+    Matplotlib runs headless (Agg), and it and the model code are only
+    imported when a plot is rendered, so this can be handed to a worker
+    process without loading either in the caller.
+
+    Returns:
+        bytes: The encoded image, or None when the artifact is not in the model store.
     """
-    output_dir = 'forecast_plots'
-    os.makedirs(output_dir, exist_ok=True)
-    
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    from model_store.store import MODEL_STORE_DIR, load_prophet
+    from models.prophet_model import predict_baseline
+
+    prophet_fit = load_prophet(key, column, store_dir or MODEL_STORE_DIR)
+    if prophet_fit is None:
+        return None
+    # Sampled intervals give the components their uncertainty bands too
+    forecast = predict_baseline(prophet_fit, prophet_fit.make_future_dataframe(periods=periods), intervals='subsample')
+    fig = prophet_fit.plot(forecast) if kind == 'forecast' else prophet_fit.plot_components(forecast)
     try:
-        print(f"Saving plots for {target_column}...")
-        # Plot the forecast
-        fig1 = model.plot(forecast)
-        plot_filename = os.path.join(output_dir, f'{target_column}_forecast.png')
-        fig1.savefig(plot_filename)
-        
-        # Plot the forecast components (trend, seasonality)
-        fig2 = model.plot_components(forecast)
-        components_filename = os.path.join(output_dir, f'{target_column}_components.png')
-        fig2.savefig(components_filename)
-        
-        print(f"✅ Plots saved to '{output_dir}/'")
-    except Exception as e:
-        print(f"❌ Could not save plots: {e}")
\ No newline at end of file
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format=fmt)
+        return buffer.getvalue()
+    finally:
+        plt.close(fig)